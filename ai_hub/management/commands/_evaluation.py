@@ -0,0 +1,58 @@
+"""Shared helpers for the evaluate_* commands (not a command itself)."""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+def add_pool_arguments(parser) -> None:
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Evaluate records on a pool of N threads."
+    )
+    parser.add_argument(
+        "--limit", type=int, default=None, help="Only evaluate the first N records."
+    )
+
+
+def read_jsonl(path: str, limit: Optional[int] = None) -> List[Dict]:
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if limit is not None and len(records) >= limit:
+                break
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+
+def map_ordered(fn: Callable, items: Iterable, workers: int) -> List:
+    """Apply fn to every item, on a thread pool when workers > 1.
+
+    Results come back in input order whatever order the workers finish in,
+    so output files stay deterministic.
+    """
+    if workers <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, items))
+
+
+def throughput_summary(latencies_ms: List[float], seconds: float) -> Dict:
+    if not latencies_ms:
+        return {"records_per_sec": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "records_per_sec": round(len(latencies_ms) / seconds, 1) if seconds else 0.0,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+    }
+
+
+def format_throughput(summary: Dict, per: str = "record") -> str:
+    return (
+        f"{summary['records_per_sec']} records/sec, per-{per} p50 {summary['p50_ms']} ms, "
+        f"p95 {summary['p95_ms']} ms, p99 {summary['p99_ms']} ms"
+    )
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from ai_hub.services import llm_sessions
+from ai_hub.services.llm_client import agenerate_answer, generate_answer
+
+
+class Command(BaseCommand):
+    help = "Compare sync vs async LLM call throughput for one worker against a local fake provider."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--latency-ms", type=int, default=100)
+        parser.add_argument("--provider", choices=["openai", "anthropic"], default="openai")
+
+    def handle(self, *args, **options):
+        _FakeProviderHandler.latency = options["latency_ms"] / 1000.0
+        server = _FakeProviderServer(("127.0.0.1", 0), _FakeProviderHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+        overrides = override_settings(
+            AI_MOCK_MODE=False,
+            OPENAI_API_KEY="benchmark",
+            ANTHROPIC_API_KEY="benchmark",
+            OPENAI_BASE_URL=base_url,
+            ANTHROPIC_BASE_URL=base_url,
+            LLM_ASYNC_POOL_SIZE=options["concurrency"],
+        )
+        try:
+            with overrides:
+                llm_sessions.reset_clients()
+                provider = options["provider"]
+                summary = {
+                    "requests": options["requests"],
+                    "concurrency": options["concurrency"],
+                    "provider_latency_ms": options["latency_ms"],
+                    # A sync worker holds the request for the whole provider call.
+                    "sync": _run_sync(provider, options["requests"]),
+                    "async": asyncio.run(
+                        _run_async(provider, options["requests"], options["concurrency"])
+                    ),
+                }
+        finally:
+            llm_sessions.reset_clients()
+            server.shutdown()
+            server.server_close()
+        summary["speedup"] = round(
+            summary["async"]["requests_per_sec"] / summary["sync"]["requests_per_sec"], 2
+        )
+
+        out_path = os.path.join(settings.AI_HUB_ARTIFACTS_DIR, "llm_concurrency_results.json")
+        os.makedirs(settings.AI_HUB_ARTIFACTS_DIR, exist_ok=True)
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=True)
+
+        for mode in ("sync", "async"):
+            row = summary[mode]
+            self.stdout.write(
+                f"{mode}: {row['requests_per_sec']} req/s, "
+                f"p50 {row['p50_ms']} ms, p95 {row['p95_ms']} ms"
+            )
+        self.stdout.write(f"Speedup: {summary['speedup']}x")
+        self.stdout.write(f"Output: {out_path}")
+
+
+class _FakeProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 resets connections when the async run opens
+    # dozens at once.
+    request_queue_size = 1024
+
+
+class _FakeProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+        if self.path.endswith("/messages"):
+            body = {"content": [{"text": "fake answer"}]}
+        else:
+            body = {"choices": [{"message": {"content": "fake answer"}}]}
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _run_sync(provider, n_requests):
+    timings = []
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        call_start = time.perf_counter()
+        generate_answer("benchmark", model="benchmark", provider=provider)
+        timings.append((time.perf_counter() - call_start) * 1000)
+    return _summarize(timings, time.perf_counter() - start)
+
+
+async def _run_async(provider, n_requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def call():
+        async with semaphore:
+            call_start = time.perf_counter()
+            await agenerate_answer("benchmark", model="benchmark", provider=provider)
+            timings.append((time.perf_counter() - call_start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[call() for _ in range(n_requests)])
+    return _summarize(timings, time.perf_counter() - start)
+
+
+def _summarize(timings, elapsed):
+    return {
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(timings) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(timings, 50)), 3),
+        "p95_ms": round(float(np.percentile(timings, 95)), 3),
+    }
@@ -0,0 +1,83 @@
+import json
+import os
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from ai_hub.services.rag import similarities, top_k_indices
+
+
+class Command(BaseCommand):
+    help = "Benchmark dense vs sparse RAG retrieval on a synthetic corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunks", type=int, default=20000)
+        parser.add_argument("--vocab", type=int, default=50000)
+        parser.add_argument("--words", type=int, default=120)
+        parser.add_argument("--queries", type=int, default=50)
+        parser.add_argument("--top-k", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        vocab = np.array([f"term{i}" for i in range(options["vocab"])])
+        # Zipf-like word frequencies, as in natural text.
+        weights = 1.0 / np.arange(1, len(vocab) + 1)
+        weights /= weights.sum()
+
+        def sample(n_words):
+            return " ".join(rng.choice(vocab, size=n_words, p=weights))
+
+        texts = [sample(options["words"]) for _ in range(options["chunks"])]
+        queries = [sample(8) for _ in range(options["queries"])]
+
+        vectorizer = TfidfVectorizer()
+        vectors = normalize(vectorizer.fit_transform(texts), norm="l2")
+        vectors = vectors.astype("float32").tocsr()
+        q_vecs = [normalize(vectorizer.transform([q]), norm="l2") for q in queries]
+
+        dense = vectors.toarray()
+        summary = {
+            "chunks": vectors.shape[0],
+            "features": vectors.shape[1],
+            "dense": _run(dense, q_vecs, options["top_k"], _legacy_top_k),
+            "sparse": _run(vectors, q_vecs, options["top_k"], top_k_indices),
+        }
+        summary["dense"]["bytes"] = int(dense.nbytes)
+        summary["sparse"]["bytes"] = int(
+            vectors.data.nbytes + vectors.indices.nbytes + vectors.indptr.nbytes
+        )
+
+        out_path = os.path.join(settings.AI_HUB_ARTIFACTS_DIR, "rag_benchmark_results.json")
+        os.makedirs(settings.AI_HUB_ARTIFACTS_DIR, exist_ok=True)
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=True)
+
+        for mode in ("dense", "sparse"):
+            row = summary[mode]
+            self.stdout.write(
+                f"{mode}: {row['avg_ms']} ms/query, "
+                f"{row['bytes'] / (1024 * 1024):.1f} MiB vectors"
+            )
+        self.stdout.write(f"Output: {out_path}")
+
+
+def _legacy_top_k(sims, top_k):
+    return np.argsort(-sims)[:top_k]
+
+
+def _run(vectors, q_vecs, top_k, select):
+    timings = []
+    for q_vec in q_vecs:
+        start = time.perf_counter()
+        sims = similarities(vectors, q_vec)
+        select(sims, top_k)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "avg_ms": round(float(np.mean(timings)), 3),
+        "p95_ms": round(float(np.percentile(timings, 95)), 3),
+    }
@@ -1,18 +1,70 @@
+import os
+
 from django.core.management.base import BaseCommand
 from django.conf import settings
 
-from ai_hub.services.rag import load_docs_from_dir, build_index
+from ai_hub.models import KnowledgeDocument
+from ai_hub.services.ingest import iter_documents, list_documents, new_stats, format_stats
+from ai_hub.services.rag import build_index, update_index, indexed_documents
 
 
 class Command(BaseCommand):
     help = "Build RAG index from ai_hub/knowledge_base documents."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only re-embed documents whose checksum changed since the last build.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=getattr(settings, "RAG_INGEST_WORKERS", 1),
+            help="Processes used to read files and extract PDF pages.",
+        )
+
     def handle(self, *args, **options):
-        docs = load_docs_from_dir(settings.AI_HUB_KB_DIR)
-        if not docs:
-            self.stdout.write("No documents found in knowledge_base.")
-            return
-        result = build_index(docs, top_k=3)
-        self.stdout.write(
-            f"Indexed {result['count']} chunks from {len(docs)} documents."
+        if options["incremental"]:
+            stats = new_stats()
+            result = update_index(
+                settings.AI_HUB_KB_DIR, top_k=3, workers=options["workers"], stats=stats
+            )
+            mode = "Full rebuild" if result["full_rebuild"] else "Incremental update"
+            self.stdout.write(
+                f"{mode}: {result['added']} re-embedded, {result['removed']} removed, "
+                f"{result['unchanged']} unchanged. Index has {result['count']} chunks."
+            )
+            self.stdout.write(format_stats(stats))
+        else:
+            if not list_documents(settings.AI_HUB_KB_DIR):
+                self.stdout.write("No documents found in knowledge_base.")
+                return
+            stats = new_stats()
+            docs = iter_documents(
+                settings.AI_HUB_KB_DIR, workers=options["workers"], stats=stats
+            )
+            result = build_index(docs, top_k=3)
+            self.stdout.write(
+                f"Indexed {result['count']} chunks from {result['documents']} documents."
+            )
+            self.stdout.write(format_stats(stats))
+        _sync_knowledge_documents(indexed_documents(), settings.AI_HUB_KB_DIR)
+
+
+def _sync_knowledge_documents(documents, directory):
+    for name, record in documents.items():
+        updated = KnowledgeDocument.objects.filter(name=name).update(
+            checksum=record["checksum"]
         )
+        if not updated:
+            KnowledgeDocument.objects.create(
+                name=name, path=record["path"], checksum=record["checksum"]
+            )
+    # Rows for uploads not indexed yet stay; only files deleted from disk go.
+    gone = [
+        row.pk
+        for row in KnowledgeDocument.objects.only("pk", "name")
+        if not os.path.isfile(os.path.join(directory, row.name))
+    ]
+    KnowledgeDocument.objects.filter(pk__in=gone).delete()
@@ -1,11 +1,20 @@
 import json
 import os
+import time
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
 from ai_hub.services.agent import run_compliance_agent
 
+from ._evaluation import (
+    add_pool_arguments,
+    format_throughput,
+    map_ordered,
+    read_jsonl,
+    throughput_summary,
+)
+
 
 MISSING_MAP = {
     "diagnosis present": "Diagnosis",
@@ -17,6 +26,9 @@ MISSING_MAP = {
 class Command(BaseCommand):
     help = "Evaluate the compliance agent using a small local dataset."
 
+    def add_arguments(self, parser):
+        add_pool_arguments(parser)
+
     def handle(self, *args, **options):
         eval_path = os.path.join(
             settings.BASE_DIR, "ai_hub", "eval", "compliance_eval_set.jsonl"
@@ -27,46 +39,22 @@ class Command(BaseCommand):
             )
             return
 
-        results = []
-        total_score = 0
-        total_hit_rate = 0
-        count = 0
-
-        with open(eval_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                payload = json.loads(line)
-                draft = payload.get("draft", "")
-                expected_missing = payload.get("expected_missing", [])
-
-                result = run_compliance_agent(draft, use_llm=False)
-                missing = _extract_missing(result.get("steps", []))
-
-                correct = 0
-                for item in expected_missing:
-                    if item in missing:
-                        correct += 1
-                score = correct
-                hit_rate = round(correct / len(expected_missing), 3) if expected_missing else 0
-
-                results.append(
-                    {
-                        "expected_missing": expected_missing,
-                        "missing_found": missing,
-                        "score": score,
-                        "hit_rate": hit_rate,
-                    }
-                )
-                total_score += score
-                total_hit_rate += hit_rate
-                count += 1
+        payloads = read_jsonl(eval_path, options["limit"])
+        start = time.perf_counter()
+        results = map_ordered(_evaluate, payloads, options["workers"])
+        throughput = throughput_summary(
+            [r["latency_ms"] for r in results], time.perf_counter() - start
+        )
 
+        count = len(results)
+        total_score = sum(r["score"] for r in results)
+        total_hit_rate = sum(r["hit_rate"] for r in results)
         summary = {
             "avg_score": round(total_score / count, 3) if count else 0.0,
             "avg_hit_rate": round(total_hit_rate / count, 3) if count else 0.0,
             "count": count,
+            "workers": options["workers"],
+            **throughput,
             "results": results,
         }
 
@@ -78,6 +66,31 @@ class Command(BaseCommand):
         self.stdout.write(
             f"Compliance eval complete. Avg score: {summary['avg_score']}. Output: {out_path}"
         )
+        self.stdout.write(f"Throughput: {format_throughput(throughput)}")
+
+
+def _evaluate(payload):
+    draft = payload.get("draft", "")
+    expected_missing = payload.get("expected_missing", [])
+
+    start = time.perf_counter()
+    result = run_compliance_agent(draft, use_llm=False)
+    latency_ms = round((time.perf_counter() - start) * 1000, 3)
+    missing = _extract_missing(result.get("steps", []))
+
+    correct = 0
+    for item in expected_missing:
+        if item in missing:
+            correct += 1
+    hit_rate = round(correct / len(expected_missing), 3) if expected_missing else 0
+
+    return {
+        "expected_missing": expected_missing,
+        "missing_found": missing,
+        "score": correct,
+        "hit_rate": hit_rate,
+        "latency_ms": latency_ms,
+    }
 
 
 def _extract_missing(steps):
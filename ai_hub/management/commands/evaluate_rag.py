@@ -2,15 +2,49 @@ import json
 import os
 import time
 
+import numpy as np
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from ai_hub.services.rag import retrieve
+from ai_hub.services.rag import (
+    retrieve_many,
+    load_index,
+    query_vectors,
+    score_matrix,
+    set_search_params,
+    top_k_indices,
+)
+
+from ._evaluation import (
+    add_pool_arguments,
+    format_throughput,
+    map_ordered,
+    read_jsonl,
+    throughput_summary,
+)
+
+
+NPROBE_GRID = (1, 2, 4, 8, 16, 32, 64, 128)
+EF_SEARCH_GRID = (16, 32, 64, 128, 256, 512)
 
 
 class Command(BaseCommand):
     help = "Evaluate RAG retrieval on a small local dataset."
 
+    def add_arguments(self, parser):
+        add_pool_arguments(parser)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=32,
+            help="Questions per retrieve_many call; batches are spread over --workers.",
+        )
+        parser.add_argument(
+            "--sweep",
+            action="store_true",
+            help="Also report recall@k vs latency over nprobe/efSearch values for the FAISS index.",
+        )
+
     def handle(self, *args, **options):
         eval_path = os.path.join(settings.BASE_DIR, "ai_hub", "eval", "rag_eval_set.jsonl")
         if not os.path.exists(eval_path):
@@ -19,56 +53,76 @@ class Command(BaseCommand):
 
         total = 0
         passed = 0
-        latency_sum = 0
         failures = []
         results = []
 
-        with open(eval_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                payload = json.loads(line)
-                question = payload.get("question", "")
-                expected = payload.get("expected_keywords", [])
-                min_hits = int(payload.get("min_hits", 1))
-
-                citations, latency_ms = retrieve(question, top_k=3)
-                latency_sum += latency_ms
-
-                combined = " ".join(
-                    [
-                        f"{c.get('text', '')} {c.get('snippet', '')}"
-                        for c in citations
-                    ]
-                ).lower()
-
-                hits = 0
-                for kw in expected:
-                    if kw.lower() in combined:
-                        hits += 1
-                is_pass = hits >= min_hits
-                total += 1
-                if is_pass:
-                    passed += 1
-                else:
-                    failures.append({"question": question, "hits": hits})
-
-                results.append(
-                    {
-                        "question": question,
-                        "hits": hits,
-                        "min_hits": min_hits,
-                        "pass": is_pass,
-                        "latency_ms": latency_ms,
-                    }
-                )
+        payloads = read_jsonl(eval_path, options["limit"])
+        questions = [payload.get("question", "") for payload in payloads]
+        batch_size = max(1, options["batch_size"])
+        batches = [questions[i : i + batch_size] for i in range(0, len(questions), batch_size)]
+
+        # Questions are retrieved a batch at a time, so with --batch-size > 1 a
+        # question's latency is its batch time divided by the batch size
+        # (latency_basis "amortized"); --batch-size 1 times every query.
+        start = time.perf_counter()
+        batch_results = map_ordered(
+            lambda batch: retrieve_many(batch, top_k=3), batches, options["workers"]
+        )
+        elapsed = time.perf_counter() - start
+        all_citations = []
+        batch_latencies = []
+        latencies = []
+        for batch, (citations, batch_latency_ms) in zip(batches, batch_results):
+            all_citations.extend(citations)
+            batch_latencies.append(batch_latency_ms)
+            latencies.extend([batch_latency_ms / len(batch)] * len(batch))
+        throughput = throughput_summary(latencies, elapsed)
+
+        for payload, question, citations, latency in zip(
+            payloads, questions, all_citations, latencies
+        ):
+            expected = payload.get("expected_keywords", [])
+            min_hits = int(payload.get("min_hits", 1))
+
+            combined = " ".join(
+                [
+                    f"{c.get('text', '')} {c.get('snippet', '')}"
+                    for c in citations
+                ]
+            ).lower()
+
+            hits = 0
+            for kw in expected:
+                if kw.lower() in combined:
+                    hits += 1
+            is_pass = hits >= min_hits
+            total += 1
+            if is_pass:
+                passed += 1
+            else:
+                failures.append({"question": question, "hits": hits})
+
+            results.append(
+                {
+                    "question": question,
+                    "hits": hits,
+                    "min_hits": min_hits,
+                    "pass": is_pass,
+                    "latency_ms": round(latency, 3),
+                }
+            )
 
         pass_rate = round(passed / total, 3) if total else 0.0
-        avg_latency_ms = int(latency_sum / total) if total else 0
+        avg_latency_ms = int(sum(latencies) / total) if total else 0
         summary = {
             "pass_rate": pass_rate,
             "avg_latency_ms": avg_latency_ms,
+            "latency_basis": "per_query" if batch_size == 1 else "amortized",
+            "batch_latencies_ms": batch_latencies,
+            "wall_time_ms": round(elapsed * 1000, 3),
+            "workers": options["workers"],
+            "batch_size": batch_size,
+            **throughput,
             "failing_count": len(failures),
             "failures": failures[:3],
             "results": results,
@@ -80,3 +134,69 @@ class Command(BaseCommand):
             json.dump(summary, f, indent=2, ensure_ascii=True)
 
         self.stdout.write(f"RAG eval complete. Pass rate: {pass_rate}. Output: {out_path}")
+        self.stdout.write(f"Throughput: {format_throughput(throughput, per='query' if batch_size == 1 else 'query (amortized)')}")
+
+        if options["sweep"]:
+            self._sweep([r["question"] for r in results], top_k=3)
+
+    def _sweep(self, questions, top_k):
+        loaded = load_index()
+        index = loaded["index"]
+        meta = loaded["meta"]
+        if index is None:
+            self.stderr.write("Sweep needs a FAISS index. Set RAG_PROVIDER=faiss and rebuild.")
+            return
+
+        q_vecs = query_vectors(meta["vectorizer"], questions)
+        exact = top_k_indices(score_matrix(meta["vectors"], q_vecs), top_k)
+        truth = [set(int(i) for i in row) for row in exact]
+        dense = q_vecs.toarray().astype("float32")
+        dense_queries = [dense[i : i + 1] for i in range(len(questions))]
+
+        params = meta.get("faiss_params", {})
+        if params.get("type") == "ivf":
+            grid = [{"nprobe": n} for n in NPROBE_GRID if n < params["nlist"]]
+            grid.append({"nprobe": params["nlist"]})
+        elif params.get("type") == "hnsw":
+            grid = [{"ef_search": ef} for ef in EF_SEARCH_GRID]
+        else:
+            grid = [{}]
+
+        rows = []
+        for knobs in grid:
+            set_search_params(index, **knobs)
+            latencies = []
+            recalls = []
+            for q, expected in zip(dense_queries, truth):
+                start = time.perf_counter()
+                _, indices = index.search(q, top_k)
+                latencies.append((time.perf_counter() - start) * 1000)
+                found = {int(i) for i in indices[0] if i >= 0}
+                recalls.append(len(found & expected) / len(expected) if expected else 1.0)
+            rows.append(
+                {
+                    **knobs,
+                    "recall_at_k": round(float(np.mean(recalls)), 3) if recalls else 0.0,
+                    "avg_latency_ms": round(float(np.mean(latencies)), 3) if latencies else 0.0,
+                    "p95_latency_ms": round(float(np.percentile(latencies, 95)), 3) if latencies else 0.0,
+                }
+            )
+        # Restore the configured query-time settings on the cached index.
+        set_search_params(
+            index,
+            nprobe=getattr(settings, "RAG_FAISS_NPROBE", None),
+            ef_search=getattr(settings, "RAG_FAISS_EF_SEARCH", None),
+        )
+
+        sweep = {"index": params, "top_k": top_k, "queries": len(questions), "results": rows}
+        out_path = os.path.join(settings.AI_HUB_ARTIFACTS_DIR, "rag_ann_sweep_results.json")
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(sweep, f, indent=2, ensure_ascii=True)
+
+        for row in rows:
+            knobs = ", ".join(f"{k}={row[k]}" for k in ("nprobe", "ef_search") if k in row)
+            self.stdout.write(
+                f"{knobs or params.get('type', 'flat')}: recall@{top_k}={row['recall_at_k']} "
+                f"avg={row['avg_latency_ms']}ms p95={row['p95_latency_ms']}ms"
+            )
+        self.stdout.write(f"ANN sweep output: {out_path}")
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_hub.services.risk_scores import SCORE_CHUNK_SIZE, score_upcoming_appointments
+
+
+class Command(BaseCommand):
+    help = "Score every upcoming appointment for no-show risk and cache the results."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=SCORE_CHUNK_SIZE,
+            help="Appointments upserted per bulk_create round.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            stats = score_upcoming_appointments(chunk_size=options["chunk_size"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(
+            f"Scored {stats['scored']} upcoming appointments "
+            f"with model "
+            f"{stats['model_version']} in {stats['total_seconds']}s "
+            f"(inference {stats['score_seconds']}s); "
+            f"removed {stats['removed']} stale scores."
+        )
@@ -0,0 +1,63 @@
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from ai_hub.models import AiPredictionLog
+from ai_hub.services.ml import model_version, predict_departments
+from hospital.models import ConsultationRequest
+
+
+class Command(BaseCommand):
+    help = "Triage consultation request messages in batches and log the predicted departments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--status",
+            default="pending",
+            help="Only triage requests with this status ('all' for every request).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Messages classified per predict_proba call.",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=None, help="Only triage the first N requests."
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        requests = ConsultationRequest.objects.exclude(message="").order_by("pk")
+        if options["status"] != "all":
+            requests = requests.filter(status=options["status"])
+        rows = list(requests.values_list("pk", "message")[: options["limit"]])
+
+        version = model_version("complaint")
+        batch_size = max(1, options["batch_size"])
+        counts = Counter()
+        for offset in range(0, len(rows), batch_size):
+            batch = rows[offset : offset + batch_size]
+            predictions = predict_departments([message for _, message in batch])
+            AiPredictionLog.objects.bulk_create(
+                [
+                    AiPredictionLog(
+                        input_text=message,
+                        predicted_label=label,
+                        confidence=confidence,
+                        metadata={
+                            "consultation_request_id": pk,
+                            "model_version": version,
+                            "source": "bulk_triage",
+                        },
+                    )
+                    for (pk, message), (label, confidence) in zip(batch, predictions)
+                ]
+            )
+            counts.update(label for label, _ in predictions)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"Triaged {len(rows)} consultation requests in {elapsed:.3f}s.")
+        for label, count in counts.most_common():
+            self.stdout.write(f"  {label}: {count}")
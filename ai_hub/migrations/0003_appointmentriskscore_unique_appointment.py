@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+
+def drop_duplicate_scores(apps, schema_editor):
+    """Keep only the newest score per appointment before adding the constraint."""
+    AppointmentRiskScore = apps.get_model("ai_hub", "AppointmentRiskScore")
+    seen = set()
+    stale = []
+    for pk, appointment_id in AppointmentRiskScore.objects.order_by(
+        "appointment_id", "-computed_at", "-pk"
+    ).values_list("pk", "appointment_id"):
+        if appointment_id in seen:
+            stale.append(pk)
+        else:
+            seen.add(appointment_id)
+    for start in range(0, len(stale), 500):
+        AppointmentRiskScore.objects.filter(pk__in=stale[start : start + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_hub", "0002_airequesttrace"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_scores, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="appointmentriskscore",
+            name="appointment_id",
+            field=models.IntegerField(unique=True),
+        ),
+    ]
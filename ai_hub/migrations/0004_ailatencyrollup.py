@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_hub", "0003_appointmentriskscore_unique_appointment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AiLatencyRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("minute", models.DateTimeField(db_index=True)),
+                ("operation_type", models.CharField(max_length=50)),
+                ("llm_provider", models.CharField(blank=True, max_length=50)),
+                ("route", models.CharField(max_length=200)),
+                ("count", models.IntegerField(default=0)),
+                ("error_count", models.IntegerField(default=0)),
+                ("latency_sum_ms", models.BigIntegerField(default=0)),
+                ("max_latency_ms", models.IntegerField(default=0)),
+                ("histogram", models.JSONField(blank=True, default=dict)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="ailatencyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("minute", "operation_type", "llm_provider", "route"),
+                name="ai_latency_rollup_key",
+            ),
+        ),
+    ]
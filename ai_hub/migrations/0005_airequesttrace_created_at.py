@@ -0,0 +1,17 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_hub", "0004_ailatencyrollup"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="airequesttrace",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
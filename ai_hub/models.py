@@ -37,7 +37,7 @@ class AiDraft(models.Model):
 
 
 class AppointmentRiskScore(models.Model):
-    appointment_id = models.IntegerField()
+    appointment_id = models.IntegerField(unique=True)
     risk_score = models.FloatField()
     computed_at = models.DateTimeField(default=timezone.now)
 
@@ -86,4 +86,27 @@ class AiRequestTrace(models.Model):
     success = models.BooleanField(default=True)
     error_message = models.TextField(blank=True)
     metadata = models.JSONField(default=dict, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set from the trace itself: buffered rows are saved after the request.
+    created_at = models.DateTimeField(default=timezone.now)
+
+
+class AiLatencyRollup(models.Model):
+    """One minute of AiRequestTrace latencies for an operation/provider/route."""
+
+    minute = models.DateTimeField(db_index=True)
+    operation_type = models.CharField(max_length=50)
+    llm_provider = models.CharField(max_length=50, blank=True)
+    route = models.CharField(max_length=200)
+    count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    latency_sum_ms = models.BigIntegerField(default=0)
+    max_latency_ms = models.IntegerField(default=0)
+    histogram = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["minute", "operation_type", "llm_provider", "route"],
+                name="ai_latency_rollup_key",
+            )
+        ]
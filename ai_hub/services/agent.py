@@ -1,51 +1,255 @@
+"""Policy compliance agent, run as a small dependency graph of steps.
+
+PLAN, RETRIEVE and VALIDATE do not depend on each other and run
+concurrently; REPORT waits for RETRIEVE. Every step has its own timeout
+(AGENT_STEP_TIMEOUTS) and records its latency, both counted from when a
+worker starts it. A step that times out or fails is reported with that
+status and its dependents run without its output.
+"""
+import asyncio
+import threading
 import time
-from typing import Dict, List
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List
+
+from django.conf import settings
 
 from .rag import retrieve
-from .llm import generate_text
+from .llm import agenerate_text, generate_text
+
+
+PLAN = [
+    "Check required sections (diagnosis, treatment, medications, follow-up).",
+    "Check safety language and red flags.",
+    "Check patient-friendly instructions.",
+    "Check provider sign-off.",
+]
+RETRIEVAL_QUERY = (
+    "discharge summary SOP required sections medication list follow-up "
+    "red flags sign-off privacy clinician review"
+)
+# Step name -> steps whose output it needs, in report order.
+STEP_DEPENDENCIES = {
+    "PLAN": (),
+    "RETRIEVE": (),
+    "VALIDATE": (),
+    "REPORT": ("RETRIEVE",),
+}
+# How often the sync runner checks whether queued steps have started.
+QUEUE_POLL_SECONDS = 0.05
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
 
 
 def run_compliance_agent(draft_text: str, use_llm: bool = True) -> Dict:
+    """Run the step graph on the shared thread pool."""
     start = time.time()
-    steps = []
+    pool = _executor()
+    timeouts = _step_timeouts()
+    results: Dict[str, Dict] = {}
+    running = {}
+    # Set by the worker when a step actually starts, so time spent queued
+    # behind other requests' steps does not count against its budget.
+    began: Dict[str, float] = {}
+
+    while len(results) < len(STEP_DEPENDENCIES):
+        for name in _ready_steps(results, running.values()):
+            future = pool.submit(_run_timed, began, name, draft_text, dict(results), use_llm)
+            running[future] = name
+
+        deadlines = [began[name] + timeouts[name] for name in running.values() if name in began]
+        timeout = max(0.0, min(deadlines) - time.perf_counter()) if deadlines else None
+        if len(deadlines) < len(running):
+            timeout = min(timeout, QUEUE_POLL_SECONDS) if timeout is not None else QUEUE_POLL_SECONDS
+        done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = running.pop(future)
+            try:
+                results[name] = _record(name, future.result(), began[name])
+            except Exception as exc:
+                results[name] = _failed(
+                    name, "error", f"Step failed: {exc}", began.get(name, time.perf_counter())
+                )
+        now = time.perf_counter()
+        for future, name in list(running.items()):
+            if name in began and now >= began[name] + timeouts[name]:
+                # The thread cannot be interrupted; its result is discarded.
+                del running[future]
+                results[name] = _failed(
+                    name, "timeout", f"Timed out after {timeouts[name]:g}s.", began[name]
+                )
+
+    return _result(results, start)
+
+
+async def arun_compliance_agent(draft_text: str, use_llm: bool = True) -> Dict:
+    """Async counterpart of run_compliance_agent for the async views.
+
+    Sync steps run on the shared thread pool; the REPORT call awaits the
+    provider without holding the event loop and is cancelled on timeout.
+    """
+    start = time.time()
+    timeouts = _step_timeouts()
+    results: Dict[str, Dict] = {}
+    tasks = {}
+
+    while len(results) < len(STEP_DEPENDENCIES):
+        for name in _ready_steps(results, tasks.values()):
+            step = _arun_step(name, draft_text, dict(results), use_llm, timeouts[name])
+            tasks[asyncio.ensure_future(step)] = name
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            name = tasks.pop(task)
+            results[name] = task.result()
+
+    return _result(results, start)
+
+
+async def _arun_step(name: str, draft_text: str, done: Dict, use_llm: bool, timeout: float) -> Dict:
+    if name == "REPORT" and use_llm:
+        start = time.perf_counter()
+        call = _areport(draft_text, done)
+    else:
+        loop = asyncio.get_running_loop()
+        began = loop.create_future()
+
+        def run():
+            loop.call_soon_threadsafe(_set_began, began, time.perf_counter())
+            return _STEPS[name](draft_text, done, use_llm)
+
+        call = loop.run_in_executor(_executor(), run)
+        # The budget starts when a worker picks the step up, not while it queues.
+        start = await began
+    try:
+        remaining = max(0.0, start + timeout - time.perf_counter())
+        return _record(name, await asyncio.wait_for(call, remaining), start)
+    except asyncio.TimeoutError:
+        return _failed(name, "timeout", f"Timed out after {timeout:g}s.", start)
+    except Exception as exc:
+        return _failed(name, "error", f"Step failed: {exc}", start)
+
+
+def _run_timed(began: Dict[str, float], name: str, *args) -> Dict:
+    began[name] = time.perf_counter()
+    return _STEPS[name](*args)
+
+
+def _set_began(future: asyncio.Future, started_at: float) -> None:
+    if not future.done():
+        future.set_result(started_at)
+
+
+def _plan(draft_text: str, done: Dict, use_llm: bool) -> Dict:
+    return {"output": "\n".join(PLAN)}
+
+
+def _retrieve(draft_text: str, done: Dict, use_llm: bool) -> Dict:
+    citations, _ = retrieve(RETRIEVAL_QUERY, top_k=3)
+    cite_text = _cite_text(citations)
+    return {
+        "output": cite_text or "No citations found.",
+        "citations": citations,
+        "cite_text": cite_text,
+    }
+
+
+def _validate(draft_text: str, done: Dict, use_llm: bool) -> Dict:
+    return {"output": _checklist(draft_text)}
+
+
+def _report(draft_text: str, done: Dict, use_llm: bool) -> Dict:
+    if not use_llm:
+        return {"output": "Mock compliance report."}
+    return {"output": generate_text(_report_prompt(draft_text, done))}
 
-    plan = [
-        "Check required sections (diagnosis, treatment, medications, follow-up).",
-        "Check safety language and red flags.",
-        "Check patient-friendly instructions.",
-        "Check provider sign-off.",
+
+async def _areport(draft_text: str, done: Dict) -> Dict:
+    return {"output": await agenerate_text(_report_prompt(draft_text, done))}
+
+
+_STEPS = {
+    "PLAN": _plan,
+    "RETRIEVE": _retrieve,
+    "VALIDATE": _validate,
+    "REPORT": _report,
+}
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=int(getattr(settings, "AGENT_MAX_WORKERS", 8)),
+                    thread_name_prefix="agent-step",
+                )
+    return _EXECUTOR
+
+
+def _step_timeouts() -> Dict[str, float]:
+    return settings.AGENT_STEP_TIMEOUTS
+
+
+def _ready_steps(results: Dict, running: Iterable[str]) -> List[str]:
+    submitted = set(results).union(running)
+    return [
+        name
+        for name, deps in STEP_DEPENDENCIES.items()
+        if name not in submitted and all(dep in results for dep in deps)
     ]
-    steps.append({"step": "PLAN", "output": "\n".join(plan)})
 
-    retrieval_query = (
-        "discharge summary SOP required sections medication list follow-up "
-        "red flags sign-off privacy clinician review"
-    )
-    citations, _ = retrieve(retrieval_query, top_k=3)
-    cite_text = "\n".join(
-        [f"- {c['source']}: {c['snippet']}" for c in citations]
-    )
-    steps.append({"step": "RETRIEVE", "output": cite_text or "No citations found."})
 
+def _record(name: str, values: Dict, start: float) -> Dict:
+    return {
+        **values,
+        "step": name,
+        "status": "success",
+        "latency_ms": int((time.perf_counter() - start) * 1000),
+    }
+
+
+def _failed(name: str, status: str, message: str, start: float) -> Dict:
+    return {
+        "step": name,
+        "output": message,
+        "status": status,
+        "latency_ms": int((time.perf_counter() - start) * 1000),
+    }
+
+
+def _result(results: Dict[str, Dict], start: float) -> Dict:
+    steps = [
+        {key: results[name][key] for key in ("step", "output", "status", "latency_ms")}
+        for name in STEP_DEPENDENCIES
+    ]
+    return {
+        "steps": steps,
+        "latency_ms": int((time.time() - start) * 1000),
+        "citations": results["RETRIEVE"].get("citations", []),
+    }
+
+
+def _cite_text(citations: List[Dict]) -> str:
+    return "\n".join([f"- {c['source']}: {c['snippet']}" for c in citations])
+
+
+def _checklist(draft_text: str) -> str:
+    lowered = draft_text.lower()
     checklist = [
-        "Diagnosis present: " + ("yes" if "diagnos" in draft_text.lower() else "no"),
-        "Follow-up present: " + ("yes" if "follow" in draft_text.lower() else "no"),
-        "Medication list present: " + ("yes" if "med" in draft_text.lower() else "no"),
+        "Diagnosis present: " + ("yes" if "diagnos" in lowered else "no"),
+        "Follow-up present: " + ("yes" if "follow" in lowered else "no"),
+        "Medication list present: " + ("yes" if "med" in lowered else "no"),
     ]
-    steps.append({"step": "VALIDATE", "output": "\n".join(checklist)})
+    return "\n".join(checklist)
 
-    report_prompt = (
+
+def _report_prompt(draft_text: str, done: Dict) -> str:
+    cite_text = done.get("RETRIEVE", {}).get("cite_text", "")
+    return (
         "Review the discharge summary for policy compliance. "
         "List issues with severity and suggest edits.\n\n"
         f"Summary:\n{draft_text}\n"
         f"Policy snippets:\n{cite_text}\n"
     )
-    report = generate_text(report_prompt) if use_llm else "Mock compliance report."
-    steps.append({"step": "REPORT", "output": report})
-
-    total_latency_ms = int((time.time() - start) * 1000)
-    return {
-        "steps": steps,
-        "latency_ms": total_latency_ms,
-        "citations": citations,
-    }
@@ -0,0 +1,41 @@
+import hashlib
+import json
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+CACHE_ALIAS = "ai_hub"
+
+
+def answer_cache_key(
+    query: str, redact: bool, model: str, provider: str, index_version: str
+) -> str:
+    normalized = " ".join(query.lower().split())
+    payload = json.dumps([normalized, redact, model, provider, index_version])
+    return "rag_qa:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_answer(key: str) -> Optional[Dict]:
+    if not getattr(settings, "RAG_ANSWER_CACHE_ENABLED", False):
+        return None
+    return caches[CACHE_ALIAS].get(key)
+
+
+def set_cached_answer(key: str, answer: str, citations) -> None:
+    if not getattr(settings, "RAG_ANSWER_CACHE_ENABLED", False):
+        return
+    caches[CACHE_ALIAS].set(key, {"answer": answer, "citations": citations})
+
+
+async def aget_cached_answer(key: str) -> Optional[Dict]:
+    if not getattr(settings, "RAG_ANSWER_CACHE_ENABLED", False):
+        return None
+    return await caches[CACHE_ALIAS].aget(key)
+
+
+async def aset_cached_answer(key: str, answer: str, citations) -> None:
+    if not getattr(settings, "RAG_ANSWER_CACHE_ENABLED", False):
+        return
+    await caches[CACHE_ALIAS].aset(key, {"answer": answer, "citations": citations})
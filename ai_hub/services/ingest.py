@@ -0,0 +1,134 @@
+"""File reading and PDF text extraction for the RAG index.
+
+Kept free of Django imports so the functions can run in pool workers.
+"""
+import hashlib
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+from pypdf import PdfReader
+
+
+SUPPORTED_EXTENSIONS = (".txt", ".pdf")
+# Smallest page range handed to one worker; below this pool overhead dominates.
+PDF_PAGES_PER_TASK = 8
+
+
+def read_txt(path: str) -> str:
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def read_pdf_pages(path: str, start: int, stop: int) -> List[str]:
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def make_document(path: str, text: str, pages: int = 0) -> Dict:
+    stat = os.stat(path)
+    checksum = hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+    return {
+        "name": os.path.basename(path),
+        "path": path,
+        "text": text,
+        "checksum": checksum,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "pages": pages,
+    }
+
+
+def read_document(path: str) -> Optional[Dict]:
+    name = os.path.basename(path).lower()
+    if name.endswith(".txt"):
+        return make_document(path, read_txt(path))
+    if name.endswith(".pdf"):
+        pages = [page.extract_text() or "" for page in PdfReader(path).pages]
+        return make_document(path, "\n".join(pages), pages=len(pages))
+    return None
+
+
+def list_documents(directory: str) -> List[str]:
+    paths = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path) and name.lower().endswith(SUPPORTED_EXTENSIONS):
+            paths.append(path)
+    return paths
+
+
+def new_stats() -> Dict:
+    return {"files": 0, "pages": 0, "bytes": 0, "seconds": 0.0}
+
+
+def format_stats(stats: Dict) -> str:
+    seconds = stats["seconds"] or 1e-9
+    return (
+        f"Read {stats['files']} files, {stats['pages']} PDF pages, "
+        f"{stats['bytes'] / (1024 * 1024):.2f} MB in {stats['seconds']:.2f}s "
+        f"({stats['pages'] / seconds:.1f} pages/sec, "
+        f"{stats['bytes'] / (1024 * 1024) / seconds:.2f} MB/sec)."
+    )
+
+
+def iter_documents(
+    directory: str, workers: int = 1, stats: Optional[Dict] = None
+) -> Iterator[Dict]:
+    """Yield documents in directory order as their text becomes available."""
+    return read_documents(list_documents(directory), workers=workers, stats=stats)
+
+
+def read_documents(
+    paths: List[str], workers: int = 1, stats: Optional[Dict] = None
+) -> Iterator[Dict]:
+    """Yield a document for each path, in order.
+
+    With workers > 1, files are read and PDF pages extracted on a process
+    pool; large PDFs are split into page ranges so a single file spreads
+    across workers. If a stats dict is given it is updated with file, page,
+    byte and elapsed-time totals.
+    """
+    start = time.perf_counter()
+    if workers <= 1:
+        for path in paths:
+            doc = read_document(path)
+            _update_stats(stats, doc, start)
+            yield doc
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = []
+        for path in paths:
+            if path.lower().endswith(".pdf"):
+                page_count = len(PdfReader(path).pages)
+                step = max(PDF_PAGES_PER_TASK, math.ceil(page_count / workers))
+                futures = [
+                    pool.submit(read_pdf_pages, path, first, min(first + step, page_count))
+                    for first in range(0, page_count, step)
+                ]
+            else:
+                futures = [pool.submit(read_txt, path)]
+            jobs.append((path, futures))
+
+        for path, futures in jobs:
+            if path.lower().endswith(".pdf"):
+                pages = []
+                for future in futures:
+                    pages.extend(future.result())
+                doc = make_document(path, "\n".join(pages), pages=len(pages))
+            else:
+                doc = make_document(path, futures[0].result())
+            _update_stats(stats, doc, start)
+            yield doc
+
+
+def _update_stats(stats: Optional[Dict], doc: Dict, start: float) -> None:
+    if stats is None:
+        return
+    stats["files"] += 1
+    stats["bytes"] += doc["size"]
+    stats["pages"] += doc["pages"]
+    stats["seconds"] = time.perf_counter() - start
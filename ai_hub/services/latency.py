@@ -0,0 +1,223 @@
+"""Latency histograms and minute rollups over AI request traces.
+
+Each process folds traces into in-memory log-bucketed histograms keyed by
+(minute, operation_type, llm_provider, route). Buckets grow by
+HISTOGRAM_GROWTH, so any percentile read back is within ~2% of the true
+value whatever the range, and histograms from different minutes or
+processes merge by adding bucket counts. Pending minutes are merged into
+AiLatencyRollup every AI_LATENCY_ROLLUP_INTERVAL seconds, and the dashboard
+reads only that table.
+"""
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from ..models import AiLatencyRollup
+
+logger = logging.getLogger(__name__)
+
+HISTOGRAM_GROWTH = 1.02
+_LOG_GROWTH = math.log(HISTOGRAM_GROWTH)
+PERCENTILES = (50, 95, 99)
+
+RollupKey = Tuple[datetime, str, str, str]
+
+
+class LatencyHistogram:
+    """Sparse log-bucketed histogram of millisecond latencies."""
+
+    def __init__(self, buckets: Dict[int, int] = None):
+        self.buckets: Dict[int, int] = dict(buckets or {})
+        self.count = sum(self.buckets.values())
+
+    @staticmethod
+    def bucket_for(latency_ms: float) -> int:
+        if latency_ms < 1:
+            return 0
+        return int(math.log(latency_ms) / _LOG_GROWTH) + 1
+
+    @staticmethod
+    def bucket_value(bucket: int) -> float:
+        """Upper edge of a bucket, in milliseconds."""
+        return 0.0 if bucket == 0 else HISTOGRAM_GROWTH**bucket
+
+    def record(self, latency_ms: float, count: int = 1) -> None:
+        bucket = self.bucket_for(latency_ms)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += count
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100.0))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return round(self.bucket_value(bucket), 1)
+        return round(self.bucket_value(max(self.buckets)), 1)
+
+    def to_json(self) -> Dict[str, int]:
+        return {str(bucket): count for bucket, count in self.buckets.items()}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, int]) -> "LatencyHistogram":
+        return cls({int(bucket): count for bucket, count in (data or {}).items()})
+
+
+class _Pending:
+    __slots__ = ("histogram", "errors", "latency_sum", "max_latency")
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.latency_sum = 0
+        self.max_latency = 0
+
+
+class LatencyAggregator:
+    """In-memory rollups for this process, persisted by merge into the table."""
+
+    def __init__(self, interval: float = 60.0):
+        self.interval = interval
+        self._pending: Dict[RollupKey, _Pending] = {}
+        self._lock = threading.Lock()
+        self._last_persist = time.monotonic()
+
+    def record(self, row: Dict) -> None:
+        created = row.get("created_at")
+        when = datetime.fromisoformat(created) if created else timezone.now()
+        key = (
+            when.replace(second=0, microsecond=0),
+            row["operation_type"],
+            row.get("llm_provider", ""),
+            row["route"][:200],
+        )
+        latency = int(row.get("latency_ms") or 0)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = _Pending()
+            pending.histogram.record(latency)
+            pending.errors += 0 if row.get("success", True) else 1
+            pending.latency_sum += latency
+            pending.max_latency = max(pending.max_latency, latency)
+
+    def record_many(self, rows: Iterable[Dict]) -> None:
+        for row in rows:
+            self.record(row)
+
+    def persist_if_due(self) -> int:
+        if time.monotonic() - self._last_persist < self.interval:
+            return 0
+        return self.persist()
+
+    def persist(self) -> int:
+        """Merge every pending minute into AiLatencyRollup; returns rows touched."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_persist = time.monotonic()
+        for key, values in pending.items():
+            try:
+                _merge_rollup(key, values)
+            except Exception:
+                logger.exception("Could not persist latency rollup %s", key)
+        return len(pending)
+
+
+def _merge_rollup(key: RollupKey, values: _Pending) -> None:
+    minute, operation_type, llm_provider, route = key
+    lookup = {
+        "minute": minute,
+        "operation_type": operation_type,
+        "llm_provider": llm_provider,
+        "route": route,
+    }
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                rollup = AiLatencyRollup.objects.select_for_update().filter(**lookup).first()
+                if rollup is None:
+                    rollup = AiLatencyRollup(**lookup)
+                    histogram = LatencyHistogram()
+                else:
+                    histogram = LatencyHistogram.from_json(rollup.histogram)
+                histogram.merge(values.histogram)
+                rollup.histogram = histogram.to_json()
+                rollup.count += values.histogram.count
+                rollup.error_count += values.errors
+                rollup.latency_sum_ms += values.latency_sum
+                rollup.max_latency_ms = max(rollup.max_latency_ms, values.max_latency)
+                rollup.save()
+            return
+        except IntegrityError:
+            # Another process created the same minute first; merge into its row.
+            if attempt:
+                raise
+
+
+def latency_summary(minutes: int = 60, now=None) -> List[Dict]:
+    """p50/p95/p99, error rate and volume per operation/provider/route."""
+    now = now or timezone.now()
+    since = (now - timedelta(minutes=minutes)).replace(second=0, microsecond=0)
+    groups: Dict[Tuple[str, str, str], Dict] = {}
+    for rollup in AiLatencyRollup.objects.filter(minute__gte=since).iterator():
+        key = (rollup.operation_type, rollup.llm_provider, rollup.route)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                "histogram": LatencyHistogram(),
+                "count": 0,
+                "errors": 0,
+                "latency_sum": 0,
+                "max": 0,
+            }
+        group["histogram"].merge(LatencyHistogram.from_json(rollup.histogram))
+        group["count"] += rollup.count
+        group["errors"] += rollup.error_count
+        group["latency_sum"] += rollup.latency_sum_ms
+        group["max"] = max(group["max"], rollup.max_latency_ms)
+
+    rows = []
+    for (operation_type, llm_provider, route), group in sorted(groups.items()):
+        histogram = group["histogram"]
+        row = {
+            "operation_type": operation_type,
+            "llm_provider": llm_provider,
+            "route": route,
+            "count": group["count"],
+            "error_rate": round(group["errors"] / group["count"], 4) if group["count"] else 0.0,
+            "avg_ms": round(group["latency_sum"] / group["count"], 1) if group["count"] else 0.0,
+            "max_ms": group["max"],
+        }
+        for pct in PERCENTILES:
+            row[f"p{pct}_ms"] = histogram.percentile(pct)
+        rows.append(row)
+    return rows
+
+
+_AGGREGATOR = None
+_AGGREGATOR_LOCK = threading.Lock()
+
+
+def aggregator() -> LatencyAggregator:
+    global _AGGREGATOR
+    if _AGGREGATOR is None:
+        with _AGGREGATOR_LOCK:
+            if _AGGREGATOR is None:
+                _AGGREGATOR = LatencyAggregator(
+                    interval=float(getattr(settings, "AI_LATENCY_ROLLUP_INTERVAL", 60))
+                )
+    return _AGGREGATOR
@@ -1,8 +1,12 @@
 import os
 import time
-import requests
+from typing import Iterator
+
 from django.conf import settings
 
+from .llm_client import _openai_stream, stream_words
+from .llm_sessions import get_session, post_json, request_timeout
+
 
 def _mock_response(prompt: str) -> str:
     return (
@@ -12,15 +16,8 @@ def _mock_response(prompt: str) -> str:
     )
 
 
-def generate_text(prompt: str, system: str = "") -> str:
-    provider = getattr(settings, "LLM_PROVIDER", "mock")
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    if provider == "mock" or not api_key:
-        return _mock_response(prompt)
-
-    start = time.time()
-    url = "https://api.openai.com/v1/chat/completions"
-    payload = {
+def _payload(prompt: str, system: str) -> dict:
+    return {
         "model": "gpt-4o-mini",
         "messages": [
             {"role": "system", "content": system or "You are a helpful assistant."},
@@ -28,10 +25,49 @@ def generate_text(prompt: str, system: str = "") -> str:
         ],
         "temperature": 0.2,
     }
+
+
+def _chat_url() -> str:
+    base_url = getattr(settings, "OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+    return f"{base_url}/chat/completions"
+
+
+def generate_text(prompt: str, system: str = "") -> str:
+    provider = getattr(settings, "LLM_PROVIDER", "mock")
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    if provider == "mock" or not api_key:
+        return _mock_response(prompt)
+
+    start = time.time()
     headers = {"Authorization": f"Bearer {api_key}"}
-    response = requests.post(url, json=payload, headers=headers, timeout=30)
+    response = get_session("openai").post(
+        _chat_url(), json=_payload(prompt, system), headers=headers, timeout=request_timeout()
+    )
     response.raise_for_status()
     data = response.json()
     content = data["choices"][0]["message"]["content"]
     _ = int((time.time() - start) * 1000)
     return content
+
+
+async def agenerate_text(prompt: str, system: str = "") -> str:
+    """Async counterpart of generate_text."""
+    provider = getattr(settings, "LLM_PROVIDER", "mock")
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    if provider == "mock" or not api_key:
+        return _mock_response(prompt)
+
+    headers = {"Authorization": f"Bearer {api_key}"}
+    data = await post_json("openai", _chat_url(), _payload(prompt, system), headers)
+    return data["choices"][0]["message"]["content"]
+
+
+def stream_text(prompt: str, system: str = "") -> Iterator[str]:
+    """Streaming counterpart of generate_text; yields content as it arrives."""
+    provider = getattr(settings, "LLM_PROVIDER", "mock")
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    if provider == "mock" or not api_key:
+        yield from stream_words(_mock_response(prompt))
+        return
+
+    yield from _openai_stream(_payload(prompt, system), api_key)
@@ -1,10 +1,16 @@
+import asyncio
+import json
 import logging
+import re
 import time
-from typing import Optional
+from typing import Iterator, Optional, Tuple
 
+import aiohttp
 import requests
 from django.conf import settings
 
+from .llm_sessions import get_openai_client, get_session, post_json, request_timeout
+
 logger = logging.getLogger(__name__)
 
 
@@ -12,25 +18,93 @@ def generate_answer(prompt: str, model: str, provider: str) -> str:
     if getattr(settings, "AI_MOCK_MODE", False):
         return _mock_response(prompt)
 
+    provider, api_key = _provider_credentials(provider)
+    if provider == "openai":
+        return _openai_answer(prompt, model, api_key)
+    return _anthropic_answer(prompt, model, api_key)
+
+
+async def agenerate_answer(prompt: str, model: str, provider: str) -> str:
+    """Async counterpart of generate_answer on a pooled aiohttp session.
+
+    The event loop is free while the provider responds, so one worker can
+    keep many calls in flight.
+    """
+    if getattr(settings, "AI_MOCK_MODE", False):
+        return _mock_response(prompt)
+
+    provider, api_key = _provider_credentials(provider)
+    if provider == "openai":
+        data = await _aretry(
+            lambda: post_json(
+                provider,
+                f"{_openai_base_url()}/chat/completions",
+                _openai_payload(prompt, model),
+                {"Authorization": f"Bearer {api_key}"},
+            )
+        )
+        return data["choices"][0]["message"]["content"]
+
+    data = await _aretry(
+        lambda: post_json(
+            provider,
+            f"{_anthropic_base_url()}/messages",
+            _anthropic_payload(prompt, model),
+            _anthropic_headers(api_key),
+        )
+    )
+    return _anthropic_text(data)
+
+
+def stream_answer(prompt: str, model: str, provider: str) -> Iterator[str]:
+    """Yield the answer in pieces as the provider streams it (SSE).
+
+    Configuration errors raise ValueError on the first next() call.
+    """
+    if getattr(settings, "AI_MOCK_MODE", False):
+        yield from stream_words(_mock_response(prompt))
+        return
+
+    provider, api_key = _provider_credentials(provider)
+    if provider == "openai":
+        yield from _openai_stream(_openai_payload(prompt, model), api_key)
+    else:
+        yield from _anthropic_stream(prompt, model, api_key)
+
+
+def _provider_credentials(provider: str) -> Tuple[str, str]:
     provider = (provider or "openai").strip().lower()
     if provider == "openai":
         api_key = getattr(settings, "OPENAI_API_KEY", "")
         if not api_key:
             logger.error("OpenAI API key missing. Set OPENAI_API_KEY.")
             raise ValueError("LLM is not configured. Set OPENAI_API_KEY and redeploy.")
-        return _openai_answer(prompt, model, api_key)
+        return provider, api_key
 
     if provider == "anthropic":
         api_key = getattr(settings, "ANTHROPIC_API_KEY", "")
         if not api_key:
             logger.error("Anthropic API key missing. Set ANTHROPIC_API_KEY.")
             raise ValueError("LLM is not configured. Set ANTHROPIC_API_KEY and redeploy.")
-        return _anthropic_answer(prompt, model, api_key)
+        return provider, api_key
 
     logger.error("Unsupported LLM_PROVIDER=%s", provider)
     raise ValueError("LLM provider is not supported. Set LLM_PROVIDER correctly.")
 
 
+def stream_words(text: str) -> Iterator[str]:
+    """Split text into word-sized pieces so mock output streams like a provider."""
+    for piece in re.findall(r"\S+\s*|\s+", text):
+        yield piece
+
+
+def iter_sse_data(response) -> Iterator[str]:
+    """Yield the data field of each server-sent event in a streamed response."""
+    for line in response.iter_lines(decode_unicode=True):
+        if line and line.startswith("data:"):
+            yield line[5:].strip()
+
+
 def _mock_response(prompt: str) -> str:
     return (
         "Mock response generated. Summary:\n"
@@ -41,8 +115,7 @@ def _mock_response(prompt: str) -> str:
 
 def _openai_answer(prompt: str, model: str, api_key: str) -> str:
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key)
+        client = get_openai_client(api_key)
         return _openai_sdk_call(client, prompt, model)
     except Exception:
         return _openai_http_call(prompt, model, api_key)
@@ -62,9 +135,8 @@ def _openai_sdk_call(client, prompt: str, model: str) -> str:
     return response.choices[0].message.content
 
 
-def _openai_http_call(prompt: str, model: str, api_key: str) -> str:
-    url = "https://api.openai.com/v1/chat/completions"
-    payload = {
+def _openai_payload(prompt: str, model: str) -> dict:
+    return {
         "model": model,
         "messages": [
             {"role": "system", "content": _system_instructions()},
@@ -72,39 +144,103 @@ def _openai_http_call(prompt: str, model: str, api_key: str) -> str:
         ],
         "temperature": 0.2,
     }
+
+
+def _openai_http_call(prompt: str, model: str, api_key: str) -> str:
+    url = f"{_openai_base_url()}/chat/completions"
+    payload = _openai_payload(prompt, model)
     headers = {"Authorization": f"Bearer {api_key}"}
+    session = get_session("openai")
     response = _retry(
-        lambda: requests.post(url, json=payload, headers=headers, timeout=30)
+        lambda: session.post(url, json=payload, headers=headers, timeout=request_timeout())
     )
     response.raise_for_status()
     data = response.json()
     return data["choices"][0]["message"]["content"]
 
 
-def _anthropic_answer(prompt: str, model: str, api_key: str) -> str:
-    url = "https://api.anthropic.com/v1/messages"
-    payload = {
+def _anthropic_payload(prompt: str, model: str) -> dict:
+    return {
         "model": model or "claude-3-5-sonnet-20240620",
         "max_tokens": 512,
         "system": _system_instructions(),
         "messages": [{"role": "user", "content": prompt}],
     }
-    headers = {
+
+
+def _anthropic_headers(api_key: str) -> dict:
+    return {
         "x-api-key": api_key,
         "anthropic-version": "2023-06-01",
         "content-type": "application/json",
     }
-    response = _retry(
-        lambda: requests.post(url, json=payload, headers=headers, timeout=30)
-    )
-    response.raise_for_status()
-    data = response.json()
+
+
+def _anthropic_text(data: dict) -> str:
     content = data.get("content", [])
     if content:
         return content[0].get("text", "")
     return ""
 
 
+def _anthropic_answer(prompt: str, model: str, api_key: str) -> str:
+    url = f"{_anthropic_base_url()}/messages"
+    payload = _anthropic_payload(prompt, model)
+    headers = _anthropic_headers(api_key)
+    session = get_session("anthropic")
+    response = _retry(
+        lambda: session.post(url, json=payload, headers=headers, timeout=request_timeout())
+    )
+    response.raise_for_status()
+    return _anthropic_text(response.json())
+
+
+def _openai_stream(payload: dict, api_key: str) -> Iterator[str]:
+    url = f"{_openai_base_url()}/chat/completions"
+    headers = {"Authorization": f"Bearer {api_key}"}
+    session = get_session("openai")
+    response = _retry(
+        lambda: session.post(
+            url,
+            json={**payload, "stream": True},
+            headers=headers,
+            timeout=request_timeout(),
+            stream=True,
+        )
+    )
+    with response:
+        response.raise_for_status()
+        for data in iter_sse_data(response):
+            if data == "[DONE]":
+                break
+            choices = json.loads(data).get("choices") or [{}]
+            content = choices[0].get("delta", {}).get("content")
+            if content:
+                yield content
+
+
+def _anthropic_stream(prompt: str, model: str, api_key: str) -> Iterator[str]:
+    url = f"{_anthropic_base_url()}/messages"
+    payload = {**_anthropic_payload(prompt, model), "stream": True}
+    headers = _anthropic_headers(api_key)
+    session = get_session("anthropic")
+    response = _retry(
+        lambda: session.post(
+            url, json=payload, headers=headers, timeout=request_timeout(), stream=True
+        )
+    )
+    with response:
+        response.raise_for_status()
+        for data in iter_sse_data(response):
+            event = json.loads(data)
+            if event.get("type") == "message_stop":
+                break
+            if event.get("type") == "content_block_delta":
+                text = event.get("delta", {}).get("text")
+                if text:
+                    yield text
+
+
 def _retry(callable_fn):
     last_exc: Optional[Exception] = None
     for _ in range(2):
@@ -118,6 +254,25 @@ def _retry(callable_fn):
     return callable_fn()
 
 
+async def _aretry(make_request):
+    last_exc: Optional[Exception] = None
+    for _ in range(2):
+        try:
+            return await make_request()
+        except aiohttp.ClientConnectionError as exc:
+            last_exc = exc
+            await asyncio.sleep(0.5)
+    raise last_exc
+
+
+def _openai_base_url() -> str:
+    return getattr(settings, "OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+
+
+def _anthropic_base_url() -> str:
+    return getattr(settings, "ANTHROPIC_BASE_URL", "https://api.anthropic.com/v1").rstrip("/")
+
+
 def _system_instructions() -> str:
     return (
         "You are a clinical assistant. Use only the provided context. "
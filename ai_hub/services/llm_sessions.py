@@ -0,0 +1,136 @@
+"""Per-process registry of pooled HTTP sessions and SDK clients for LLM providers.
+
+Clients are created lazily on first use, after gunicorn has forked, and then
+reused so calls share keep-alive connections instead of paying a new TCP+TLS
+handshake each time.
+
+Async sessions are bound to the event loop that created them, so they are kept
+per loop: under ASGI that is one pool per worker shared by every request.
+"""
+import asyncio
+import threading
+from typing import Dict, Tuple
+
+import aiohttp
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+_SESSIONS: Dict[str, requests.Session] = {}
+_SDK_CLIENTS: Dict[Tuple[str, str], object] = {}
+_ASYNC_SESSIONS: Dict[asyncio.AbstractEventLoop, Dict[str, aiohttp.ClientSession]] = {}
+_ASYNC_CLOSERS: Dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+_LOCK = threading.Lock()
+
+
+def request_timeout() -> Tuple[float, float]:
+    """(connect, read) timeout in seconds for provider HTTP calls."""
+    return (
+        float(getattr(settings, "LLM_CONNECT_TIMEOUT", 5)),
+        float(getattr(settings, "LLM_READ_TIMEOUT", 30)),
+    )
+
+
+def get_session(provider: str) -> requests.Session:
+    session = _SESSIONS.get(provider)
+    if session is not None:
+        return session
+    with _LOCK:
+        session = _SESSIONS.get(provider)
+        if session is None:
+            pool_size = int(getattr(settings, "LLM_HTTP_POOL_SIZE", 10))
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSIONS[provider] = session
+    return session
+
+
+def get_openai_client(api_key: str):
+    """Shared OpenAI SDK client; raises ImportError when the SDK is missing."""
+    key = ("openai", api_key)
+    client = _SDK_CLIENTS.get(key)
+    if client is not None:
+        return client
+    with _LOCK:
+        client = _SDK_CLIENTS.get(key)
+        if client is None:
+            import httpx
+            from openai import OpenAI
+
+            connect, read = request_timeout()
+            pool_size = int(getattr(settings, "LLM_HTTP_POOL_SIZE", 10))
+            client = OpenAI(
+                api_key=api_key,
+                base_url=getattr(settings, "OPENAI_BASE_URL", None),
+                timeout=httpx.Timeout(read, connect=connect),
+                http_client=httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=pool_size,
+                        max_keepalive_connections=pool_size,
+                    ),
+                ),
+            )
+            _SDK_CLIENTS[key] = client
+    return client
+
+
+def get_async_session(provider: str) -> aiohttp.ClientSession:
+    """Pooled aiohttp session for provider on the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        sessions = _ASYNC_SESSIONS.get(loop)
+        if sessions is None:
+            sessions = _ASYNC_SESSIONS[loop] = {}
+            _ASYNC_CLOSERS[loop] = loop.create_task(_close_with_loop(loop, sessions))
+        session = sessions.get(provider)
+        if session is None:
+            connect, read = request_timeout()
+            pool_size = int(getattr(settings, "LLM_ASYNC_POOL_SIZE", 100))
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=pool_size),
+                timeout=aiohttp.ClientTimeout(sock_connect=connect, sock_read=read),
+            )
+            sessions[provider] = session
+    return session
+
+
+async def post_json(provider: str, url: str, payload: dict, headers: dict) -> dict:
+    async with get_async_session(provider).post(url, json=payload, headers=headers) as response:
+        response.raise_for_status()
+        return await response.json()
+
+
+async def _close_with_loop(loop: asyncio.AbstractEventLoop, sessions: Dict) -> None:
+    # asyncio.run() cancels leftover tasks before closing the loop, which is
+    # how both uvicorn and async_to_sync (async views under WSGI) shut down.
+    try:
+        await loop.create_future()
+    finally:
+        with _LOCK:
+            if _ASYNC_SESSIONS.get(loop) is sessions:
+                del _ASYNC_SESSIONS[loop]
+                del _ASYNC_CLOSERS[loop]
+        for session in sessions.values():
+            await session.close()
+
+
+def reset_clients() -> None:
+    """Close and forget every pooled client (tests, or after settings change)."""
+    with _LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
+        for client in _SDK_CLIENTS.values():
+            close = getattr(client, "close", None)
+            if close:
+                close()
+        _SDK_CLIENTS.clear()
+        # Async sessions can only be closed on their own loop; cancelling the
+        # closer there does it, and the next call builds a fresh pool.
+        for loop, closer in _ASYNC_CLOSERS.items():
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(closer.cancel)
+        _ASYNC_SESSIONS.clear()
+        _ASYNC_CLOSERS.clear()
@@ -1,9 +1,15 @@
+import logging
 import os
 import random
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
 import joblib
 import numpy as np
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 
 NO_SHOW_MODEL_PATH = os.path.join(
     settings.AI_HUB_ARTIFACTS_DIR, "no_show_model.joblib"
@@ -11,12 +17,78 @@ NO_SHOW_MODEL_PATH = os.path.join(
 COMPLAINT_MODEL_PATH = os.path.join(
     settings.AI_HUB_ARTIFACTS_DIR, "complaint_classifier.joblib"
 )
+MODEL_NAMES = ("no_show", "complaint")
 
+# Process-wide model registry: name -> {"model", "version", "signature"}.
+_MODELS: Dict[str, Dict] = {}
+_MODELS_LOCK = threading.Lock()
 
-def load_no_show_model():
-    if not os.path.exists(NO_SHOW_MODEL_PATH):
+
+def _model_path(name: str) -> str:
+    return NO_SHOW_MODEL_PATH if name == "no_show" else COMPLAINT_MODEL_PATH
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
         return None
-    return joblib.load(NO_SHOW_MODEL_PATH)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def get_model(name: str) -> Dict:
+    """Return the registry entry for name, reloading only when the file changes."""
+    path = _model_path(name)
+    signature = _signature(path)
+    cached = _MODELS.get(name)
+    if cached is not None and cached["signature"] == signature:
+        return cached
+
+    with _MODELS_LOCK:
+        cached = _MODELS.get(name)
+        if cached is not None and cached["signature"] == signature:
+            return cached
+        entry = {
+            "model": joblib.load(path) if signature else None,
+            "version": int(signature[0] // 1_000_000_000) if signature else "missing",
+            "signature": signature,
+        }
+        _MODELS[name] = entry
+        return entry
+
+
+def model_version(name: str):
+    """Artifact mtime in whole seconds, or "missing" when there is no model."""
+    return get_model(name)["version"]
+
+
+def preload_models() -> None:
+    for name in MODEL_NAMES:
+        try:
+            get_model(name)
+        except Exception:
+            logger.exception("Could not preload %s model", name)
+
+
+def preload_for_server() -> None:
+    """Warm the models in a server process so its first request is fast.
+
+    Called from the ASGI/WSGI entry points rather than AppConfig.ready(), so
+    migrate, collectstatic, test and other management commands skip it.
+    """
+    if getattr(settings, "AI_FEATURES_ENABLED", False) and getattr(
+        settings, "AI_HUB_PRELOAD_MODELS", True
+    ):
+        preload_models()
+
+
+def clear_model_cache() -> None:
+    with _MODELS_LOCK:
+        _MODELS.clear()
+
+
+def load_no_show_model():
+    return get_model("no_show")["model"]
 
 
 def predict_no_show(features: dict) -> float:
@@ -28,16 +100,36 @@ def predict_no_show(features: dict) -> float:
     return float(round(score, 3))
 
 
+def predict_no_show_many(features: np.ndarray) -> np.ndarray:
+    """Score a (n, 2) matrix of [days_until, hour] rows with one predict_proba call."""
+    model = load_no_show_model()
+    if not model:
+        raise ValueError("No no-show model found. Run train_no_show_model first.")
+    if not len(features):
+        return np.empty(0)
+    return np.round(model.predict_proba(features)[:, 1], 3)
+
+
 def load_complaint_classifier():
-    if not os.path.exists(COMPLAINT_MODEL_PATH):
-        return None
-    return joblib.load(COMPLAINT_MODEL_PATH)
+    return get_model("complaint")["model"]
 
 
 def predict_department(text: str):
+    return predict_departments([text])[0]
+
+
+def predict_departments(texts: Sequence[str]) -> List[Tuple[str, float]]:
+    """Label many complaints with one transform and one predict_proba call.
+
+    The label is the argmax of each probability row and the confidence is
+    that row's maximum, so predict is never run separately.
+    """
     model = load_complaint_classifier()
     if not model:
-        return "General", 0.5
-    pred = model.predict([text])[0]
-    proba = max(model.predict_proba([text])[0])
-    return pred, float(round(proba, 3))
+        return [("General", 0.5)] * len(texts)
+    if not len(texts):
+        return []
+    proba = model.predict_proba(list(texts))
+    labels = model.classes_[proba.argmax(axis=1)]
+    confidences = np.round(proba.max(axis=1), 3)
+    return [(str(label), float(conf)) for label, conf in zip(labels, confidences)]
@@ -1,16 +1,44 @@
+"""Request tracing for ai_hub views.
+
+Every trace becomes an AiRequestTrace row and a line in ai_traces.jsonl.
+With AI_TRACE_BUFFERED (the default) the request thread only enqueues the
+trace; a background writer drains the queue, bulk_creates the rows and
+appends to a kept-open JSONL file that is flushed every
+AI_TRACE_FLUSH_INTERVAL seconds and rotated at AI_TRACE_FILE_MAX_BYTES.
+Each process writes its own ai_traces.<pid>.jsonl, so workers never rotate
+a file another worker is appending to.
+When the queue is full, callers wait up to AI_TRACE_ENQUEUE_TIMEOUT and then
+write the trace themselves, so a slow database slows requests down instead
+of dropping traces. The queue is drained on interpreter shutdown.
+
+Written traces are also folded into the latency rollups (services.latency).
+"""
+import atexit
 import json
+import logging
 import os
+import queue
+import threading
+import time
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from django.conf import settings
+from django.db import close_old_connections, connection
 
 from ai_hub.models import AiRequestTrace
 
+from .latency import aggregator
+
+logger = logging.getLogger(__name__)
+
 
 TRACE_FILE = os.path.join(settings.AI_HUB_ARTIFACTS_DIR, "ai_traces.jsonl")
 
+_SINK = None
+_SINK_LOCK = threading.Lock()
+
 
 def new_request_id() -> uuid.UUID:
     return uuid.uuid4()
@@ -59,6 +87,12 @@ def trace_error(
     )
 
 
+def flush_traces(timeout: float = 5.0) -> bool:
+    """Block until every queued trace is written; True if the queue drained."""
+    sink = _SINK
+    return sink.flush(timeout) if sink else True
+
+
 def _persist_trace(
     *,
     request_id: uuid.UUID,
@@ -70,33 +104,52 @@ def _persist_trace(
     error_message: str,
     metadata: Dict[str, Any],
 ):
-    trace = AiRequestTrace.objects.create(
-        request_id=request_id,
-        user=user if user and getattr(user, "is_authenticated", False) else None,
-        route=route,
-        operation_type=operation_type,
-        llm_provider=getattr(settings, "LLM_PROVIDER", ""),
-        rag_provider=getattr(settings, "RAG_PROVIDER", ""),
-        latency_ms=latency_ms,
-        success=success,
-        error_message=error_message,
-        metadata=metadata,
-    )
-    _write_jsonl(
-        {
-            "request_id": str(request_id),
-            "user_id": trace.user_id,
-            "route": route,
-            "operation_type": operation_type,
-            "llm_provider": trace.llm_provider,
-            "rag_provider": trace.rag_provider,
-            "latency_ms": latency_ms,
-            "success": success,
-            "error_message": error_message,
-            "metadata": metadata,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
-    )
+    row = {
+        "request_id": str(request_id),
+        "user_id": user.pk if user and getattr(user, "is_authenticated", False) else None,
+        "route": route,
+        "operation_type": operation_type,
+        "llm_provider": getattr(settings, "LLM_PROVIDER", ""),
+        "rag_provider": getattr(settings, "RAG_PROVIDER", ""),
+        "latency_ms": latency_ms,
+        "success": success,
+        "error_message": error_message,
+        "metadata": metadata,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if getattr(settings, "AI_TRACE_BUFFERED", True):
+        _sink().put(row)
+    else:
+        _write_inline(row)
+
+
+def _write_inline(row: Dict[str, Any], append=None) -> None:
+    _save_rows([row])
+    (append or _write_jsonl)(row)
+    rollups = aggregator()
+    rollups.record(row)
+    rollups.persist_if_due()
+
+
+def _trace_model(row: Dict[str, Any]) -> AiRequestTrace:
+    fields = dict(row)
+    fields["created_at"] = datetime.fromisoformat(row["created_at"])
+    return AiRequestTrace(**fields)
+
+
+def _save_rows(rows: List[Dict[str, Any]]) -> None:
+    if len(rows) == 1:
+        _trace_model(rows[0]).save()
+        return
+    try:
+        AiRequestTrace.objects.bulk_create([_trace_model(row) for row in rows])
+    except Exception:
+        # One bad row (e.g. a duplicate request_id) must not lose the batch.
+        for row in rows:
+            try:
+                _trace_model(row).save()
+            except Exception:
+                logger.exception("Could not save trace %s", row["request_id"])
 
 
 def _write_jsonl(payload: Dict[str, Any]) -> None:
@@ -106,3 +159,191 @@ def _write_jsonl(payload: Dict[str, Any]) -> None:
             f.write(json.dumps(payload, ensure_ascii=True) + "\n")
     except Exception:
         pass
+
+
+def process_trace_file(pid: Optional[int] = None) -> str:
+    """Buffered trace file of one process (ai_traces.<pid>.jsonl)."""
+    root, ext = os.path.splitext(TRACE_FILE)
+    return f"{root}.{pid or os.getpid()}{ext}"
+
+
+def _sink() -> "BufferedTraceSink":
+    global _SINK
+    # A sink inherited across fork has no writer thread; start a new one.
+    if _SINK is None or _SINK.pid != os.getpid():
+        with _SINK_LOCK:
+            if _SINK is None or _SINK.pid != os.getpid():
+                _SINK = BufferedTraceSink(
+                    process_trace_file(),
+                    max_queue=int(getattr(settings, "AI_TRACE_QUEUE_SIZE", 10000)),
+                    batch_size=int(getattr(settings, "AI_TRACE_BATCH_SIZE", 200)),
+                    flush_interval=float(getattr(settings, "AI_TRACE_FLUSH_INTERVAL", 1.0)),
+                    max_bytes=int(getattr(settings, "AI_TRACE_FILE_MAX_BYTES", 50 * 1024 * 1024)),
+                    backups=int(getattr(settings, "AI_TRACE_FILE_BACKUPS", 5)),
+                    enqueue_timeout=float(getattr(settings, "AI_TRACE_ENQUEUE_TIMEOUT", 0.5)),
+                )
+                atexit.register(_SINK.close)
+    return _SINK
+
+
+class BufferedTraceSink:
+    """Queue of trace rows drained by one daemon writer thread."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_bytes: int = 50 * 1024 * 1024,
+        backups: int = 5,
+        enqueue_timeout: float = 0.5,
+    ):
+        self.path = path
+        self.pid = os.getpid()
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue)
+        self._file = None
+        # Shared by the writer thread and callers writing inline, so lines
+        # from both go through one handle and never interleave.
+        self._file_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="ai-trace-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, row: Dict[str, Any]) -> None:
+        if self._closed:
+            _write_inline(row, append=self._append_inline)
+            return
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+        except queue.Full:
+            # Backpressure: the writer is behind, so this request pays for its own trace.
+            logger.warning("Trace queue full; writing trace %s inline", row["request_id"])
+            _write_inline(row, append=self._append_inline)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Trace queue still full at shutdown; some traces were not written")
+            return
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._flush_file()
+                self._persist_rollups(force=False)
+                continue
+            taken = 1
+            if first is None:
+                stopping = True
+            else:
+                batch.append(first)
+            while not stopping and len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if row is None:
+                    stopping = True
+                else:
+                    batch.append(row)
+            try:
+                if batch:
+                    self._write_batch(batch)
+                if stopping or time.monotonic() - self._last_flush >= self.flush_interval:
+                    self._flush_file()
+                    self._persist_rollups(force=stopping)
+            except Exception:
+                logger.exception("Trace writer failed on a batch of %d", len(batch))
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        connection.close()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            with self._file_lock:
+                for row in batch:
+                    self._open_file().write(json.dumps(row, ensure_ascii=True) + "\n")
+        except Exception:
+            logger.exception("Could not append traces to %s", self.path)
+        close_old_connections()
+        _save_rows(batch)
+        aggregator().record_many(batch)
+
+    def _persist_rollups(self, force: bool) -> None:
+        try:
+            close_old_connections()
+            if force:
+                aggregator().persist()
+            else:
+                aggregator().persist_if_due()
+        except Exception:
+            logger.exception("Could not persist latency rollups")
+
+    def _open_file(self):
+        if self._file is not None and self._file.tell() >= self.max_bytes:
+            self._rotate()
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def _append_inline(self, row: Dict[str, Any]) -> None:
+        try:
+            with self._file_lock:
+                handle = self._open_file()
+                handle.write(json.dumps(row, ensure_ascii=True) + "\n")
+                # The writer thread may already be closed; nothing else will flush.
+                handle.flush()
+        except Exception:
+            logger.exception("Could not append trace %s to %s", row["request_id"], self.path)
+
+    def _flush_file(self) -> None:
+        with self._file_lock:
+            if self._file is not None:
+                self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
@@ -1,7 +1,9 @@
 import hashlib
 import os
+import threading
 import time
-from typing import List, Dict, Tuple
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Optional, Sequence, Tuple
 
 import joblib
 import numpy as np
@@ -13,135 +15,493 @@ try:
 except Exception:
     FAISS_AVAILABLE = False
 
-from pypdf import PdfReader
-from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 from sklearn.preprocessing import normalize
 
+from .ingest import iter_documents, list_documents, read_documents
+from .rag_store import open_store, remove_stale_stores, write_store
+
 
 RAG_INDEX_PATH = os.path.join(settings.AI_HUB_ARTIFACTS_DIR, "rag_index.faiss")
 RAG_META_PATH = os.path.join(settings.AI_HUB_ARTIFACTS_DIR, "rag_meta.joblib")
+RAG_STORE_DIR = os.path.join(settings.AI_HUB_ARTIFACTS_DIR, "rag_store")
+STORE_FAISS_FILE = "index.faiss"
 
+# Process-wide cache of the loaded index, keyed on the artifact signature so a
+# rebuild by build_rag_index is picked up on the next retrieve() call.
+_INDEX_CACHE: Dict = {}
+_INDEX_LOCK = threading.Lock()
 
-def _read_txt(path: str) -> str:
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        return f.read()
+# Chunks vectorized per transform() call when streaming.
+VECTORIZE_BATCH_SIZE = 512
 
 
-def _read_pdf(path: str) -> str:
-    reader = PdfReader(path)
-    parts = []
-    for page in reader.pages:
-        parts.append(page.extract_text() or "")
-    return "\n".join(parts)
+def load_docs_from_dir(
+    directory: str, workers: int = 1, stats: Optional[Dict] = None
+) -> List[Dict]:
+    return list(iter_documents(directory, workers=workers, stats=stats))
 
 
-def load_docs_from_dir(directory: str) -> List[Dict]:
-    docs = []
-    for name in os.listdir(directory):
-        path = os.path.join(directory, name)
-        if not os.path.isfile(path):
-            continue
-        if name.lower().endswith(".txt"):
-            text = _read_txt(path)
-        elif name.lower().endswith(".pdf"):
-            text = _read_pdf(path)
-        else:
-            continue
-        checksum = hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
-        docs.append({"name": name, "path": path, "text": text, "checksum": checksum})
-    return docs
+# Preferred chunk endings, strongest first: paragraph, sentence, line.
+_CHUNK_BOUNDARIES = ("\n\n", ". ", "? ", "! ", "\n")
 
 
-def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100) -> List[str]:
-    chunks = []
+def iter_chunks(text: str, chunk_size: int = 800, overlap: int = 100) -> Iterator[str]:
+    """Yield chunks of at most chunk_size characters, ending on a paragraph
+    or sentence boundary when one falls in the back half of the window."""
     start = 0
-    while start < len(text):
-        end = start + chunk_size
-        chunks.append(text[start:end])
-        start = end - overlap
-        if start < 0:
-            start = 0
-    return [c.strip() for c in chunks if c.strip()]
+    length = len(text)
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            end = _chunk_boundary(text, start + chunk_size // 2, end)
+        chunk = text[start:end].strip()
+        if chunk:
+            yield chunk
+        if end >= length:
+            break
+        start = max(end - overlap, start + 1)
+
+
+def _chunk_boundary(text: str, earliest: int, end: int) -> int:
+    for sep in _CHUNK_BOUNDARIES:
+        pos = text.rfind(sep, earliest, end)
+        if pos != -1:
+            return pos + len(sep)
+    return end
+
+
+def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100) -> List[str]:
+    return list(iter_chunks(text, chunk_size=chunk_size, overlap=overlap))
+
+
+def _iter_chunk_rows(docs: Iterable[Dict]) -> Iterator[Tuple[str, Dict]]:
+    for doc in docs:
+        for chunk in iter_chunks(doc["text"]):
+            yield chunk, {"source": doc["name"], "path": doc["path"]}
 
 
-def build_index(docs: List[Dict], top_k: int = 3) -> Dict:
+def _new_vectorizer():
+    if getattr(settings, "RAG_VECTORIZER", "tfidf") == "hashing":
+        return HashingVectorizer(
+            stop_words="english",
+            alternate_sign=False,
+            n_features=getattr(settings, "RAG_HASHING_FEATURES", 2**18),
+        )
+    return TfidfVectorizer(stop_words="english")
+
+
+def _vectorize(vectorizer, rows: Iterable[Tuple[str, Dict]], fit: bool = False):
+    """Vectorize (chunk, meta) rows into texts, meta and a float32 CSR matrix.
+
+    A stateless vectorizer, or one that is already fitted, consumes the rows
+    in batches so chunk text is only held once. TF-IDF fitting needs the
+    whole corpus up front.
+    """
+    if fit and not isinstance(vectorizer, HashingVectorizer):
+        pairs = list(rows)
+        texts = [text for text, _ in pairs]
+        meta = [row for _, row in pairs]
+        vectors = normalize(vectorizer.fit_transform(texts), norm="l2")
+        return texts, meta, vectors.astype("float32").tocsr()
+
     texts = []
     meta = []
-    for doc in docs:
-        for chunk in chunk_text(doc["text"]):
-            texts.append(chunk)
-            meta.append(
-                {
-                    "source": doc["name"],
-                    "path": doc["path"],
-                    "snippet": chunk[:300],
-                }
-            )
+    blocks = []
+    for batch in _batched(rows, VECTORIZE_BATCH_SIZE):
+        batch_texts = [text for text, _ in batch]
+        vectors = normalize(vectorizer.transform(batch_texts), norm="l2")
+        blocks.append(vectors.astype("float32"))
+        texts.extend(batch_texts)
+        meta.extend(row for _, row in batch)
+    if not blocks:
+        n_features = getattr(vectorizer, "n_features", None) or len(vectorizer.vocabulary_)
+        blocks.append(sparse.csr_matrix((0, n_features), dtype="float32"))
+    return texts, meta, sparse.vstack(blocks, format="csr")
+
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
 
-    vectorizer = TfidfVectorizer(stop_words="english")
-    vectors = vectorizer.fit_transform(texts)
-    vectors = normalize(vectors, norm="l2")
-    vectors_dense = vectors.toarray().astype("float32")
 
-    index = None
-    if settings.RAG_PROVIDER == "faiss" and FAISS_AVAILABLE:
-        index = faiss.IndexFlatIP(vectors_dense.shape[1])
-        index.add(vectors_dense)
-        faiss.write_index(index, RAG_INDEX_PATH)
+def _document_record(doc: Dict) -> Dict:
+    return {
+        "path": doc["path"],
+        "checksum": doc.get("checksum", ""),
+        "mtime_ns": doc.get("mtime_ns"),
+        "size": doc.get("size"),
+    }
 
+
+def build_index(docs: Iterable[Dict], top_k: int = 3) -> Dict:
+    # docs may be a generator (iter_documents); chunk while recording each one.
+    documents = {}
+
+    def _recorded(items):
+        for doc in items:
+            documents[doc["name"]] = _document_record(doc)
+            yield doc
+
+    vectorizer = _new_vectorizer()
+    texts, meta, vectors = _vectorize(
+        vectorizer, _iter_chunk_rows(_recorded(docs)), fit=True
+    )
+
+    _write_artifacts(vectorizer, texts, meta, vectors, documents, incremental_updates=0)
+    return {"count": len(texts), "top_k": top_k, "documents": len(documents)}
+
+
+def update_index(
+    directory: str, top_k: int = 3, workers: int = 1, stats: Optional[Dict] = None
+) -> Dict:
+    """Re-embed only documents whose checksum changed since the last build.
+
+    Chunks of unchanged documents keep their stored vectors, chunks of
+    deleted or changed documents are dropped, and new chunks are vectorized
+    with the existing vocabulary. Files whose mtime or size moved are read
+    on the same pool as a full build. Falls back to a full build when there
+    is no previous index to extend.
+
+    A fitted TF-IDF vocabulary and its IDF weights are not updated, so terms
+    that only appear in re-embedded documents are dropped until the next
+    refit; every RAG_TFIDF_REFIT_EVERY incremental updates the index is
+    rebuilt from scratch. The hashing vectorizer has no vocabulary and never
+    needs a refit.
+    """
+    previous = _load_meta()
+    if not previous or "documents" not in previous or _refit_due(previous):
+        docs = load_docs_from_dir(directory, workers=workers, stats=stats)
+        result = build_index(docs, top_k=top_k) if docs else {"count": 0, "top_k": top_k}
+        result.update(
+            {"added": len(docs), "removed": 0, "unchanged": 0, "full_rebuild": True}
+        )
+        return result
+
+    known = previous["documents"]
+    documents = {}
+    changed = []
+    to_read = []
+    for path in list_documents(directory):
+        name = os.path.basename(path)
+        record = known.get(name)
+        stat = os.stat(path)
+        if (
+            record
+            and record.get("mtime_ns") == stat.st_mtime_ns
+            and record.get("size") == stat.st_size
+        ):
+            documents[name] = record
+        else:
+            to_read.append(path)
+    for doc in read_documents(to_read, workers=workers, stats=stats):
+        record = known.get(doc["name"])
+        documents[doc["name"]] = _document_record(doc)
+        if not record or record["checksum"] != doc["checksum"]:
+            changed.append(doc)
+
+    stale = {name for name in known if name not in documents}
+    stale.update(doc["name"] for doc in changed)
+    keep = [i for i, row in enumerate(previous["meta"]) if row["source"] not in stale]
+    texts = [previous["texts"][i] for i in keep]
+    meta = [previous["meta"][i] for i in keep]
+    vectors = sparse.csr_matrix(previous["vectors"], dtype="float32")[keep]
+
+    vectorizer = previous["vectorizer"]
+    new_texts, new_meta, new_vectors = _vectorize(vectorizer, _iter_chunk_rows(changed))
+    if new_texts:
+        vectors = sparse.vstack([vectors, new_vectors], format="csr")
+        texts.extend(new_texts)
+        meta.extend(new_meta)
+
+    removed = len([name for name in known if name not in documents])
+    # Touched but unchanged files still get their new mtime/size recorded,
+    # otherwise they are re-read and re-hashed on every run.
+    if changed or removed or documents != known:
+        _write_artifacts(
+            vectorizer,
+            texts,
+            meta,
+            vectors,
+            documents,
+            incremental_updates=previous.get("incremental_updates", 0) + bool(changed or removed),
+        )
+    return {
+        "count": len(texts),
+        "top_k": top_k,
+        "added": len(changed),
+        "removed": removed,
+        "unchanged": len(documents) - len(changed),
+        "full_rebuild": False,
+    }
+
+
+def _refit_due(previous: Dict) -> bool:
+    if isinstance(previous["vectorizer"], HashingVectorizer):
+        return False
+    every = getattr(settings, "RAG_TFIDF_REFIT_EVERY", 10)
+    return bool(every) and previous.get("incremental_updates", 0) >= every
+
+
+def _write_artifacts(vectorizer, texts, meta, vectors, documents, incremental_updates=0) -> None:
+    # Chunk data and the FAISS index go into a new version directory; the
+    # manifest rename below is the single switch that makes both live, so a
+    # reader never pairs a new index with an old chunk store.
+    directory = os.path.join(RAG_STORE_DIR, f"{time.time_ns():x}")
+    store = write_store(directory, texts, meta, _store_vectors(vectors))
+    faiss_params = {}
+    # FAISS needs dense rows, which for 2**18 hashed features is ~1MB per
+    # chunk; hashed vectors are searched on the sparse path instead.
+    if (
+        settings.RAG_PROVIDER == "faiss"
+        and FAISS_AVAILABLE
+        and not isinstance(vectorizer, HashingVectorizer)
+    ):
+        index, faiss_params = _new_faiss_index(vectors.toarray())
+        faiss.write_index(index, os.path.join(directory, STORE_FAISS_FILE))
+        store["faiss_index"] = STORE_FAISS_FILE
     joblib.dump(
         {
             "vectorizer": vectorizer,
-            "texts": texts,
-            "meta": meta,
-            "vectors": vectors_dense,
+            "store": store,
+            "documents": documents,
+            "faiss_params": faiss_params,
             "rag_provider": settings.RAG_PROVIDER,
+            "incremental_updates": incremental_updates,
         },
-        RAG_META_PATH,
+        RAG_META_PATH + ".tmp",
+    )
+    os.replace(RAG_META_PATH + ".tmp", RAG_META_PATH)
+    remove_stale_stores(RAG_STORE_DIR, keep=store["directory"])
+
+
+def _new_faiss_index(dense: np.ndarray):
+    """Build the FAISS index selected by RAG_FAISS_INDEX (flat, ivf or hnsw)."""
+    n_rows, dim = dense.shape
+    kind = getattr(settings, "RAG_FAISS_INDEX", "flat")
+    if kind == "ivf":
+        # FAISS wants ~39 training points per centroid.
+        nlist = getattr(settings, "RAG_FAISS_NLIST", 0) or int(4 * np.sqrt(n_rows))
+        nlist = max(1, min(nlist, n_rows // 39))
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        sample_size = min(n_rows, getattr(settings, "RAG_FAISS_TRAIN_SAMPLE", 20000))
+        rng = np.random.default_rng(0)
+        sample = dense[np.sort(rng.choice(n_rows, size=sample_size, replace=False))]
+        index.train(sample)
+        index.add(dense)
+        params = {"type": "ivf", "nlist": nlist, "train_sample": sample_size}
+    elif kind == "hnsw":
+        m = getattr(settings, "RAG_FAISS_HNSW_M", 32)
+        index = faiss.IndexHNSWFlat(dim, m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = getattr(settings, "RAG_FAISS_EF_CONSTRUCTION", 40)
+        index.add(dense)
+        params = {"type": "hnsw", "m": m, "ef_construction": index.hnsw.efConstruction}
+    else:
+        index = faiss.IndexFlatIP(dim)
+        index.add(dense)
+        params = {"type": "flat"}
+    params.update(
+        set_search_params(
+            index,
+            nprobe=getattr(settings, "RAG_FAISS_NPROBE", 8),
+            ef_search=getattr(settings, "RAG_FAISS_EF_SEARCH", 64),
+        )
+    )
+    return index, params
+
+
+def set_search_params(index, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> Dict:
+    """Apply query-time knobs to an IVF or HNSW index; no-op for flat indexes."""
+    applied = {}
+    if nprobe and hasattr(index, "nprobe"):
+        index.nprobe = min(nprobe, index.nlist)
+        applied["nprobe"] = index.nprobe
+    if ef_search and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search
+        applied["ef_search"] = ef_search
+    return applied
+
+
+def _store_vectors(vectors):
+    if getattr(settings, "RAG_VECTOR_STORE", "sparse") == "dense":
+        return vectors.toarray()
+    return vectors
+
+
+def score_matrix(vectors, q_vecs) -> np.ndarray:
+    """Cosine scores of every chunk against each normalized (sparse) query row.
+
+    Returns an array of shape (queries, chunks) from a single matrix product.
+    """
+    if sparse.issparse(vectors):
+        return (q_vecs @ vectors.T).toarray()
+    return q_vecs.toarray().astype("float32") @ vectors.T
+
+
+def similarities(vectors, q_vec) -> np.ndarray:
+    """Cosine scores of every chunk against a single normalized query row."""
+    return score_matrix(vectors, q_vec)[0]
+
+
+def query_vector(vectorizer, query: str):
+    return query_vectors(vectorizer, [query])
+
+
+def query_vectors(vectorizer, queries: Sequence[str]):
+    return normalize(vectorizer.transform(list(queries)), norm="l2")
+
+
+def top_k_indices(sims: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the top_k scores along the last axis, best first, without a full sort."""
+    if top_k <= 0:
+        return np.zeros(sims.shape[:-1] + (0,), dtype=np.int64)
+    if top_k >= sims.shape[-1]:
+        return np.argsort(-sims, axis=-1, kind="stable")
+    candidates = np.argpartition(-sims, top_k - 1, axis=-1)[..., :top_k]
+    order = np.argsort(
+        -np.take_along_axis(sims, candidates, axis=-1), axis=-1, kind="stable"
     )
-    return {"count": len(texts), "top_k": top_k}
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+def _artifact_signature() -> Tuple:
+    # Every build rewrites the manifest, so its stat identifies the index.
+    try:
+        stat = os.stat(RAG_META_PATH)
+    except OSError:
+        return (None,)
+    return ((stat.st_mtime_ns, stat.st_size),)
+
+
+def index_version() -> str:
+    """Short identifier for the index currently on disk."""
+    digest = hashlib.sha1(repr(_artifact_signature()).encode("utf-8"))
+    return digest.hexdigest()[:12]
 
 
 def _load_meta():
     if not os.path.exists(RAG_META_PATH):
         return None
-    return joblib.load(RAG_META_PATH)
+    meta = joblib.load(RAG_META_PATH)
+    store = meta.get("store")
+    if store:
+        # Indexes written before the mmap layout keep texts/meta/vectors inline.
+        meta["texts"], meta["meta"], meta["vectors"] = open_store(
+            os.path.join(RAG_STORE_DIR, store["directory"]), store
+        )
+    return meta
+
+
+def _faiss_index_path(meta) -> Optional[str]:
+    store = meta.get("store")
+    if store and store.get("faiss_index"):
+        return os.path.join(RAG_STORE_DIR, store["directory"], store["faiss_index"])
+    if store:
+        return None
+    # Indexes written before the versioned layout keep one shared FAISS file.
+    return RAG_INDEX_PATH
+
+
+def load_index() -> Dict:
+    """Return the cached index, reloading it only when the artifacts change."""
+    signature = _artifact_signature()
+    cached = _INDEX_CACHE.get("current")
+    if cached is not None and cached["signature"] == signature:
+        return cached
+
+    with _INDEX_LOCK:
+        cached = _INDEX_CACHE.get("current")
+        if cached is not None and cached["signature"] == signature:
+            return cached
+        meta = _load_meta()
+        index = None
+        index_path = _faiss_index_path(meta) if meta else None
+        if (
+            index_path
+            and settings.RAG_PROVIDER == "faiss"
+            and FAISS_AVAILABLE
+            and os.path.exists(index_path)
+        ):
+            index = faiss.read_index(index_path)
+            set_search_params(
+                index,
+                nprobe=getattr(settings, "RAG_FAISS_NPROBE", None),
+                ef_search=getattr(settings, "RAG_FAISS_EF_SEARCH", None),
+            )
+        loaded = {"signature": signature, "meta": meta, "index": index}
+        _INDEX_CACHE["current"] = loaded
+        return loaded
+
+
+def indexed_documents() -> Dict:
+    """Checksums and paths of the documents in the current index, by name."""
+    meta = load_index()["meta"]
+    return dict(meta.get("documents", {})) if meta else {}
+
+
+def clear_index_cache() -> None:
+    with _INDEX_LOCK:
+        _INDEX_CACHE.clear()
 
 
 def retrieve(query: str, top_k: int = 3) -> Tuple[List[Dict], float]:
+    results, latency_ms = retrieve_many([query], top_k=top_k)
+    return (results[0] if results else []), latency_ms
+
+
+def retrieve_many(queries: Sequence[str], top_k: int = 3) -> Tuple[List[List[Dict]], float]:
+    """Retrieve top_k chunks for each query with one transform and one search.
+
+    Returns one result list per query, in order, and the total latency.
+    """
     start = time.time()
-    meta = _load_meta()
+    loaded = load_index()
+    meta = loaded["meta"]
     if not meta:
+        return [[] for _ in queries], 0.0
+    if not queries:
         return [], 0.0
 
     vectorizer = meta["vectorizer"]
-    vectors_dense = meta["vectors"]
+    vectors = meta["vectors"]
     texts = meta["texts"]
     meta_rows = meta["meta"]
 
-    q_vec = vectorizer.transform([query])
-    q_vec = normalize(q_vec, norm="l2").toarray().astype("float32")
+    q_vecs = query_vectors(vectorizer, queries)
 
     scores = None
     indices = None
-    if settings.RAG_PROVIDER == "faiss" and FAISS_AVAILABLE and os.path.exists(RAG_INDEX_PATH):
-        index = faiss.read_index(RAG_INDEX_PATH)
-        scores, indices = index.search(q_vec, top_k)
-    else:
-        sims = np.dot(vectors_dense, q_vec.T).ravel()
-        indices = np.argsort(-sims)[:top_k].reshape(1, -1)
-        scores = sims[indices]
-
-    results = []
-    for score, idx in zip(scores[0], indices[0]):
-        results.append(
-            {
-                "text": texts[idx],
-                "score": float(score),
-                "source": meta_rows[idx]["source"],
-                "snippet": meta_rows[idx]["snippet"],
-            }
+    if loaded["index"] is not None:
+        scores, indices = loaded["index"].search(
+            q_vecs.toarray().astype("float32"), top_k
         )
+    else:
+        sims = score_matrix(vectors, q_vecs)
+        indices = top_k_indices(sims, top_k)
+        scores = np.take_along_axis(sims, indices, axis=-1)
+
+    all_results = []
+    for score_row, index_row in zip(scores, indices):
+        results = []
+        for score, idx in zip(score_row, index_row):
+            if idx < 0:
+                # FAISS pads with -1 when fewer than top_k neighbours are found.
+                continue
+            results.append(
+                {
+                    "text": texts[idx],
+                    "score": float(score),
+                    "source": meta_rows[idx]["source"],
+                    "snippet": meta_rows[idx].get("snippet") or texts[idx][:300],
+                }
+            )
+        all_results.append(results)
 
     latency_ms = int((time.time() - start) * 1000)
-    return results, latency_ms
+    return all_results, latency_ms
@@ -0,0 +1,134 @@
+"""On-disk layout for RAG chunk data that workers can memory-map.
+
+Each build writes a fresh version directory holding:
+
+- ``vectors.npy`` (dense) or ``data.npy``/``indices.npy``/``indptr.npy`` (CSR)
+- ``texts.npy``: UTF-8 chunk texts concatenated into one uint8 blob
+- ``text_offsets.npy``: int64 start offsets into the blob, one per chunk plus the end
+- ``sources.npy``: int32 index into the manifest's source table, one per chunk
+
+Arrays are opened with ``mmap_mode="r"`` so every worker shares the same
+pages through the OS page cache instead of holding a private copy.
+"""
+import os
+import shutil
+from collections.abc import Sequence
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+
+class ChunkTexts(Sequence):
+    """Read-only list of chunk texts backed by the memory-mapped blob."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        idx = range(len(self))[idx]
+        start, end = self._offsets[idx], self._offsets[idx + 1]
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+
+class ChunkMeta(Sequence):
+    """Read-only list of per-chunk meta rows built from the source table."""
+
+    def __init__(self, source_ids: np.ndarray, sources: List[Tuple[str, str]]):
+        self._source_ids = source_ids
+        self._sources = sources
+
+    def __len__(self) -> int:
+        return len(self._source_ids)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        name, path = self._sources[self._source_ids[idx]]
+        return {"source": name, "path": path}
+
+
+def write_store(directory: str, texts, meta, vectors) -> Dict:
+    """Write chunk data into directory and return its manifest entry."""
+    os.makedirs(directory, exist_ok=True)
+
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    np.save(os.path.join(directory, "texts.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+    np.save(os.path.join(directory, "text_offsets.npy"), offsets)
+
+    source_index = {}
+    source_ids = np.empty(len(meta), dtype=np.int32)
+    for i, row in enumerate(meta):
+        key = (row["source"], row["path"])
+        source_ids[i] = source_index.setdefault(key, len(source_index))
+    np.save(os.path.join(directory, "sources.npy"), source_ids)
+
+    if sparse.issparse(vectors):
+        vectors = vectors.tocsr()
+        np.save(os.path.join(directory, "data.npy"), vectors.data)
+        np.save(os.path.join(directory, "indices.npy"), vectors.indices)
+        np.save(os.path.join(directory, "indptr.npy"), vectors.indptr)
+        layout = "csr"
+    else:
+        np.save(os.path.join(directory, "vectors.npy"), np.ascontiguousarray(vectors))
+        layout = "dense"
+
+    return {
+        "directory": os.path.basename(directory),
+        "layout": layout,
+        "shape": tuple(int(n) for n in vectors.shape),
+        "sources": list(source_index),
+    }
+
+
+def open_store(directory: str, manifest: Dict):
+    """Memory-map a store written by write_store; returns (texts, meta, vectors)."""
+    texts = ChunkTexts(
+        _load(os.path.join(directory, "texts.npy")),
+        _load(os.path.join(directory, "text_offsets.npy")),
+    )
+    meta = ChunkMeta(_load(os.path.join(directory, "sources.npy")), manifest["sources"])
+    if manifest["layout"] == "csr":
+        vectors = sparse.csr_matrix(
+            (
+                _load(os.path.join(directory, "data.npy")),
+                _load(os.path.join(directory, "indices.npy")),
+                _load(os.path.join(directory, "indptr.npy")),
+            ),
+            shape=manifest["shape"],
+            copy=False,
+        )
+    else:
+        vectors = _load(os.path.join(directory, "vectors.npy"))
+    return texts, meta, vectors
+
+
+def remove_stale_stores(parent: str, keep: str, previous: int = 1) -> None:
+    """Delete old version directories, sparing keep and the newest previous ones.
+
+    A worker that read the old manifest just before the swap still opens
+    its store; it moves to keep once its cache key changes. Open mmaps stay
+    valid on POSIX even after their directory is deleted.
+    """
+    if not os.path.isdir(parent):
+        return
+    # Directory names are hex build timestamps, so (length, name) sorts by age.
+    older = sorted((name for name in os.listdir(parent) if name != keep), key=lambda n: (len(n), n))
+    for name in older[: max(0, len(older) - previous)]:
+        shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+
+def _load(path: str) -> np.ndarray:
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        # Zero-length arrays cannot be memory-mapped.
+        return np.load(path)
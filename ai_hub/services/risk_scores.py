@@ -0,0 +1,86 @@
+"""Bulk no-show scoring for upcoming appointments.
+
+Features for every upcoming appointment are built as one NumPy matrix and
+scored with a single predict_proba call; results are upserted in chunks
+with bulk_create(update_conflicts=True). Scores for appointments that have
+since been cancelled, moved into the past or deleted are removed in the
+same run.
+"""
+import time
+from typing import Dict
+
+import numpy as np
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from hospital.models import Appointment
+
+from ..models import AppointmentRiskScore
+from .ml import model_version, predict_no_show_many
+
+SCORE_CHUNK_SIZE = 5000
+
+
+def upcoming_appointments(now=None):
+    now = now or timezone.now()
+    return Appointment.objects.filter(date_time__gte=now).exclude(status="cancelled")
+
+
+def feature_matrix(timestamps: np.ndarray, hours: np.ndarray, now) -> np.ndarray:
+    """[days_until, hour] rows, matching the features the model was trained on."""
+    days_until = np.floor((timestamps - now.timestamp()) / 86400)
+    return np.column_stack([days_until, hours]).astype(np.float64)
+
+
+def score_upcoming_appointments(
+    chunk_size: int = SCORE_CHUNK_SIZE, now=None
+) -> Dict:
+    start = time.perf_counter()
+    now = now or timezone.now()
+    tz = timezone.get_current_timezone()
+    rows = list(upcoming_appointments(now).order_by("pk").values_list("pk", "date_time"))
+    count = len(rows)
+    ids = np.fromiter((pk for pk, _ in rows), dtype=np.int64, count=count)
+    timestamps = np.fromiter((dt.timestamp() for _, dt in rows), dtype=np.float64, count=count)
+    # Local hour in Python: ExtractHour runs a per-row function on SQLite.
+    hours = np.fromiter((dt.astimezone(tz).hour for _, dt in rows), dtype=np.float64, count=count)
+    scores = predict_no_show_many(feature_matrix(timestamps, hours, now))
+    scored_at = time.perf_counter()
+
+    for offset in range(0, count, chunk_size):
+        chunk = [
+            AppointmentRiskScore(appointment_id=appointment_id, risk_score=score, computed_at=now)
+            for appointment_id, score in zip(
+                ids[offset : offset + chunk_size].tolist(),
+                scores[offset : offset + chunk_size].tolist(),
+            )
+        ]
+        # One INSERT ... ON CONFLICT DO UPDATE per chunk replaces old scores.
+        with transaction.atomic():
+            AppointmentRiskScore.objects.bulk_create(
+                chunk,
+                batch_size=chunk_size,
+                update_conflicts=True,
+                unique_fields=["appointment_id"],
+                update_fields=["risk_score", "computed_at"],
+            )
+
+    # Cancelled, past and deleted appointments are no longer upcoming.
+    removed, _ = AppointmentRiskScore.objects.exclude(
+        appointment_id__in=upcoming_appointments(now).values("pk")
+    ).delete()
+
+    return {
+        "scored": count,
+        "removed": removed,
+        "model_version": model_version("no_show"),
+        "score_seconds": round(scored_at - start, 3),
+        "total_seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def with_no_show_risk(queryset):
+    """Annotate appointments with their cached risk score (or None)."""
+    score = AppointmentRiskScore.objects.filter(appointment_id=OuterRef("pk"))
+    return queryset.annotate(no_show_risk=Subquery(score.values("risk_score")[:1]))
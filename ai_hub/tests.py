@@ -1,5 +1,48 @@
-from django.test import SimpleTestCase
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import skipUnless
+from unittest.mock import patch
 
+import joblib
+import numpy as np
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from .models import (
+    AgentRun,
+    AgentStepTrace,
+    AiLatencyRollup,
+    AiPredictionLog,
+    AiRequestTrace,
+    AppointmentRiskScore,
+    KnowledgeDocument,
+)
+from .services import (
+    agent,
+    ingest,
+    latency,
+    llm_client,
+    llm_sessions,
+    ml,
+    observability,
+    rag,
+    rag_store,
+    risk_scores,
+)
 from .services.rag import chunk_text
 from .services.agent import run_compliance_agent
 from .services.ml import predict_no_show
@@ -11,6 +54,646 @@ class RagTests(SimpleTestCase):
         chunks = chunk_text(text, chunk_size=500, overlap=50)
         self.assertTrue(len(chunks) >= 3)
 
+    def test_chunks_end_on_sentence_boundaries(self):
+        text = " ".join(f"Sentence number {i} ends here." for i in range(100))
+        chunks = list(rag.iter_chunks(text, chunk_size=200, overlap=0))
+        self.assertTrue(all(len(c) <= 200 for c in chunks))
+        self.assertTrue(all(c.endswith(".") for c in chunks))
+        self.assertEqual("".join(c + " " for c in chunks).strip(), text)
+
+
+class RagArtifactsTestCase(SimpleTestCase):
+    """Points the RAG artifact paths at a temporary directory."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for name, filename in (
+            ("RAG_META_PATH", "rag_meta.joblib"),
+            ("RAG_INDEX_PATH", "rag_index.faiss"),
+            ("RAG_STORE_DIR", "rag_store"),
+        ):
+            patcher = patch.object(rag, name, os.path.join(tmp.name, filename))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        rag.clear_index_cache()
+        self.addCleanup(rag.clear_index_cache)
+
+
+class RagIndexCacheTests(RagArtifactsTestCase):
+    def _docs(self, text):
+        return [{"name": "policy.txt", "path": "policy.txt", "text": text}]
+
+    def test_index_loaded_once_and_reloaded_after_rebuild(self):
+        rag.build_index(self._docs("Discharge summaries need a medication list."))
+        with patch.object(rag, "_load_meta", wraps=rag._load_meta) as load_meta:
+            rag.retrieve("medication list")
+            rag.retrieve("medication list")
+            self.assertEqual(load_meta.call_count, 1)
+
+            version = rag.index_version()
+            rag.build_index(self._docs("Follow-up appointments within two weeks."))
+            os.utime(rag.RAG_META_PATH, ns=(1, 1))
+            self.assertNotEqual(rag.index_version(), version)
+            results, _ = rag.retrieve("follow-up appointments")
+            self.assertEqual(load_meta.call_count, 2)
+        self.assertIn("Follow-up", results[0]["text"])
+
+
+@override_settings(RAG_VECTORIZER="hashing", RAG_HASHING_FEATURES=2**12)
+class RagHashingVectorizerTests(RagArtifactsTestCase):
+    def test_streamed_build_retrieves(self):
+        docs = (
+            {"name": f"doc{i}.txt", "path": f"doc{i}.txt", "text": text}
+            for i, text in enumerate(
+                ["Invoices list the room charge.", "Follow-up within two weeks."]
+            )
+        )
+        with patch.object(rag, "VECTORIZE_BATCH_SIZE", 1):
+            result = rag.build_index(docs)
+        self.assertEqual(result["count"], 2)
+        results, _ = rag.retrieve("follow-up weeks", top_k=1)
+        self.assertEqual(results[0]["source"], "doc1.txt")
+        self.assertEqual(results[0]["snippet"], "Follow-up within two weeks.")
+
+    @skipUnless(rag.FAISS_AVAILABLE, "faiss is not installed")
+    @override_settings(RAG_PROVIDER="faiss", RAG_HASHING_FEATURES=2**18)
+    def test_hashed_vectors_skip_dense_faiss_index(self):
+        docs = [{"name": "policy.txt", "path": "policy.txt", "text": "Invoices list the room charge."}]
+        with patch.object(rag, "_new_faiss_index") as new_faiss_index:
+            rag.build_index(docs)
+        new_faiss_index.assert_not_called()
+        loaded = rag.load_index()
+        self.assertIsNone(loaded["index"])
+        self.assertEqual(loaded["meta"]["store"]["layout"], "csr")
+        results, _ = rag.retrieve("room charge", top_k=1)
+        self.assertEqual(results[0]["source"], "policy.txt")
+
+
+@skipUnless(rag.FAISS_AVAILABLE, "faiss is not installed")
+@override_settings(RAG_PROVIDER="faiss")
+class RagAnnIndexTests(RagArtifactsTestCase):
+    def _docs(self):
+        rng = np.random.default_rng(0)
+        return [
+            {
+                "name": f"doc{i}.txt",
+                "path": f"doc{i}.txt",
+                "text": " ".join(f"term{j}" for j in rng.integers(0, 200, size=40)),
+            }
+            for i in range(400)
+        ]
+
+    def test_ivf_and_hnsw_params_are_persisted(self):
+        for kind, knob in (("ivf", "nprobe"), ("hnsw", "ef_search")):
+            with self.subTest(kind=kind), override_settings(RAG_FAISS_INDEX=kind):
+                rag.build_index(self._docs())
+                loaded = rag.load_index()
+                params = loaded["meta"]["faiss_params"]
+                self.assertEqual(params["type"], kind)
+                self.assertIn(knob, params)
+                self.assertEqual(loaded["index"].ntotal, 400)
+                results, _ = rag.retrieve("term1 term2 term3", top_k=3)
+                self.assertEqual(len(results), 3)
+
+    def test_index_is_versioned_with_its_chunk_store(self):
+        rag.build_index(self._docs())
+        first = rag.load_index()["meta"]["store"]["directory"]
+        rag.build_index(self._docs()[:200])
+        loaded = rag.load_index()
+        store = loaded["meta"]["store"]
+        self.assertNotEqual(store["directory"], first)
+        self.assertTrue(
+            os.path.exists(os.path.join(rag.RAG_STORE_DIR, store["directory"], store["faiss_index"]))
+        )
+        self.assertFalse(os.path.exists(rag.RAG_INDEX_PATH))
+        self.assertEqual(loaded["index"].ntotal, len(loaded["meta"]["texts"]))
+
+
+class RagIncrementalBuildTests(RagArtifactsTestCase):
+    def setUp(self):
+        super().setUp()
+        kb_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(kb_dir.cleanup)
+        self.kb_dir = kb_dir.name
+
+    def _write(self, name, text):
+        with open(os.path.join(self.kb_dir, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_only_changed_documents_are_reembedded(self):
+        self._write("discharge.txt", "Discharge summaries need a medication list.")
+        self._write("billing.txt", "Invoices list the room charge and doctor fee.")
+        self._write("old.txt", "Fax requests are no longer accepted.")
+        result = rag.update_index(self.kb_dir)
+        self.assertTrue(result["full_rebuild"])
+
+        self._write("billing.txt", "Invoices list the medication charge and doctor fee.")
+        self._write("followup.txt", "Follow-up medication reviews happen within two weeks.")
+        os.remove(os.path.join(self.kb_dir, "old.txt"))
+        result = rag.update_index(self.kb_dir)
+
+        self.assertFalse(result["full_rebuild"])
+        self.assertEqual(
+            (result["added"], result["removed"], result["unchanged"]), (2, 1, 1)
+        )
+        results, _ = rag.retrieve("medication", top_k=5)
+        self.assertEqual(
+            sorted(r["source"] for r in results),
+            ["billing.txt", "discharge.txt", "followup.txt"],
+        )
+        self.assertEqual(
+            sorted(rag.indexed_documents()), ["billing.txt", "discharge.txt", "followup.txt"]
+        )
+
+        result = rag.update_index(self.kb_dir)
+        self.assertEqual((result["added"], result["removed"]), (0, 0))
+
+    def test_touched_files_are_recorded_and_tfidf_is_refit(self):
+        self._write("discharge.txt", "Discharge summaries need a medication list.")
+        rag.update_index(self.kb_dir)
+        path = os.path.join(self.kb_dir, "discharge.txt")
+        os.utime(path, ns=(1, 1))
+        rag.update_index(self.kb_dir)
+        with patch.object(rag, "read_documents", wraps=rag.read_documents) as read:
+            rag.update_index(self.kb_dir)
+        self.assertEqual(list(read.call_args.args[0]), [])
+
+        with override_settings(RAG_TFIDF_REFIT_EVERY=2):
+            for text in ("Insulin doses are charted.", "Warfarin doses are charted."):
+                self._write("followup.txt", text)
+                self.assertFalse(rag.update_index(self.kb_dir)["full_rebuild"])
+            self._write("followup.txt", "Heparin doses are charted.")
+            self.assertTrue(rag.update_index(self.kb_dir)["full_rebuild"])
+        self.assertIn("heparin", rag.load_index()["meta"]["vectorizer"].vocabulary_)
+
+
+class BuildRagIndexCommandTests(RagArtifactsTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        kb_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(kb_dir.cleanup)
+        self.kb_dir = kb_dir.name
+
+    def _write(self, name, text):
+        with open(os.path.join(self.kb_dir, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_incremental_build_reads_on_pool_and_drops_removed_documents(self):
+        self._write("discharge.txt", "Discharge summaries need a medication list.")
+        self._write("old.txt", "Fax requests are no longer accepted.")
+        with override_settings(AI_HUB_KB_DIR=self.kb_dir):
+            call_command("build_rag_index", stdout=StringIO())
+            self.assertEqual(KnowledgeDocument.objects.count(), 2)
+
+            os.remove(os.path.join(self.kb_dir, "old.txt"))
+            self._write("followup.txt", "Follow-up reviews happen within two weeks.")
+            with patch.object(rag, "read_documents", wraps=rag.read_documents) as read:
+                call_command("build_rag_index", "--incremental", "--workers", "2", stdout=StringIO())
+        self.assertEqual(read.call_args.kwargs["workers"], 2)
+        self.assertEqual(
+            sorted(KnowledgeDocument.objects.values_list("name", flat=True)),
+            ["discharge.txt", "followup.txt"],
+        )
+
+    def test_uploads_not_yet_indexed_keep_their_rows(self):
+        self._write("uploaded.txt", "Fax requests are no longer accepted.")
+        KnowledgeDocument.objects.create(name="uploaded.txt", path="uploaded.txt", checksum="pending")
+        # The index is older than the upload, or missing entirely.
+        with override_settings(AI_HUB_KB_DIR=self.kb_dir), patch(
+            "ai_hub.management.commands.build_rag_index.indexed_documents", return_value={}
+        ), patch("ai_hub.management.commands.build_rag_index.update_index") as update:
+            update.return_value = {"full_rebuild": False, "added": 0, "removed": 0, "unchanged": 0, "count": 0}
+            call_command("build_rag_index", "--incremental", stdout=StringIO())
+        self.assertTrue(KnowledgeDocument.objects.filter(name="uploaded.txt").exists())
+
+
+class IngestTests(SimpleTestCase):
+    def test_parallel_ingest_matches_serial(self):
+        kb_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(kb_dir.cleanup)
+        shutil.copy(
+            os.path.join(settings.BASE_DIR, "docs", "Hospital_AI_Hub_Test_Document_Policies_SOPs.pdf"),
+            kb_dir.name,
+        )
+        with open(os.path.join(kb_dir.name, "policy.txt"), "w", encoding="utf-8") as f:
+            f.write("Discharge summaries need a medication list.")
+
+        serial_stats = ingest.new_stats()
+        serial = list(ingest.iter_documents(kb_dir.name, stats=serial_stats))
+        parallel_stats = ingest.new_stats()
+        parallel = list(ingest.iter_documents(kb_dir.name, workers=2, stats=parallel_stats))
+
+        self.assertEqual(
+            [(d["name"], d["checksum"]) for d in serial],
+            [(d["name"], d["checksum"]) for d in parallel],
+        )
+        self.assertGreater(parallel_stats["pages"], 0)
+        self.assertEqual(serial_stats["pages"], parallel_stats["pages"])
+        self.assertEqual(serial_stats["bytes"], parallel_stats["bytes"])
+
+
+class RagStoreTests(RagArtifactsTestCase):
+    def test_chunk_data_is_memory_mapped(self):
+        docs = [
+            {"name": "a.txt", "path": "kb/a.txt", "text": "Café discharge notes."},
+            {"name": "b.txt", "path": "kb/b.txt", "text": "Invoices list charges."},
+        ]
+        for store_format in ("sparse", "dense"):
+            with self.subTest(store=store_format), override_settings(RAG_VECTOR_STORE=store_format):
+                rag.build_index(docs)
+                meta = rag.load_index()["meta"]
+                vectors = meta["vectors"]
+                mapped = vectors.data if sparse.issparse(vectors) else vectors
+                # Read-only views over the mapped file, not private copies.
+                self.assertFalse(mapped.flags.owndata)
+                self.assertFalse(mapped.flags.writeable)
+                self.assertEqual(list(meta["texts"]), ["Café discharge notes.", "Invoices list charges."])
+                self.assertEqual(meta["meta"][1], {"source": "b.txt", "path": "kb/b.txt"})
+                self.assertLessEqual(len(os.listdir(rag.RAG_STORE_DIR)), 2)
+
+    def test_previous_store_survives_one_rebuild(self):
+        docs = [{"name": "a.txt", "path": "a.txt", "text": "Discharge notes."}]
+        rag.build_index(docs)
+        first = joblib.load(rag.RAG_META_PATH)["store"]
+        rag.build_index(docs)
+        # A worker holding the old manifest can still open its store.
+        texts, _, _ = rag_store.open_store(os.path.join(rag.RAG_STORE_DIR, first["directory"]), first)
+        self.assertEqual(list(texts), ["Discharge notes."])
+        rag.build_index(docs)
+        self.assertNotIn(first["directory"], os.listdir(rag.RAG_STORE_DIR))
+        self.assertEqual(len(os.listdir(rag.RAG_STORE_DIR)), 2)
+
+
+class RagBatchRetrievalTests(RagArtifactsTestCase):
+    def test_retrieve_many_matches_single_queries(self):
+        rag.build_index(
+            [
+                {"name": "discharge.txt", "path": "discharge.txt", "text": "Discharge needs a medication list."},
+                {"name": "billing.txt", "path": "billing.txt", "text": "Invoices list the room charge."},
+                {"name": "followup.txt", "path": "followup.txt", "text": "Follow-up within two weeks."},
+            ]
+        )
+        queries = ["medication list", "room charge invoices", "follow-up weeks"]
+        for provider in ("faiss", "local"):
+            with self.subTest(provider=provider), override_settings(RAG_PROVIDER=provider):
+                rag.clear_index_cache()
+                batched, _ = rag.retrieve_many(queries, top_k=2)
+                self.assertEqual(len(batched), len(queries))
+                for query, results in zip(queries, batched):
+                    single, _ = rag.retrieve(query, top_k=2)
+                    self.assertEqual(
+                        [r["source"] for r in results], [r["source"] for r in single]
+                    )
+                self.assertEqual(batched[2][0]["source"], "followup.txt")
+
+
+class EvaluationCommandTests(RagArtifactsTestCase):
+    def setUp(self):
+        super().setUp()
+        rag.build_index(
+            [
+                {"name": "discharge.txt", "path": "discharge.txt", "text": "Discharge needs a medication list."},
+                {"name": "followup.txt", "path": "followup.txt", "text": "Follow-up within two weeks."},
+            ]
+        )
+        base = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, base)
+        os.makedirs(os.path.join(base, "ai_hub", "eval"))
+        self.artifacts = os.path.join(base, "artifacts")
+        rag_rows = [
+            {"question": f"medication list {i}", "expected_keywords": ["medication"]}
+            if i % 2
+            else {"question": f"follow-up weeks {i}", "expected_keywords": ["follow-up"]}
+            for i in range(7)
+        ]
+        agent_rows = [
+            {"draft": "Diagnosis: flu" if i % 2 else "Follow-up in a week", "expected_missing": ["Medication list"]}
+            for i in range(7)
+        ]
+        for name, rows in (("rag_eval_set.jsonl", rag_rows), ("compliance_eval_set.jsonl", agent_rows)):
+            with open(os.path.join(base, "ai_hub", "eval", name), "w", encoding="utf-8") as f:
+                f.write("\n".join(json.dumps(row) for row in rows))
+        overrides = override_settings(BASE_DIR=base, AI_HUB_ARTIFACTS_DIR=self.artifacts)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def _run(self, command, filename, *args):
+        call_command(command, *args, stdout=StringIO())
+        with open(os.path.join(self.artifacts, filename), encoding="utf-8") as f:
+            summary = json.load(f)
+        for row in summary["results"]:
+            row.pop("latency_ms", None)
+        return summary
+
+    def test_worker_pools_keep_results_ordered(self):
+        for command, filename, extra in (
+            ("evaluate_rag", "rag_eval_results.json", ["--batch-size", "2"]),
+            ("evaluate_compliance_agent", "agent_eval_results.json", []),
+        ):
+            with self.subTest(command=command):
+                serial = self._run(command, filename, *extra)
+                pooled = self._run(command, filename, "--workers", "3", "--limit", "5", *extra)
+                self.assertEqual(pooled["results"], serial["results"][:5])
+                self.assertEqual(pooled["workers"], 3)
+                self.assertGreater(pooled["records_per_sec"], 0)
+                self.assertLessEqual(pooled["p50_ms"], pooled["p99_ms"])
+
+    def test_compliance_eval_is_identical_across_worker_counts(self):
+        filename = "agent_eval_results.json"
+        serial = self._run("evaluate_compliance_agent", filename, "--workers", "1")
+        pooled = self._run("evaluate_compliance_agent", filename, "--workers", "4")
+        for key in ("results", "avg_score", "avg_hit_rate", "count"):
+            self.assertEqual(pooled[key], serial[key])
+
+    def test_rag_eval_reports_per_question_latency(self):
+        for batch_size, basis, batches in (("3", "amortized", 3), ("1", "per_query", 7)):
+            with self.subTest(batch_size=batch_size):
+                call_command("evaluate_rag", "--batch-size", batch_size, stdout=StringIO())
+                with open(os.path.join(self.artifacts, "rag_eval_results.json"), encoding="utf-8") as f:
+                    summary = json.load(f)
+                self.assertEqual(summary["latency_basis"], basis)
+                self.assertEqual(len(summary["batch_latencies_ms"]), batches)
+                self.assertTrue(all("latency_ms" in row for row in summary["results"]))
+                self.assertEqual(len(summary["results"]), 7)
+
+
+class RagSparseRetrievalTests(SimpleTestCase):
+    def test_top_k_matches_full_sort(self):
+        sims = np.array([0.1, 0.9, 0.3, 0.7, 0.5], dtype="float32")
+        self.assertEqual(list(rag.top_k_indices(sims, 3)), [1, 3, 4])
+        self.assertEqual(list(rag.top_k_indices(sims, 10)), [1, 3, 4, 2, 0])
+
+    def test_sparse_and_dense_scores_agree(self):
+        vectors = normalize(
+            sparse.csr_matrix([[1.0, 0.0, 2.0], [0.0, 3.0, 1.0]], dtype="float32")
+        )
+        q_vec = normalize(sparse.csr_matrix([[0.0, 1.0, 1.0]]))
+        np.testing.assert_allclose(
+            rag.similarities(vectors, q_vec),
+            rag.similarities(vectors.toarray(), q_vec),
+            rtol=1e-6,
+        )
+
+
+class TraceFileTestMixin:
+    """Points the JSONL trace file at a temporary directory."""
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = patch.object(observability, "TRACE_FILE", os.path.join(tmp.name, "ai_traces.jsonl"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+@override_settings(
+    AI_FEATURES_ENABLED=True,
+    AI_MOCK_MODE=True,
+    RAG_ANSWER_CACHE_ENABLED=True,
+    AI_TRACE_BUFFERED=False,
+)
+class RagAnswerCacheTests(TraceFileTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        caches["ai_hub"].clear()
+        self.addCleanup(caches["ai_hub"].clear)
+
+    def _ask(self, query, redact=False):
+        data = {"query": query}
+        if redact:
+            data["redact"] = "on"
+        return self.client.post(reverse("ai-rag"), data)
+
+    def test_repeat_questions_are_served_from_cache(self):
+        citations = [{"source": "policy.txt", "snippet": "Follow-up", "text": "Follow-up", "score": 0.5}]
+        with patch.object(rag, "retrieve", return_value=(citations, 1)) as retrieve, patch(
+            "ai_hub.views.agenerate_answer", return_value="Within two weeks."
+        ) as generate:
+            self._ask("When is follow-up?")
+            response = self._ask("  when is   FOLLOW-UP? ")
+            self._ask("When is follow-up?", redact=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Within two weeks.")
+        self.assertEqual(retrieve.call_count, 2)
+        self.assertEqual(generate.call_count, 2)
+        self.assertEqual(
+            [t.metadata["cache"] for t in AiRequestTrace.objects.order_by("id")],
+            ["miss", "hit", "miss"],
+        )
+
+
+@override_settings(
+    AI_FEATURES_ENABLED=True,
+    AI_MOCK_MODE=True,
+    LLM_PROVIDER="mock",
+    AI_TRACE_BUFFERED=False,
+)
+class StreamingViewTests(TraceFileTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        caches["ai_hub"].clear()
+        self.addCleanup(caches["ai_hub"].clear)
+
+    async def _stream(self, name, data):
+        response = await self.async_client.post(reverse(name), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        body = b"".join([chunk async for chunk in response]).decode("utf-8")
+        return [json.loads(line) for line in body.splitlines()]
+
+    async def test_rag_answer_streams_and_records_ttft(self):
+        citations = [{"source": "policy.txt", "snippet": "Follow-up", "text": "Follow-up", "score": 0.5}]
+        with patch.object(rag, "retrieve", return_value=(citations, 1)):
+            messages = await self._stream("ai-rag-stream", {"query": "When is follow-up?"})
+
+        self.assertEqual(messages[0]["citations"][0]["source"], "policy.txt")
+        deltas = [m["delta"] for m in messages if "delta" in m]
+        self.assertGreater(len(deltas), 1)
+        self.assertTrue("".join(deltas).startswith("Mock response generated."))
+        self.assertTrue(messages[-1]["done"])
+        trace = await AiRequestTrace.objects.aget(request_id=messages[0]["request_id"])
+        self.assertTrue(trace.metadata["stream"])
+        self.assertLessEqual(trace.metadata["ttft_ms"], trace.latency_ms)
+
+    async def test_draft_streams_final_split(self):
+        messages = await self._stream("ai-draft-stream", {"notes": "Chest pain resolved."})
+        final = messages[-1]
+        self.assertTrue(final["done"])
+        self.assertEqual(
+            "".join(m["delta"] for m in messages if "delta" in m),
+            final["draft"] + ("\n\n" + final["instructions"] if final["instructions"] else ""),
+        )
+        trace = await AiRequestTrace.objects.aget(operation_type="draft")
+        self.assertTrue(trace.metadata["stream"])
+
+    async def test_chunks_are_sent_while_the_llm_is_still_generating(self):
+        release = threading.Event()
+        finished = threading.Event()
+
+        def tokens(*args, **kwargs):
+            yield "First."
+            yield " Second."
+            release.wait(5)
+            yield " Last."
+            finished.set()
+
+        for name, target in (("ai-rag-stream", "stream_answer"), ("ai-draft-stream", "stream_text")):
+            release.clear()
+            finished.clear()
+            with self.subTest(view=name), patch.object(rag, "retrieve", return_value=([], 1)), patch(
+                f"ai_hub.views.{target}", side_effect=tokens
+            ):
+                response = await self.async_client.post(reverse(name), {"query": "q", "notes": "n"})
+                deltas = []
+                async for chunk in response.__aiter__():
+                    message = json.loads(chunk)
+                    if message.get("delta") == " Second.":
+                        self.assertFalse(finished.is_set())
+                        release.set()
+                    deltas.append(message.get("delta"))
+                self.assertTrue(finished.is_set())
+                self.assertIn(" Last.", deltas)
+
+    async def test_rag_stream_traces_failures_before_streaming(self):
+        with patch.object(rag, "retrieve", side_effect=RuntimeError("index unavailable")):
+            with self.assertRaises(RuntimeError):
+                await self.async_client.post(reverse("ai-rag-stream"), {"query": "When is follow-up?"})
+        trace = await AiRequestTrace.objects.aget(operation_type="rag_qa")
+        self.assertFalse(trace.success)
+        self.assertEqual(trace.error_message, "index unavailable")
+
+    async def test_draft_stream_setup_errors_get_an_error_status(self):
+        def failing(prompt):
+            raise ValueError("LLM is not configured.")
+            yield
+
+        with patch("ai_hub.views.stream_text", side_effect=failing):
+            response = await self.async_client.post(reverse("ai-draft-stream"), {"notes": "n"})
+        self.assertEqual(response.status_code, 400)
+        trace = await AiRequestTrace.objects.aget(operation_type="draft")
+        self.assertFalse(trace.success)
+
+    async def test_stream_views_only_accept_post(self):
+        for name in ("ai-rag-stream", "ai-draft-stream"):
+            response = await self.async_client.get(reverse(name))
+            self.assertEqual(response.status_code, 405)
+
+    @override_settings(LLM_PROVIDER="openai")
+    async def test_draft_stream_uses_shared_openai_stream(self):
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}), patch(
+            "ai_hub.services.llm._openai_stream", return_value=iter(["Draft.", "\n\nRest."])
+        ) as openai_stream:
+            messages = await self._stream("ai-draft-stream", {"notes": "Chest pain resolved."})
+        self.assertEqual(openai_stream.call_args.args[1], "test-key")
+        self.assertEqual((messages[-1]["draft"], messages[-1]["instructions"]), ("Draft.", "Rest."))
+
+
+@override_settings(AI_FEATURES_ENABLED=True, LLM_PROVIDER="mock", AI_TRACE_BUFFERED=False)
+class AsyncViewTests(TraceFileTestMixin, TestCase):
+    async def test_draft_assistant_runs_under_asgi(self):
+        response = await self.async_client.post(reverse("ai-draft"), {"notes": "Chest pain resolved."})
+        self.assertContains(response, "Mock response generated.")
+        trace = await AiRequestTrace.objects.aget(operation_type="draft")
+        self.assertTrue(trace.success)
+
+
+class _StubProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports = set()
+
+    def do_POST(self):
+        self.client_ports.add(self.client_address[1])
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if request.get("stream"):
+            self._send_events(request)
+            return
+        if self.path.endswith("/messages"):
+            body = {"content": [{"text": "stub anthropic"}]}
+        else:
+            body = {"choices": [{"message": {"content": "stub openai"}}]}
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_events(self, request):
+        if self.path.endswith("/messages"):
+            events = [
+                {"type": "content_block_delta", "delta": {"type": "text_delta", "text": piece}}
+                for piece in ("stub ", "anthropic")
+            ] + [{"type": "message_stop"}]
+        else:
+            events = [{"choices": [{"delta": {"content": piece}}]} for piece in ("stub ", "openai")]
+        data = "".join(f"data: {json.dumps(event)}\n\n" for event in events)
+        if not self.path.endswith("/messages"):
+            data += "data: [DONE]\n\n"
+        data = data.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class LlmSessionPoolTests(SimpleTestCase):
+    def setUp(self):
+        _StubProviderHandler.client_ports = set()
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StubProviderHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+        overrides = override_settings(OPENAI_BASE_URL=base_url, ANTHROPIC_BASE_URL=base_url)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        llm_sessions.reset_clients()
+        self.addCleanup(llm_sessions.reset_clients)
+
+    def test_calls_reuse_one_keep_alive_connection_per_provider(self):
+        for _ in range(3):
+            self.assertEqual(
+                llm_client._openai_http_call("hi", "gpt-4o-mini", "key"), "stub openai"
+            )
+        self.assertEqual(len(_StubProviderHandler.client_ports), 1)
+        for _ in range(3):
+            self.assertEqual(
+                llm_client._anthropic_answer("hi", "claude", "key"), "stub anthropic"
+            )
+        self.assertEqual(len(_StubProviderHandler.client_ports), 2)
+
+    @override_settings(AI_MOCK_MODE=False, OPENAI_API_KEY="key", ANTHROPIC_API_KEY="key")
+    def test_provider_sse_streams_are_parsed(self):
+        self.assertEqual(
+            list(llm_client.stream_answer("hi", "gpt-4o-mini", "openai")), ["stub ", "openai"]
+        )
+        self.assertEqual(
+            list(llm_client.stream_answer("hi", "claude", "anthropic")), ["stub ", "anthropic"]
+        )
+
+    @override_settings(AI_MOCK_MODE=False, OPENAI_API_KEY="key", ANTHROPIC_API_KEY="key")
+    def test_async_calls_share_a_pool_on_one_loop(self):
+        async def ask_all():
+            return await asyncio.gather(
+                *[llm_client.agenerate_answer("hi", "gpt-4o-mini", "openai") for _ in range(4)],
+                llm_client.agenerate_answer("hi", "claude", "anthropic"),
+            )
+
+        answers = asyncio.run(ask_all())
+        self.assertEqual(answers, ["stub openai"] * 4 + ["stub anthropic"])
+        self.assertLessEqual(len(_StubProviderHandler.client_ports), 5)
+
+    @override_settings(LLM_CONNECT_TIMEOUT=1.5, LLM_READ_TIMEOUT=20)
+    def test_timeouts_are_split(self):
+        self.assertEqual(llm_sessions.request_timeout(), (1.5, 20.0))
+
 
 class AgentTests(SimpleTestCase):
     def test_agent_trace(self):
@@ -18,8 +701,365 @@ class AgentTests(SimpleTestCase):
         steps = result["steps"]
         self.assertTrue(len(steps) >= 3)
 
+    def _slow_retrieve(self, query, top_k=3):
+        time.sleep(0.3)
+        return [{"source": "sop.txt", "snippet": "Sign-off"}], 300
+
+    def test_validate_does_not_wait_for_retrieval(self):
+        with patch.object(agent, "retrieve", side_effect=self._slow_retrieve):
+            result = run_compliance_agent("Diagnosis and follow-up", use_llm=False)
+        latency = {step["step"]: step["latency_ms"] for step in result["steps"]}
+        self.assertEqual([step["step"] for step in result["steps"]], list(agent.STEP_DEPENDENCIES))
+        self.assertGreaterEqual(latency["RETRIEVE"], 300)
+        self.assertLess(latency["VALIDATE"], 300)
+        self.assertIn("sop.txt", result["steps"][1]["output"])
+
+    @override_settings(AGENT_STEP_TIMEOUTS={**settings.AGENT_STEP_TIMEOUTS, "RETRIEVE": 0.05})
+    def test_step_timeout_is_reported_and_dependents_still_run(self):
+        for runner in (run_compliance_agent, lambda *a, **kw: asyncio.run(agent.arun_compliance_agent(*a, **kw))):
+            with patch.object(agent, "retrieve", side_effect=self._slow_retrieve):
+                result = runner("Diagnosis", use_llm=False)
+            steps = {step["step"]: step for step in result["steps"]}
+            self.assertEqual(steps["RETRIEVE"]["status"], "timeout")
+            self.assertEqual(steps["REPORT"]["status"], "success")
+            self.assertEqual(result["citations"], [])
+
+    @override_settings(AGENT_STEP_TIMEOUTS={**settings.AGENT_STEP_TIMEOUTS, "PLAN": 0.1, "VALIDATE": 0.1})
+    def test_time_queued_behind_other_work_is_not_charged_to_a_step(self):
+        pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(pool.shutdown)
+        runners = (run_compliance_agent, lambda *a, **kw: asyncio.run(agent.arun_compliance_agent(*a, **kw)))
+        with patch.object(agent, "_EXECUTOR", pool), patch.object(
+            agent, "retrieve", side_effect=self._slow_retrieve
+        ):
+            for runner in runners:
+                pool.submit(time.sleep, 0.3)
+                result = runner("Diagnosis and follow-up", use_llm=False)
+                statuses = {step["step"]: step["status"] for step in result["steps"]}
+                self.assertEqual(set(statuses.values()), {"success"})
+
+
+@override_settings(
+    AI_FEATURES_ENABLED=True,
+    AGENTS_ENABLED=True,
+    LLM_PROVIDER="mock",
+    AI_TRACE_BUFFERED=False,
+)
+class ComplianceBatchViewTests(TraceFileTestMixin, TestCase):
+    def test_batch_of_drafts_is_checked_in_parallel(self):
+        citations = [{"source": "sop.txt", "snippet": "Sign-off"}]
+        with patch.object(agent, "retrieve", return_value=(citations, 1)):
+            response = self.client.post(
+                reverse("ai-agent-compliance"),
+                {"text": "Diagnosis: flu\n---\nFollow-up in a week\n---\n"},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["runs"]), 2)
+        self.assertEqual(AgentRun.objects.filter(status="success").count(), 2)
+        self.assertEqual(AgentStepTrace.objects.count(), 8)
+        trace = AiRequestTrace.objects.get(operation_type="compliance_agent")
+        self.assertEqual(trace.metadata["batch_size"], 2)
+        self.assertTrue(trace.success)
+
+    def test_failed_report_step_is_traced_as_an_error(self):
+        with patch.object(agent, "retrieve", return_value=([], 1)), patch.object(
+            agent, "agenerate_text", side_effect=ValueError("LLM is not configured.")
+        ):
+            response = self.client.post(reverse("ai-agent-compliance"), {"text": "Diagnosis: flu"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AgentRun.objects.get().status, "partial")
+        trace = AiRequestTrace.objects.get(operation_type="compliance_agent")
+        self.assertFalse(trace.success)
+        self.assertIn("REPORT error", trace.error_message)
+
 
 class MlTests(SimpleTestCase):
+    def test_models_are_preloaded_only_by_server_entry_points(self):
+        with patch.object(ml, "preload_models") as preload:
+            apps.get_app_config("ai_hub").ready()
+            preload.assert_not_called()
+            with override_settings(AI_FEATURES_ENABLED=True, AI_HUB_PRELOAD_MODELS=False):
+                ml.preload_for_server()
+            preload.assert_not_called()
+            with override_settings(AI_FEATURES_ENABLED=True, AI_HUB_PRELOAD_MODELS=True):
+                ml.preload_for_server()
+            preload.assert_called_once_with()
+
     def test_no_show_score_range(self):
         score = predict_no_show({"days_until": 3, "hour": 10})
         self.assertTrue(0.0 <= score <= 1.0)
+
+    def test_models_load_once_and_reload_when_artifact_changes(self):
+        path = os.path.join(tempfile.mkdtemp(), "no_show_model.joblib")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        with patch.object(ml, "NO_SHOW_MODEL_PATH", path):
+            ml.clear_model_cache()
+            self.addCleanup(ml.clear_model_cache)
+            self.assertEqual(ml.model_version("no_show"), "missing")
+
+            joblib.dump({"name": "v1"}, path)
+            os.utime(path, ns=(1_700_000_000_000_000_000,) * 2)
+            with patch.object(ml.joblib, "load", wraps=joblib.load) as load:
+                self.assertEqual(ml.load_no_show_model(), {"name": "v1"})
+                ml.load_no_show_model()
+                self.assertEqual(ml.model_version("no_show"), 1_700_000_000)
+                self.assertEqual(load.call_count, 1)
+
+                joblib.dump({"name": "v2"}, path)
+                os.utime(path, ns=(1_700_000_100_000_000_000,) * 2)
+                self.assertEqual(ml.load_no_show_model(), {"name": "v2"})
+                self.assertEqual(ml.model_version("no_show"), 1_700_000_100)
+                self.assertEqual(load.call_count, 2)
+
+
+class _CountingClassifier:
+    classes_ = np.array(["Cardiology", "General"])
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, texts):
+        raise AssertionError("predict_departments should only call predict_proba")
+
+    def predict_proba(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[0.8, 0.2] if "chest" in t else [0.3, 0.7] for t in texts])
+
+
+class DepartmentTriageTests(TestCase):
+    def setUp(self):
+        self.model = _CountingClassifier()
+        patcher = patch.object(ml, "load_complaint_classifier", return_value=self.model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batch_uses_one_predict_proba_call(self):
+        predictions = ml.predict_departments(["chest pain", "headache"])
+        self.assertEqual(predictions, [("Cardiology", 0.8), ("General", 0.7)])
+        self.assertEqual(len(self.model.calls), 1)
+        self.assertEqual(ml.predict_department("chest tightness"), ("Cardiology", 0.8))
+
+    def test_command_logs_pending_consultation_requests(self):
+        from datetime import date, time as dt_time
+
+        from hospital.models import ConsultationRequest
+
+        fields = {
+            "email": "p@example.com",
+            "phone": "1",
+            "preferred_date": date(2030, 1, 1),
+            "preferred_time": dt_time(9, 0),
+        }
+        first = ConsultationRequest.objects.create(full_name="A", message="chest pain", **fields)
+        ConsultationRequest.objects.create(full_name="B", message="headache", **fields)
+        ConsultationRequest.objects.create(full_name="C", message="", **fields)
+        ConsultationRequest.objects.create(
+            full_name="D", message="chest", status="cancelled", **fields
+        )
+
+        out = StringIO()
+        call_command("triage_consultation_requests", "--batch-size", "1", stdout=out)
+
+        self.assertIn("Triaged 2 consultation requests", out.getvalue())
+        self.assertEqual(len(self.model.calls), 2)
+        log = AiPredictionLog.objects.get(metadata__consultation_request_id=first.pk)
+        self.assertEqual((log.predicted_label, log.confidence), ("Cardiology", 0.8))
+        self.assertEqual(log.metadata["source"], "bulk_triage")
+
+
+class RiskScoreTests(TestCase):
+    def test_upcoming_appointments_are_scored_once_and_rescored_in_place(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+        from hospital.models import Appointment
+
+        now = timezone.now()
+        upcoming = Appointment.objects.create(date_time=now + timedelta(days=2))
+        Appointment.objects.create(date_time=now + timedelta(days=3), status="cancelled")
+        Appointment.objects.create(date_time=now - timedelta(days=1))
+
+        stats = risk_scores.score_upcoming_appointments(chunk_size=1, now=now)
+        self.assertEqual(stats["scored"], 1)
+        first = AppointmentRiskScore.objects.get()
+        self.assertEqual(first.appointment_id, upcoming.pk)
+        self.assertTrue(0.0 <= first.risk_score <= 1.0)
+
+        risk_scores.score_upcoming_appointments(now=now + timedelta(days=1))
+        second = AppointmentRiskScore.objects.get()
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(second.computed_at, now + timedelta(days=1))
+
+        annotated = risk_scores.with_no_show_risk(Appointment.objects.all())
+        self.assertEqual(annotated.get(pk=upcoming.pk).no_show_risk, second.risk_score)
+        self.assertIsNone(annotated.filter(status="cancelled").get().no_show_risk)
+
+        upcoming.status = "cancelled"
+        upcoming.save()
+        stats = risk_scores.score_upcoming_appointments(now=now)
+        self.assertEqual((stats["scored"], stats["removed"]), (0, 1))
+        self.assertFalse(AppointmentRiskScore.objects.exists())
+
+
+class BufferedTraceSinkTests(TransactionTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, "ai_traces.jsonl")
+        patcher = patch.object(observability, "TRACE_FILE", self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _row(self, n):
+        return {
+            "request_id": f"00000000-0000-0000-0000-{n:012d}",
+            "user_id": None,
+            "route": "/ai/rag/",
+            "operation_type": "rag_qa",
+            "llm_provider": "mock",
+            "rag_provider": "faiss",
+            "latency_ms": n,
+            "success": True,
+            "error_message": "",
+            "metadata": {"n": n},
+            "created_at": "2026-01-01T00:00:00+00:00",
+        }
+
+    def _lines(self, path):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_rows_are_batched_and_file_is_rotated(self):
+        sink = observability.BufferedTraceSink(self.path, max_bytes=600, backups=1)
+        for n in range(6):
+            sink.put(self._row(n))
+        self.assertTrue(sink.flush())
+        self.assertEqual(AiRequestTrace.objects.count(), 6)
+
+        sink.close()
+        rotated = self._lines(self.path + ".1")
+        current = self._lines(self.path)
+        self.assertTrue(rotated)
+        self.assertEqual(current[-1]["metadata"]["n"], 5)
+        self.assertLess(rotated[-1]["metadata"]["n"], current[0]["metadata"]["n"])
+        self.assertFalse(os.path.exists(self.path + ".2"))
+
+    def test_close_drains_queue(self):
+        sink = observability.BufferedTraceSink(self.path, flush_interval=60)
+        for n in range(3):
+            sink.put(self._row(n))
+        sink.close()
+        self.assertEqual(AiRequestTrace.objects.count(), 3)
+        self.assertEqual(len(self._lines(self.path)), 3)
+        sink.put(self._row(3))
+        self.assertEqual(AiRequestTrace.objects.count(), 4)
+
+    def test_rows_keep_the_trace_time(self):
+        sink = observability.BufferedTraceSink(self.path, flush_interval=60)
+        for n in range(3):
+            sink.put(self._row(n))
+        sink.close()
+        self.assertEqual(
+            {created.isoformat() for created in AiRequestTrace.objects.values_list("created_at", flat=True)},
+            {"2026-01-01T00:00:00+00:00"},
+        )
+
+    def test_each_process_writes_its_own_file(self):
+        with patch.object(observability, "_SINK", None):
+            sink = observability._sink()
+            sink.close()
+        self.assertEqual(sink.path, os.path.join(self.tmpdir, f"ai_traces.{os.getpid()}.jsonl"))
+        with patch.object(sink, "pid", -1), patch.object(observability, "_SINK", sink):
+            forked = observability._sink()
+            forked.close()
+        self.assertIsNot(forked, sink)
+
+    def test_full_queue_writes_inline(self):
+        release = threading.Event()
+        original = observability.BufferedTraceSink._write_batch
+
+        def blocked_write(sink, batch):
+            release.wait(5)
+            original(sink, batch)
+
+        with patch.object(observability.BufferedTraceSink, "_write_batch", blocked_write):
+            sink = observability.BufferedTraceSink(self.path, max_queue=1, enqueue_timeout=0.01)
+            sink.put(self._row(0))
+            deadline = time.time() + 5
+            while sink._queue.qsize() and time.time() < deadline:
+                time.sleep(0.01)
+            sink.put(self._row(1))
+            sink.put(self._row(2))
+            self.assertEqual(
+                list(AiRequestTrace.objects.values_list("latency_ms", flat=True)), [2]
+            )
+            release.set()
+            sink.close()
+        self.assertEqual(AiRequestTrace.objects.count(), 3)
+        self.assertEqual(sorted(row["latency_ms"] for row in self._lines(self.path)), [0, 1, 2])
+
+    def test_inline_writes_share_the_writer_handle(self):
+        sink = observability.BufferedTraceSink(self.path, flush_interval=60)
+        self.addCleanup(sink.close)
+        sink.put(self._row(0))
+        self.assertTrue(sink.flush())
+        with patch("builtins.open", side_effect=AssertionError("second handle opened")):
+            sink._append_inline(self._row(1))
+        sink.close()
+        self.assertEqual([row["latency_ms"] for row in self._lines(self.path)], [0, 1])
+
+
+class LatencyRollupTests(TestCase):
+    def _row(self, latency_ms, success=True, minute=5):
+        return {
+            "operation_type": "rag_qa",
+            "llm_provider": "openai",
+            "route": "/ai/rag/",
+            "latency_ms": latency_ms,
+            "success": success,
+            "created_at": f"2026-01-01T10:{minute:02d}:30+00:00",
+        }
+
+    def test_histogram_percentiles_are_within_bucket_precision(self):
+        values = np.random.default_rng(0).lognormal(mean=5, sigma=1, size=5000)
+        histogram = latency.LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+        for pct in latency.PERCENTILES:
+            exact = float(np.percentile(values, pct))
+            self.assertAlmostEqual(histogram.percentile(pct), exact, delta=exact * 0.03)
+
+    def test_rollups_from_two_processes_merge_per_minute(self):
+        first, second = latency.LatencyAggregator(), latency.LatencyAggregator()
+        first.record_many([self._row(100), self._row(200, success=False)])
+        second.record_many([self._row(300), self._row(400, minute=6)])
+        self.assertEqual(first.persist(), 1)
+        self.assertEqual(second.persist(), 2)
+
+        from datetime import datetime, timezone as dt_timezone
+
+        rollup = AiLatencyRollup.objects.get(
+            minute=datetime(2026, 1, 1, 10, 5, tzinfo=dt_timezone.utc)
+        )
+        self.assertEqual((rollup.count, rollup.error_count), (3, 1))
+        self.assertEqual((rollup.latency_sum_ms, rollup.max_latency_ms), (600, 300))
+
+        now = datetime(2026, 1, 1, 10, 7, tzinfo=dt_timezone.utc)
+        with self.assertNumQueries(1):
+            (row,) = latency.latency_summary(minutes=15, now=now)
+        self.assertEqual(row["count"], 4)
+        self.assertEqual(row["error_rate"], 0.25)
+        self.assertAlmostEqual(row["p50_ms"], 200, delta=4)
+        self.assertAlmostEqual(row["p99_ms"], 400, delta=8)
+        self.assertEqual(latency.latency_summary(minutes=15), [])
+
+    @override_settings(AI_FEATURES_ENABLED=True)
+    def test_eval_dashboard_shows_latency_percentiles(self):
+        aggregator = latency.LatencyAggregator()
+        row = self._row(120)
+        row["created_at"] = None
+        aggregator.record(row)
+        aggregator.persist()
+        response = self.client.get(reverse("ai-eval"), {"minutes": 15})
+        self.assertContains(response, "Live Latency (last 15 minutes)")
+        self.assertContains(response, "<code>/ai/rag/</code>", html=True)
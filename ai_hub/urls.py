@@ -4,9 +4,11 @@ from . import views
 urlpatterns = [
     path("", views.dashboard, name="ai-dashboard"),
     path("rag/", views.rag_qa, name="ai-rag"),
+    path("rag/stream/", views.rag_qa_stream, name="ai-rag-stream"),
     path("rag/compliance/", views.rag_compliance, name="rag-compliance"),
     path("rag/upload/", views.rag_upload, name="ai-rag-upload"),
     path("draft/", views.draft_assistant, name="ai-draft"),
+    path("draft/stream/", views.draft_assistant_stream, name="ai-draft-stream"),
     path("agent/compliance/", views.compliance_agent, name="ai-agent-compliance"),
     path("ml/no-show/", views.no_show_risk, name="ai-no-show"),
     path("nlp/triage/", views.complaint_classifier, name="ai-triage"),
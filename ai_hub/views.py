@@ -1,12 +1,15 @@
+import asyncio
 import json
 import os
 import time
 import re
 import logging
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.files.storage import FileSystemStorage
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
 
 from .models import (
@@ -18,14 +21,22 @@ from .models import (
     AgentRun,
     AgentStepTrace,
 )
-from .services.llm import generate_text
+from .services.llm import agenerate_text, stream_text
 from .services import ml as ml_service
 from .services.ml import predict_no_show, predict_department
 from .services.observability import new_request_id, trace_success, trace_error
-from .services.llm_client import generate_answer
+from .services.latency import latency_summary
+from .services.llm_client import agenerate_answer, stream_answer
+from .services.answer_cache import (
+    answer_cache_key,
+    aget_cached_answer,
+    aset_cached_answer,
+)
 
 logger = logging.getLogger(__name__)
 
+LATENCY_WINDOWS = (15, 60, 360, 1440)
+
 
 def _ai_enabled():
     return getattr(settings, "AI_FEATURES_ENABLED", False)
@@ -46,6 +57,15 @@ def _rate_limit_ok(request, limit=10, window_seconds=60):
     return data["count"] <= limit
 
 
+def _request_user(request):
+    return request.user if request.user.is_authenticated else None
+
+
+async def _arender(request, template_name, context=None, status=None):
+    # Context processors touch the session and user, which are sync-only.
+    return await sync_to_async(render)(request, template_name, context, status=status)
+
+
 def _redact_pii(text: str) -> str:
     if not text:
         return text
@@ -54,6 +74,60 @@ def _redact_pii(text: str) -> str:
     return text
 
 
+def _rag_prompt(safe_query, citations, redact):
+    context_lines = []
+    for c in citations:
+        context_lines.append(f"[{c.get('source')}] {c.get('snippet')}")
+    context_block = "\n".join(context_lines)
+
+    redaction_rules = ""
+    if redact:
+        redaction_rules = (
+            "Redaction rules: replace any identifiers with placeholders like "
+            "[PATIENT_NAME], [PATIENT_ID], [PHONE], [EMAIL].\n"
+        )
+
+    return (
+        "Use the provided context to answer the question. "
+        "Cite sources using [source] tags. Do not add facts.\n"
+        f"{redaction_rules}\n"
+        f"Context:\n{context_block}\n\n"
+        f"Question: {safe_query}\n"
+    )
+
+
+def _rag_cache_key(safe_query, redact, model, provider, version):
+    return answer_cache_key(
+        safe_query,
+        redact,
+        model,
+        "mock" if getattr(settings, "AI_MOCK_MODE", False) else provider,
+        version,
+    )
+
+
+def _ndjson(payload):
+    return json.dumps(payload, ensure_ascii=True) + "\n"
+
+
+async def _aiter_blocking(iterator):
+    """Yield from a blocking iterator, running each next() on a worker thread
+    so the event loop sends every chunk as soon as the provider produces it."""
+    done = object()
+    while True:
+        item = await sync_to_async(next, thread_sensitive=False)(iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+def _stream_response(lines):
+    response = StreamingHttpResponse(lines, content_type="application/x-ndjson")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 def dashboard(request):
     if not _ai_enabled():
         return render(request, "ai_hub/disabled.html")
@@ -64,15 +138,15 @@ def rag_compliance(request):
     return render(request, "ai_hub/agent_compliance.html")
 
 
-def rag_qa(request):
+async def rag_qa(request):
     if not _ai_enabled():
-        return render(request, "ai_hub/disabled.html")
+        return await _arender(request, "ai_hub/disabled.html")
 
     try:
-        from .services.rag import retrieve
+        from .services.rag import retrieve, index_version
     except ModuleNotFoundError:
         messages.error(request, "AI features are unavailable on this deployment.")
-        return render(request, "ai_hub/disabled.html")
+        return await _arender(request, "ai_hub/disabled.html")
 
     answer = ""
     citations = []
@@ -80,9 +154,10 @@ def rag_qa(request):
     request_id = ""
     error_message = ""
     if request.method == "POST":
-        if not _rate_limit_ok(request):
+        if not await sync_to_async(_rate_limit_ok)(request):
             messages.error(request, "Rate limit exceeded. Please wait and try again.")
             return redirect("ai-rag")
+        user = await sync_to_async(_request_user)(request)
         op_request_id = new_request_id()
         request_id = op_request_id
         start = time.time()
@@ -91,41 +166,32 @@ def rag_qa(request):
             query = request.POST.get("query", "")
             redact = request.POST.get("redact") == "on"
             safe_query = _redact_pii(query) if redact else query
-            citations, latency_ms = retrieve(safe_query, top_k=top_k)
-            context_lines = []
-            for c in citations:
-                context_lines.append(f"[{c.get('source')}] {c.get('snippet')}")
-            context_block = "\n".join(context_lines)
-
-            redaction_rules = ""
-            if redact:
-                redaction_rules = (
-                    "Redaction rules: replace any identifiers with placeholders like "
-                    "[PATIENT_NAME], [PATIENT_ID], [PHONE], [EMAIL].\n"
+            model = getattr(settings, "LLM_MODEL", "gpt-4o-mini")
+            provider = getattr(settings, "LLM_PROVIDER", "openai")
+            cache_key = _rag_cache_key(safe_query, redact, model, provider, index_version())
+            cached = await aget_cached_answer(cache_key)
+            cache_hit = cached is not None
+            if cache_hit:
+                answer = cached["answer"]
+                citations = cached["citations"]
+                latency_ms = 0
+            else:
+                citations, latency_ms = await sync_to_async(retrieve, thread_sensitive=False)(
+                    safe_query, top_k=top_k
                 )
-
-            prompt = (
-                "Use the provided context to answer the question. "
-                "Cite sources using [source] tags. Do not add facts.\n"
-                f"{redaction_rules}\n"
-                f"Context:\n{context_block}\n\n"
-                f"Question: {safe_query}\n"
-            )
-            answer = generate_answer(
-                prompt,
-                model=getattr(settings, "LLM_MODEL", "gpt-4o-mini"),
-                provider=getattr(settings, "LLM_PROVIDER", "openai"),
-            )
-            AgentQueryLog.objects.create(
-                user=request.user if request.user.is_authenticated else None,
+                prompt = _rag_prompt(safe_query, citations, redact)
+                answer = await agenerate_answer(prompt, model=model, provider=provider)
+                await aset_cached_answer(cache_key, answer, citations)
+            await AgentQueryLog.objects.acreate(
+                user=user,
                 query=query,
                 response=answer,
                 latency_ms=latency_ms,
                 metadata={"citations": citations},
             )
-            trace_success(
+            await sync_to_async(trace_success)(
                 request_id=op_request_id,
-                user=request.user,
+                user=user,
                 route=request.path,
                 operation_type="rag_qa",
                 latency_ms=int((time.time() - start) * 1000),
@@ -136,20 +202,21 @@ def rag_qa(request):
                     "sources": [c.get("source") for c in citations],
                     "citations_count": len(citations),
                     "redact": redact,
+                    "cache": "hit" if cache_hit else "miss",
                 },
             )
         except ValueError as exc:
             error_message = str(exc)
             logger.error("RAG LLM configuration error: %s", error_message)
-            trace_error(
+            await sync_to_async(trace_error)(
                 request_id=op_request_id,
-                user=request.user,
+                user=user,
                 route=request.path,
                 operation_type="rag_qa",
                 latency_ms=int((time.time() - start) * 1000),
                 error_message=error_message,
             )
-            return render(
+            return await _arender(
                 request,
                 "ai_hub/rag_qa.html",
                 {
@@ -162,16 +229,16 @@ def rag_qa(request):
                 status=400,
             )
         except Exception as exc:
-            trace_error(
+            await sync_to_async(trace_error)(
                 request_id=op_request_id,
-                user=request.user,
+                user=user,
                 route=request.path,
                 operation_type="rag_qa",
                 latency_ms=int((time.time() - start) * 1000),
                 error_message=str(exc),
             )
             raise
-    return render(
+    return await _arender(
         request,
         "ai_hub/rag_qa.html",
         {
@@ -201,21 +268,150 @@ def rag_upload(request):
         KnowledgeDocument.objects.get_or_create(
             name=filename, path=path, defaults={"checksum": "pending"}
         )
-        messages.success(request, "Document uploaded. Run build_rag_index.")
+        messages.success(request, "Document uploaded. Run build_rag_index --incremental.")
     return render(request, "ai_hub/rag_upload.html")
 
 
-def draft_assistant(request):
+async def rag_qa_stream(request):
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
     if not _ai_enabled():
-        return render(request, "ai_hub/disabled.html")
+        return JsonResponse({"error": "AI features are disabled."}, status=404)
+    try:
+        from .services.rag import retrieve, index_version
+    except ModuleNotFoundError:
+        return JsonResponse({"error": "AI features are unavailable on this deployment."}, status=503)
+    if not await sync_to_async(_rate_limit_ok)(request):
+        return JsonResponse({"error": "Rate limit exceeded. Please wait and try again."}, status=429)
+
+    user = await sync_to_async(_request_user)(request)
+    op_request_id = new_request_id()
+    start = time.time()
+    top_k = 3
+    query = request.POST.get("query", "")
+    redact = request.POST.get("redact") == "on"
+    safe_query = _redact_pii(query) if redact else query
+    model = getattr(settings, "LLM_MODEL", "gpt-4o-mini")
+    provider = getattr(settings, "LLM_PROVIDER", "openai")
+    try:
+        cache_key = _rag_cache_key(safe_query, redact, model, provider, index_version())
+        cached = await aget_cached_answer(cache_key)
+        cache_hit = cached is not None
+        if cache_hit:
+            citations = cached["citations"]
+            retrieval_ms = 0
+            tokens = iter([cached["answer"]])
+        else:
+            citations, retrieval_ms = await sync_to_async(retrieve, thread_sensitive=False)(
+                safe_query, top_k=top_k
+            )
+            tokens = stream_answer(
+                _rag_prompt(safe_query, citations, redact), model=model, provider=provider
+            )
+        # Pull the first piece before responding so configuration errors
+        # still produce a 400 rather than a broken stream.
+        first = await sync_to_async(next, thread_sensitive=False)(tokens, "")
+    except ValueError as exc:
+        error_message = str(exc)
+        logger.error("RAG LLM configuration error: %s", error_message)
+        await sync_to_async(trace_error)(
+            request_id=op_request_id,
+            user=user,
+            route=request.path,
+            operation_type="rag_qa",
+            latency_ms=int((time.time() - start) * 1000),
+            error_message=error_message,
+            metadata={"stream": True},
+        )
+        return JsonResponse({"error": error_message}, status=400)
+    except Exception as exc:
+        await sync_to_async(trace_error)(
+            request_id=op_request_id,
+            user=user,
+            route=request.path,
+            operation_type="rag_qa",
+            latency_ms=int((time.time() - start) * 1000),
+            error_message=str(exc),
+            metadata={"stream": True},
+        )
+        raise
+    ttft_ms = int((time.time() - start) * 1000)
+
+    async def lines():
+        parts = [first]
+        yield _ndjson(
+            {
+                "request_id": str(op_request_id),
+                "citations": [
+                    {"source": c.get("source"), "snippet": c.get("snippet")}
+                    for c in citations
+                ],
+            }
+        )
+        if first:
+            yield _ndjson({"delta": first})
+        try:
+            async for token in _aiter_blocking(tokens):
+                parts.append(token)
+                yield _ndjson({"delta": token})
+        except Exception as exc:
+            logger.exception("RAG answer stream failed")
+            await sync_to_async(trace_error)(
+                request_id=op_request_id,
+                user=user,
+                route=request.path,
+                operation_type="rag_qa",
+                latency_ms=int((time.time() - start) * 1000),
+                error_message=str(exc),
+                metadata={"stream": True, "ttft_ms": ttft_ms},
+            )
+            yield _ndjson({"error": "The answer stream was interrupted."})
+            return
+        answer = "".join(parts)
+        if not cache_hit:
+            await aset_cached_answer(cache_key, answer, citations)
+        await AgentQueryLog.objects.acreate(
+            user=user,
+            query=query,
+            response=answer,
+            latency_ms=retrieval_ms,
+            metadata={"citations": citations},
+        )
+        await sync_to_async(trace_success)(
+            request_id=op_request_id,
+            user=user,
+            route=request.path,
+            operation_type="rag_qa",
+            latency_ms=int((time.time() - start) * 1000),
+            metadata={
+                "query": safe_query,
+                "top_k": top_k,
+                "scores": [c.get("score") for c in citations],
+                "sources": [c.get("source") for c in citations],
+                "citations_count": len(citations),
+                "redact": redact,
+                "cache": "hit" if cache_hit else "miss",
+                "stream": True,
+                "ttft_ms": ttft_ms,
+            },
+        )
+        yield _ndjson({"done": True})
+
+    return _stream_response(lines())
+
+
+async def draft_assistant(request):
+    if not _ai_enabled():
+        return await _arender(request, "ai_hub/disabled.html")
 
     draft = ""
     instructions = ""
     request_id = ""
     if request.method == "POST":
-        if not _rate_limit_ok(request):
+        if not await sync_to_async(_rate_limit_ok)(request):
             messages.error(request, "Rate limit exceeded. Please wait and try again.")
             return redirect("ai-draft")
+        user = await sync_to_async(_request_user)(request)
         op_request_id = new_request_id()
         request_id = str(op_request_id)
         start = time.time()
@@ -227,14 +423,12 @@ def draft_assistant(request):
                 "Draft a discharge summary and patient-friendly instructions.\n\n"
                 f"Notes:\n{safe_notes}\n"
             )
-            response = generate_text(prompt)
-            parts = response.split("\n\n", 1)
-            draft = parts[0]
-            instructions = parts[1] if len(parts) > 1 else ""
+            response = await agenerate_text(prompt)
+            draft, instructions = _split_draft(response)
             reviewed = request.POST.get("reviewed") == "on"
             if reviewed:
-                AiDraft.objects.create(
-                    user=request.user if request.user.is_authenticated else None,
+                await AiDraft.objects.acreate(
+                    user=user,
                     patient_id=request.POST.get("patient_id") or None,
                     notes=notes,
                     draft_text=draft,
@@ -242,9 +436,9 @@ def draft_assistant(request):
                     reviewed=True,
                 )
                 messages.success(request, "Draft saved.")
-            trace_success(
+            await sync_to_async(trace_success)(
                 request_id=op_request_id,
-                user=request.user,
+                user=user,
                 route=request.path,
                 operation_type="draft",
                 latency_ms=int((time.time() - start) * 1000),
@@ -255,91 +449,232 @@ def draft_assistant(request):
                 },
             )
         except Exception as exc:
-            trace_error(
+            await sync_to_async(trace_error)(
                 request_id=op_request_id,
-                user=request.user,
+                user=user,
                 route=request.path,
                 operation_type="draft",
                 latency_ms=int((time.time() - start) * 1000),
                 error_message=str(exc),
             )
             raise
-    return render(
+    return await _arender(
         request,
         "ai_hub/draft_assistant.html",
         {"draft": draft, "instructions": instructions, "request_id": request_id},
     )
 
 
-def compliance_agent(request):
+def _split_draft(response):
+    parts = response.split("\n\n", 1)
+    return parts[0], parts[1] if len(parts) > 1 else ""
+
+
+async def draft_assistant_stream(request):
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    if not _ai_enabled():
+        return JsonResponse({"error": "AI features are disabled."}, status=404)
+    if not await sync_to_async(_rate_limit_ok)(request):
+        return JsonResponse({"error": "Rate limit exceeded. Please wait and try again."}, status=429)
+
+    user = await sync_to_async(_request_user)(request)
+    op_request_id = new_request_id()
+    start = time.time()
+    notes = request.POST.get("notes", "")
+    redact = request.POST.get("redact") == "on"
+    reviewed = request.POST.get("reviewed") == "on"
+    patient_id = request.POST.get("patient_id") or None
+    safe_notes = _redact_pii(notes) if redact else notes
+    prompt = (
+        "Draft a discharge summary and patient-friendly instructions.\n\n"
+        f"Notes:\n{safe_notes}\n"
+    )
+    tokens = stream_text(prompt)
+    try:
+        # As in rag_qa_stream, setup and provider errors surface before the
+        # 200 is sent.
+        first = await sync_to_async(next, thread_sensitive=False)(tokens, "")
+    except Exception as exc:
+        await sync_to_async(trace_error)(
+            request_id=op_request_id,
+            user=user,
+            route=request.path,
+            operation_type="draft",
+            latency_ms=int((time.time() - start) * 1000),
+            error_message=str(exc),
+            metadata={"stream": True},
+        )
+        if isinstance(exc, ValueError):
+            logger.error("Draft LLM configuration error: %s", exc)
+            return JsonResponse({"error": str(exc)}, status=400)
+        raise
+    ttft_ms = int((time.time() - start) * 1000)
+
+    async def lines():
+        parts = [first]
+        yield _ndjson({"request_id": str(op_request_id)})
+        if first:
+            yield _ndjson({"delta": first})
+        try:
+            async for token in _aiter_blocking(tokens):
+                parts.append(token)
+                yield _ndjson({"delta": token})
+            draft, instructions = _split_draft("".join(parts))
+            if reviewed:
+                await AiDraft.objects.acreate(
+                    user=user,
+                    patient_id=patient_id,
+                    notes=notes,
+                    draft_text=draft,
+                    patient_instructions=instructions,
+                    reviewed=True,
+                )
+        except Exception as exc:
+            logger.exception("Draft stream failed")
+            await sync_to_async(trace_error)(
+                request_id=op_request_id,
+                user=user,
+                route=request.path,
+                operation_type="draft",
+                latency_ms=int((time.time() - start) * 1000),
+                error_message=str(exc),
+                metadata={"stream": True, "ttft_ms": ttft_ms},
+            )
+            yield _ndjson({"error": "The draft stream was interrupted."})
+            return
+        await sync_to_async(trace_success)(
+            request_id=op_request_id,
+            user=user,
+            route=request.path,
+            operation_type="draft",
+            latency_ms=int((time.time() - start) * 1000),
+            metadata={
+                "notes": safe_notes,
+                "reviewed": reviewed,
+                "redact": redact,
+                "stream": True,
+                "ttft_ms": ttft_ms,
+            },
+        )
+        yield _ndjson({"done": True, "draft": draft, "instructions": instructions})
+
+    return _stream_response(lines())
+
+
+def _split_drafts(text):
+    """Split a batch on lines containing only ---, dropping empty drafts."""
+    drafts = re.split(r"^\s*---\s*$", text, flags=re.MULTILINE)
+    return [draft.strip() for draft in drafts if draft.strip()]
+
+
+async def compliance_agent(request):
     if not _ai_enabled() or not _agents_enabled():
-        return render(request, "ai_hub/disabled.html")
+        return await _arender(request, "ai_hub/disabled.html")
 
     try:
-        from .services.agent import run_compliance_agent
+        from .services.agent import STEP_DEPENDENCIES, arun_compliance_agent
     except ModuleNotFoundError:
         messages.error(request, "AI features are unavailable on this deployment.")
-        return render(request, "ai_hub/disabled.html")
+        return await _arender(request, "ai_hub/disabled.html")
 
-    trace = []
-    report = ""
+    runs = []
     request_id = ""
     if request.method == "POST":
-        if not _rate_limit_ok(request):
+        if not await sync_to_async(_rate_limit_ok)(request):
             messages.error(request, "Rate limit exceeded. Please wait and try again.")
             return redirect("ai-agent-compliance")
+        user = await sync_to_async(_request_user)(request)
         op_request_id = new_request_id()
         request_id = str(op_request_id)
         start = time.time()
         try:
-            text = request.POST.get("text", "")
             redact = request.POST.get("redact") == "on"
-            safe_text = _redact_pii(text) if redact else text
-            result = run_compliance_agent(safe_text, use_llm=True)
-            trace = result["steps"]
-            report = trace[-1]["output"] if trace else ""
-            run = AgentRun.objects.create(
-                user=request.user if request.user.is_authenticated else None,
-                run_type="policy_compliance",
-                status="success",
-                total_latency_ms=result["latency_ms"],
+            drafts = _split_drafts(request.POST.get("text", ""))
+            max_batch = getattr(settings, "AGENT_MAX_BATCH", 10)
+            if len(drafts) > max_batch:
+                messages.warning(request, f"Only the first {max_batch} drafts were checked.")
+                drafts = drafts[:max_batch]
+            safe_texts = [_redact_pii(text) if redact else text for text in drafts]
+            results = await asyncio.gather(
+                *[arun_compliance_agent(text, use_llm=True) for text in safe_texts]
             )
-            for step in trace:
-                AgentStepTrace.objects.create(
-                    run=run,
-                    step_name=step["step"],
-                    input_text=safe_text,
-                    output_text=step["output"],
-                    latency_ms=0,
+            # Every draft retrieves with the same policy query.
+            citations = results[0]["citations"] if results else []
+            for safe_text, result in zip(safe_texts, results):
+                trace = result["steps"]
+                statuses = {step["status"] for step in trace}
+                run = await AgentRun.objects.acreate(
+                    user=user,
+                    run_type="policy_compliance",
+                    status="success" if statuses == {"success"} else "partial",
+                    total_latency_ms=result["latency_ms"],
+                )
+                await AgentStepTrace.objects.abulk_create(
+                    [
+                        AgentStepTrace(
+                            run=run,
+                            step_name=step["step"],
+                            input_text=safe_text,
+                            output_text=step["output"],
+                            latency_ms=step["latency_ms"],
+                        )
+                        for step in trace
+                    ]
+                )
+                runs.append({"trace": trace, "report": trace[-1]["output"] if trace else ""})
+            metadata = {
+                "step_names": list(STEP_DEPENDENCIES),
+                "retrieved_sources": [c.get("source") for c in citations],
+                "citations_count": len(citations),
+                "redact": redact,
+                "batch_size": len(drafts),
+                "step_latency_ms": [
+                    {step["step"]: step["latency_ms"] for step in result["steps"]}
+                    for result in results
+                ],
+            }
+            # Steps report their own failures, so a missing LLM key or a
+            # provider error in REPORT does not raise here.
+            failed_steps = [
+                f"{step['step']} {step['status']}: {step['output']}"
+                for result in results
+                for step in result["steps"]
+                if step["status"] != "success"
+            ]
+            if failed_steps:
+                await sync_to_async(trace_error)(
+                    request_id=op_request_id,
+                    user=user,
+                    route=request.path,
+                    operation_type="compliance_agent",
+                    latency_ms=int((time.time() - start) * 1000),
+                    error_message="; ".join(failed_steps),
+                    metadata=metadata,
+                )
+            else:
+                await sync_to_async(trace_success)(
+                    request_id=op_request_id,
+                    user=user,
+                    route=request.path,
+                    operation_type="compliance_agent",
+                    latency_ms=int((time.time() - start) * 1000),
+                    metadata=metadata,
                 )
-            citations = result.get("citations", [])
-            trace_success(
-                request_id=op_request_id,
-                user=request.user,
-                route=request.path,
-                operation_type="compliance_agent",
-                latency_ms=int((time.time() - start) * 1000),
-                metadata={
-                    "step_names": [step.get("step") for step in trace],
-                    "retrieved_sources": [c.get("source") for c in citations],
-                    "citations_count": len(citations),
-                    "redact": redact,
-                },
-            )
         except Exception as exc:
-            trace_error(
+            await sync_to_async(trace_error)(
                 request_id=op_request_id,
-                user=request.user,
+                user=user,
                 route=request.path,
                 operation_type="compliance_agent",
                 latency_ms=int((time.time() - start) * 1000),
                 error_message=str(exc),
             )
             raise
-    return render(
+    return await _arender(
         request,
         "ai_hub/agent_compliance.html",
-        {"trace": trace, "report": report, "request_id": request_id},
+        {"runs": runs, "request_id": request_id},
     )
 
 
@@ -361,11 +696,7 @@ def no_show_risk(request):
             features = {"days_until": days_until, "hour": hour}
             score = predict_no_show(features)
             scores.append({"appointment_id": "demo", "risk": score})
-            model_version = (
-                int(os.path.getmtime(ml_service.NO_SHOW_MODEL_PATH))
-                if os.path.exists(ml_service.NO_SHOW_MODEL_PATH)
-                else "missing"
-            )
+            model_version = ml_service.model_version("no_show")
             trace_success(
                 request_id=op_request_id,
                 user=request.user,
@@ -416,11 +747,7 @@ def complaint_classifier(request):
                 metadata={},
             )
             prediction = {"label": override or pred, "confidence": conf}
-            model_version = (
-                int(os.path.getmtime(ml_service.COMPLAINT_MODEL_PATH))
-                if os.path.exists(ml_service.COMPLAINT_MODEL_PATH)
-                else "missing"
-            )
+            model_version = ml_service.model_version("complaint")
             trace_success(
                 request_id=op_request_id,
                 user=request.user,
@@ -473,8 +800,20 @@ def eval_dashboard(request):
         except Exception:
             agent_results = None
 
+    try:
+        window = int(request.GET.get("minutes", 60))
+    except ValueError:
+        window = 60
+    window = window if window in LATENCY_WINDOWS else 60
+
     return render(
         request,
         "ai_hub/eval_dashboard.html",
-        {"rag_results": rag_results, "agent_results": agent_results},
+        {
+            "rag_results": rag_results,
+            "agent_results": agent_results,
+            "latency_rows": latency_summary(minutes=window),
+            "latency_window": window,
+            "latency_windows": LATENCY_WINDOWS,
+        },
     )
@@ -8,6 +8,7 @@ from django.db.models.deletion import ProtectedError
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
+from .admin_lists import appointment_page, doctor_page, invoice_page, patient_page
 from .email_utils import send_consultation_email, send_invoice_email
 from .forms_admin_dashboard import (
     AdminUserForm,
@@ -29,8 +30,10 @@ def is_admin(user):
 @user_passes_test(is_admin)
 def adm2_doctor_list(request):
     try:
-        doctors = Doctor.objects.select_related("user")
-        return render(request, "hospital/admin_view_doctor.html", {"doctors": doctors})
+        page = doctor_page(request, Doctor.objects.all())
+        return render(
+            request, "hospital/admin_view_doctor.html", {"doctors": page, "page": page}
+        )
     except Exception:
         logger.exception("adm2_doctor_list failed")
         messages.error(request, "Unable to load doctors at this time.")
@@ -145,9 +148,9 @@ def adm2_doctor_approve(request, pk):
 @user_passes_test(is_admin)
 def adm2_patient_list(request):
     try:
-        patients = Patient.objects.select_related("user")
+        page = patient_page(request, Patient.objects.all())
         return render(
-            request, "hospital/admin_view_patient.html", {"patients": patients}
+            request, "hospital/admin_view_patient.html", {"patients": page, "page": page}
         )
     except Exception:
         logger.exception("adm2_patient_list failed")
@@ -263,13 +266,11 @@ def adm2_patient_admit(request, pk):
 @user_passes_test(is_admin)
 def adm2_appointment_list(request):
     try:
-        appointments = Appointment.objects.select_related(
-            "doctor__user", "patient__user"
-        )
+        page = appointment_page(request, Appointment.objects.all())
         return render(
             request,
             "hospital/admin_view_appointment.html",
-            {"appointments": appointments},
+            {"appointments": page, "page": page},
         )
     except Exception:
         logger.exception("adm2_appointment_list failed")
@@ -450,11 +451,11 @@ def adm2_discharge_patient(request, pk):
 @user_passes_test(is_admin)
 def adm2_invoice_list(request):
     try:
-        invoices = Invoice.objects.select_related("patient__user").order_by("-id")
+        page = invoice_page(request, Invoice.objects.all())
         return render(
             request,
             "hospital/adm2_invoice_list.html",
-            {"invoices": invoices},
+            {"invoices": page, "page": page},
         )
     except Exception:
         logger.exception("adm2_invoice_list failed")
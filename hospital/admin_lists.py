@@ -0,0 +1,94 @@
+"""Sort, search and status options for each paginated admin list.
+
+Both admin view modules page their tables through these helpers so that a
+model's list looks and filters the same wherever it is shown.
+"""
+from django.db.models import Q
+
+from .models import Appointment, ConsultationRequest
+from .pagination import SortOption, StatusFilter, paginate
+
+_USER_SEARCH = ("user__first_name", "user__last_name", "user__username")
+
+APPROVAL_STATUSES = {
+    "approved": StatusFilter("Approved", Q(status=True)),
+    "pending": StatusFilter("Pending", Q(status=False)),
+}
+
+
+def doctor_page(request, queryset):
+    return paginate(
+        request,
+        queryset.select_related("user"),
+        sorts={"created": SortOption("Date joined", "created_at")},
+        default_sort="created",
+        search_fields=_USER_SEARCH + ("department", "mobile"),
+        statuses=APPROVAL_STATUSES,
+    )
+
+
+def patient_page(request, queryset, statuses=APPROVAL_STATUSES):
+    return paginate(
+        request,
+        queryset.select_related("user"),
+        sorts={"created": SortOption("Date admitted", "created_at")},
+        default_sort="created",
+        search_fields=_USER_SEARCH + ("mobile", "symptoms"),
+        statuses=statuses,
+    )
+
+
+def appointment_page(request, queryset, statuses=None, default_direction="desc"):
+    if statuses is None:
+        statuses = {
+            value: StatusFilter(label, Q(status=value)) for value, label in Appointment.STATUS_CHOICES
+        }
+    return paginate(
+        request,
+        queryset.select_related("doctor__user", "patient__user"),
+        sorts={
+            "date": SortOption("Appointment date", "date_time"),
+            "created": SortOption("Date booked", "created_at"),
+        },
+        default_sort="date",
+        default_direction=default_direction,
+        search_fields=(
+            "doctor__user__first_name",
+            "doctor__user__last_name",
+            "patient__user__first_name",
+            "patient__user__last_name",
+            "description",
+        ),
+        statuses=statuses,
+    )
+
+
+def invoice_page(request, queryset):
+    return paginate(
+        request,
+        queryset.select_related("patient__user"),
+        sorts={"created": SortOption("Date issued", "created_at")},
+        default_sort="created",
+        search_fields=("patient__user__first_name", "patient__user__last_name", "status"),
+        statuses={
+            "paid": StatusFilter("Paid", Q(paid=True)),
+            "unpaid": StatusFilter("Unpaid", Q(paid=False)),
+        },
+    )
+
+
+def consultation_request_page(request, queryset):
+    return paginate(
+        request,
+        queryset,
+        sorts={
+            "created": SortOption("Date received", "created_at"),
+            "preferred": SortOption("Preferred date", "preferred_date"),
+        },
+        default_sort="created",
+        search_fields=("full_name", "email", "phone"),
+        statuses={
+            value: StatusFilter(label, Q(status=value))
+            for value, label in ConsultationRequest.STATUS_CHOICES
+        },
+    )
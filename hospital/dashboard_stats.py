@@ -0,0 +1,64 @@
+"""Admin dashboard counters and recent rows, cached for a short TTL.
+
+The three counters come from one SELECT: conditional Count()s over the
+doctor table with the patient and pending-appointment counts as scalar
+subqueries. The whole dashboard context is cached for
+ADMIN_DASHBOARD_CACHE_TTL seconds in the default cache and dropped by the
+signals in hospital.signals when a doctor's approval, a patient or an
+appointment's status changes, so polling the dashboard does not touch the
+database. Bulk updates skip signals and show up when the TTL runs out.
+"""
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Subquery, Value
+
+from .models import Appointment, Doctor, Patient
+
+CACHE_KEY = "hospital:admin_dashboard"
+
+
+def _aggregate_row(queryset, **aggregates):
+    # Grouping by a constant leaves no GROUP BY, so this is one row per table.
+    return queryset.order_by().annotate(_row=Value(1)).values("_row").annotate(**aggregates)
+
+
+def dashboard_counts() -> Dict[str, int]:
+    patients = _aggregate_row(Patient.objects.all(), total=Count("pk"))
+    # Filtering in WHERE (not inside Count) lets this use appointment_pending_idx.
+    appointments = _aggregate_row(
+        Appointment.objects.filter(status="pending"), pending=Count("pk")
+    )
+    row = _aggregate_row(
+        Doctor.objects.all(),
+        pending_doctors=Count("pk", filter=Q(status=False)),
+        patients=Subquery(patients.values("total")),
+        pending_appointments=Subquery(appointments.values("pending")),
+    ).get()
+    return {
+        "pending_doctors": row["pending_doctors"],
+        # total patients (you could also track pending separately if needed)
+        "pending_patients": row["patients"] or 0,
+        "pending_appointments": row["pending_appointments"] or 0,
+    }
+
+
+def admin_dashboard_context() -> Dict:
+    context = cache.get(CACHE_KEY)
+    if context is None:
+        context = dashboard_counts()
+        context["recent_doctors"] = list(
+            Doctor.objects.select_related("user").filter(status=True).order_by("-id")[:5]
+        )
+        context["recent_patients"] = list(
+            Patient.objects.select_related("user").order_by("-id")[:5]
+        )
+        cache.set(CACHE_KEY, context, getattr(settings, "ADMIN_DASHBOARD_CACHE_TTL", 30))
+    return context
+
+
+def invalidate_admin_dashboard() -> None:
+    """Drop the cached dashboard once the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
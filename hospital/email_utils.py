@@ -3,6 +3,8 @@ import logging
 from django.conf import settings
 from django.core.mail import EmailMessage, send_mail
 
+from hospitalmanagement.metrics import timed
+
 from .models import EmailLog
 
 logger = logging.getLogger(__name__)
@@ -24,6 +26,7 @@ def _log_email(to_email, subject, event_type, status, error_message=""):
         )
 
 
+@timed("send_consultation_email")
 def send_consultation_email(appointment, event_type):
     subject = "Hospital Appointment Notification"
     body = (
@@ -65,6 +68,7 @@ def send_consultation_email(appointment, event_type):
         return False
 
 
+@timed("send_invoice_email")
 def send_invoice_email(invoice, pdf_bytes):
     subject = "Your Hospital Invoice"
     to_email = invoice.patient.user.email if invoice.patient and invoice.patient.user else ""
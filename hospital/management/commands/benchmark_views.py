@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from hospital.benchmarks import BENCHMARK_VIEWS, data_counts, run_view_benchmarks, write_results
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every list and dashboard view as its role, check query and latency "
+        "budgets, and write the results as JSON. Run seed_benchmark_data first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Timed requests per view.")
+        parser.add_argument(
+            "--output", default="view_benchmark_results.json", help="Results file (JSON)."
+        )
+        parser.add_argument(
+            "--view", action="append", default=[], help="Only benchmark this URL name (repeatable)."
+        )
+        parser.add_argument(
+            "--fail-on-budget",
+            action="store_true",
+            help="Exit with an error when any view is over its budget.",
+        )
+
+    def handle(self, *args, **options):
+        views = BENCHMARK_VIEWS
+        if options["view"]:
+            views = [bench for bench in BENCHMARK_VIEWS if bench.url_name in options["view"]]
+            if not views:
+                raise CommandError("No benchmarked view matches --view.")
+        results = run_view_benchmarks(views, repeat=options["repeat"], log=self._report)
+        payload = write_results(options["output"], results, data_counts())
+        self.stdout.write(f"Output: {options['output']}")
+        if payload["errors"]:
+            raise CommandError(f"Non-200 responses: {', '.join(payload['errors'])}")
+        if payload["failures"] and options["fail_on_budget"]:
+            raise CommandError(f"Over budget: {', '.join(payload['failures'])}")
+
+    def _report(self, row):
+        if not row["status_ok"]:
+            flag = "ERROR"
+        elif row["queries_ok"] and row["latency_ok"]:
+            flag = "ok"
+        else:
+            flag = "OVER BUDGET"
+        self.stdout.write(
+            f"{row['url_name']:<34} {row['status_code']} "
+            f"{row['queries']:>4}/{row['max_queries']} queries  "
+            f"p50 {row['p50_ms']:>9} ms / {row['max_ms']:g} ms  {flag}"
+        )
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from hospital.patient_summary import REFRESH_BATCH_SIZE, refresh_patient_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild PatientSummary rows (after bulk imports or writes that skip signals)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--patient",
+            type=int,
+            action="append",
+            dest="patients",
+            help="Only refresh this patient id (repeatable). Default: every patient.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=REFRESH_BATCH_SIZE,
+            help="Summaries upserted per bulk_create round.",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        refreshed = refresh_patient_summaries(
+            options["patients"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            f"Refreshed {refreshed} patient summaries in {time.perf_counter() - start:.2f}s."
+        )
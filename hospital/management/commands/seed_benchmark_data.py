@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from hospital.benchmarks import clear_benchmark_data, seed_benchmark_data
+
+
+class Command(BaseCommand):
+    help = "Bulk-seed benchmark doctors, patients and appointments (bench_* users)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--doctors", type=int, default=2000)
+        parser.add_argument("--patients", type=int, default=100000)
+        parser.add_argument("--appointments", type=int, default=1000000)
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for reproducible data.")
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep existing bench_* data instead of deleting it first.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Seed even though DEBUG is off (never against a production database).",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError(
+                "DEBUG is off; refusing to seed benchmark data. Pass --force to seed anyway."
+            )
+        start = time.perf_counter()
+        if not options["keep"]:
+            deleted = clear_benchmark_data()
+            if deleted:
+                self.stdout.write(f"Deleted {deleted} existing benchmark rows.")
+        counts = seed_benchmark_data(
+            doctors=options["doctors"],
+            patients=options["patients"],
+            appointments=options["appointments"],
+            seed=options["seed"],
+            log=lambda message: self.stdout.write(f"  {message}"),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {counts['doctors']} doctors, {counts['patients']} patients and "
+                f"{counts['appointments']} appointments in {time.perf_counter() - start:.1f}s."
+            )
+        )
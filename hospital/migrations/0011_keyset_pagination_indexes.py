@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+from hospital.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("hospital", "0010_discharge_payment_fields"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="appointment",
+            index=models.Index(fields=["date_time", "id"], name="appointment_date_id_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="appointment",
+            index=models.Index(fields=["created_at", "id"], name="appointment_created_id_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="consultationrequest",
+            index=models.Index(fields=["created_at", "id"], name="consultation_created_id_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="consultationrequest",
+            index=models.Index(fields=["preferred_date", "id"], name="consultation_date_id_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="doctor",
+            index=models.Index(fields=["created_at", "id"], name="doctor_created_id_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="invoice",
+            index=models.Index(fields=["created_at", "id"], name="invoice_created_id_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="patient",
+            index=models.Index(fields=["created_at", "id"], name="patient_created_id_idx"),
+        ),
+    ]
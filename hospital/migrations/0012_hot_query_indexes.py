@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+from hospital.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("hospital", "0011_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="appointment",
+            index=models.Index(fields=["patient", "date_time"], name="appointment_patient_date_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="appointment",
+            index=models.Index(fields=["doctor", "date_time"], name="appointment_doctor_date_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="appointment",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["date_time", "id"],
+                name="appointment_pending_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="dischargedetails",
+            index=models.Index(fields=["patient", "discharge_date"], name="discharge_patient_date_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="dischargedetails",
+            index=models.Index(fields=["doctor", "discharge_date"], name="discharge_doctor_date_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="emaillog",
+            index=models.Index(fields=["to_email", "id"], name="emaillog_to_email_id_idx"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hospital", "0012_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PatientSummary",
+            fields=[
+                ("patient", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="summary", serialize=False, to="hospital.patient")),
+                ("appointments_count", models.PositiveIntegerField(default=0)),
+                ("invoices_count", models.PositiveIntegerField(default=0)),
+                ("discharges_count", models.PositiveIntegerField(default=0)),
+                ("paid_payments_count", models.PositiveIntegerField(default=0)),
+                ("outstanding_balance", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("refreshed_at", models.DateTimeField(auto_now=True)),
+                ("latest_appointment", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="+", to="hospital.appointment")),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hospital", "0013_patientsummary"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="appointment",
+            name="doctor",
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to="hospital.doctor"),
+        ),
+        migrations.AlterField(
+            model_name="appointment",
+            name="patient",
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to="hospital.patient"),
+        ),
+        migrations.AlterField(
+            model_name="dischargedetails",
+            name="doctor",
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to="hospital.doctor"),
+        ),
+        migrations.AlterField(
+            model_name="dischargedetails",
+            name="patient",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to="hospital.patient"),
+        ),
+    ]
@@ -2,10 +2,38 @@ from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User
 
+
+class LoadedValuesMixin:
+    """Remember ``tracked_fields`` as they were loaded from the database.
+
+    hospital.signals compares them on save to spot status and patient
+    changes. Done in from_db rather than a post_init receiver, so building
+    instances costs no signal dispatch.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_values()
+        return instance
+
+    def loaded_value(self, name):
+        # None for unsaved instances and deferred fields: saving counts as a change.
+        return getattr(self, "_loaded_values", {}).get(name)
+
+    def remember_loaded_values(self, *names):
+        loaded = self.__dict__.setdefault("_loaded_values", {})
+        for name in names or self.tracked_fields:
+            loaded[name] = self.__dict__.get(name)
+
 # ------------------------------------------------------------
 # Doctor model
 # ------------------------------------------------------------
-class Doctor(models.Model):
+class Doctor(LoadedValuesMixin, models.Model):
+    tracked_fields = ('status',)
+
     user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True)
     department = models.CharField(max_length=100, default='General')
     mobile = models.CharField(max_length=15, blank=True, null=True)
@@ -17,6 +45,9 @@ class Doctor(models.Model):
     def __str__(self):
         return f"Dr. {self.user.get_full_name()} - {self.department}" if self.user else "Unassigned Doctor"
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'id'], name='doctor_created_id_idx')]
+
 # ------------------------------------------------------------
 # Patient model
 # ------------------------------------------------------------
@@ -33,12 +64,18 @@ class Patient(models.Model):
     def __str__(self):
         return self.user.get_full_name() if self.user else "Unassigned Patient"
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'id'], name='patient_created_id_idx')]
+
 # ------------------------------------------------------------
 # Discharge Details model
 # ------------------------------------------------------------
-class DischargeDetails(models.Model):
-    patient = models.ForeignKey(Patient, on_delete=models.CASCADE)
-    doctor = models.ForeignKey(Doctor, on_delete=models.SET_NULL, null=True, blank=True)
+class DischargeDetails(LoadedValuesMixin, models.Model):
+    tracked_fields = ('patient_id',)
+
+    # Both foreign keys lead a composite index in Meta; no separate FK index.
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, db_index=False)
+    doctor = models.ForeignKey(Doctor, on_delete=models.SET_NULL, null=True, blank=True, db_index=False)
     admission_date = models.DateField()
     discharge_date = models.DateField()
     summary = models.TextField()
@@ -55,18 +92,26 @@ class DischargeDetails(models.Model):
     def __str__(self):
         return f"{self.patient.user.get_full_name()} discharged on {self.discharge_date}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['patient', 'discharge_date'], name='discharge_patient_date_idx'),
+            models.Index(fields=['doctor', 'discharge_date'], name='discharge_doctor_date_idx'),
+        ]
+
 # ------------------------------------------------------------
 # Appointment model
 # ------------------------------------------------------------
-class Appointment(models.Model):
+class Appointment(LoadedValuesMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('confirmed', 'Confirmed'),
         ('cancelled', 'Cancelled'),
     ]
+    tracked_fields = ('status', 'patient_id')
 
-    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, null=True, blank=True)
-    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, null=True, blank=True)
+    # Both foreign keys lead a composite index in Meta; no separate FK index.
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, null=True, blank=True, db_index=False)
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, null=True, blank=True, db_index=False)
     date_time = models.DateTimeField(default=timezone.now)
     description = models.TextField(blank=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
@@ -81,6 +126,18 @@ class Appointment(models.Model):
 
     class Meta:
         ordering = ['-date_time']
+        indexes = [
+            models.Index(fields=['date_time', 'id'], name='appointment_date_id_idx'),
+            models.Index(fields=['created_at', 'id'], name='appointment_created_id_idx'),
+            models.Index(fields=['patient', 'date_time'], name='appointment_patient_date_idx'),
+            models.Index(fields=['doctor', 'date_time'], name='appointment_doctor_date_idx'),
+            # Only the approval queue reads pending rows; keep that index small.
+            models.Index(
+                fields=['date_time', 'id'],
+                name='appointment_pending_idx',
+                condition=models.Q(status='pending'),
+            ),
+        ]
 
 # ------------------------------------------------------------
 # Prescription model
@@ -99,7 +156,9 @@ class Prescription(models.Model):
 # ------------------------------------------------------------
 # Invoice model
 # ------------------------------------------------------------
-class Invoice(models.Model):
+class Invoice(LoadedValuesMixin, models.Model):
+    tracked_fields = ('patient_id',)
+
     patient = models.ForeignKey(Patient, on_delete=models.CASCADE)
     issued_date = models.DateField(default=timezone.now)
     amount = models.DecimalField(max_digits=8, decimal_places=2)
@@ -112,6 +171,9 @@ class Invoice(models.Model):
     def __str__(self):
         return f"Invoice #{self.id} - {self.patient.user.get_full_name()}"
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'id'], name='invoice_created_id_idx')]
+
 # ------------------------------------------------------------
 # Feedback model
 # ------------------------------------------------------------
@@ -149,6 +211,12 @@ class ConsultationRequest(models.Model):
     def __str__(self):
         return f"{self.full_name} - {self.preferred_date} {self.preferred_time}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="consultation_created_id_idx"),
+            models.Index(fields=["preferred_date", "id"], name="consultation_date_id_idx"),
+        ]
+
 
 class EmailLog(models.Model):
     STATUS_CHOICES = [
@@ -165,3 +233,23 @@ class EmailLog(models.Model):
 
     def __str__(self):
         return f"{self.event_type} - {self.status}"
+
+    class Meta:
+        indexes = [models.Index(fields=["to_email", "id"], name="emaillog_to_email_id_idx")]
+
+
+# ------------------------------------------------------------
+# Per-patient dashboard summary (kept current by hospital.signals)
+# ------------------------------------------------------------
+class PatientSummary(models.Model):
+    patient = models.OneToOneField(Patient, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    appointments_count = models.PositiveIntegerField(default=0)
+    invoices_count = models.PositiveIntegerField(default=0)
+    discharges_count = models.PositiveIntegerField(default=0)
+    paid_payments_count = models.PositiveIntegerField(default=0)
+    latest_appointment = models.ForeignKey(Appointment, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    outstanding_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)  # unpaid discharge totals
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Summary for patient #{self.patient_id}"
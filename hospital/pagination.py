@@ -0,0 +1,184 @@
+"""Keyset (seek) pagination for the admin list views.
+
+Pages are ordered by (sort field, id) and a cursor carries the last row's
+values, so page N costs the same LIMIT query as page 1 instead of an
+OFFSET scan, and rows inserted meanwhile do not shift pages. Sort fields
+are backed by (field, id) indexes on the models. Search (?q=), a status
+filter (?status=), the sort (?sort=, ?dir=) and the page size (?per_page=)
+are applied in the query; the shared admin_list_controls.html and
+admin_list_pagination.html includes render the form and the links.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+PAGE_SIZE = 50
+PAGE_SIZES = (25, 50, 100)
+
+
+@dataclass(frozen=True)
+class SortOption:
+    label: str
+    field: str
+
+
+@dataclass(frozen=True)
+class StatusFilter:
+    label: str
+    condition: Q
+
+
+@dataclass
+class KeysetPage:
+    items: List
+    has_next: bool
+    has_previous: bool
+    next_query: str
+    previous_query: str
+    first_query: str
+    sort: str
+    direction: str
+    search: str
+    status: str
+    page_size: int
+    is_first_page: bool = True
+    sort_choices: List[Tuple[str, str]] = field(default_factory=list)
+    status_choices: List[Tuple[str, str]] = field(default_factory=list)
+    searchable: bool = False
+    page_sizes: Sequence[int] = PAGE_SIZES
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def paginate(
+    request,
+    queryset,
+    *,
+    sorts: Dict[str, SortOption],
+    default_sort: str,
+    default_direction: str = "desc",
+    search_fields: Sequence[str] = (),
+    statuses: Optional[Dict[str, StatusFilter]] = None,
+    page_size: int = PAGE_SIZE,
+) -> KeysetPage:
+    """Filter, sort and cut one page of ``queryset`` from the request's GET."""
+    params = request.GET
+    statuses = statuses or {}
+    sort = params.get("sort") if params.get("sort") in sorts else default_sort
+    direction = params.get("dir") if params.get("dir") in ("asc", "desc") else default_direction
+    page_size = _page_size(params.get("per_page"), page_size)
+    search = params.get("q", "").strip() if search_fields else ""
+    status = params.get("status", "") if params.get("status") in statuses else ""
+
+    if search:
+        condition = Q()
+        for name in search_fields:
+            condition |= Q(**{f"{name}__icontains": search})
+        queryset = queryset.filter(condition)
+    if status:
+        queryset = queryset.filter(statuses[status].condition)
+
+    sort_field = sorts[sort].field
+    after = _decode_cursor(params.get("after"), queryset.model, sort_field, sort, direction)
+    before = None
+    if after is None:
+        before = _decode_cursor(params.get("before"), queryset.model, sort_field, sort, direction)
+
+    descending = direction == "desc"
+    if before is not None:
+        # Walk backwards from the cursor, then flip the rows into display order.
+        descending = not descending
+    cursor = after or before
+    if cursor is not None:
+        queryset = queryset.filter(_seek(sort_field, cursor, descending))
+    prefix = "-" if descending else ""
+    rows = list(queryset.order_by(f"{prefix}{sort_field}", f"{prefix}pk")[: page_size + 1])
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if before is not None:
+        rows.reverse()
+
+    has_next = more if before is None else True
+    has_previous = cursor is not None if before is None else more
+
+    base = params.copy()
+    for key in ("after", "before"):
+        base.pop(key, None)
+    base["sort"] = sort
+    base["dir"] = direction
+
+    def link(key=None, row=None):
+        query = base.copy()
+        if row is not None:
+            query[key] = _encode_cursor(sort, direction, getattr(row, sort_field), row.pk)
+        return query.urlencode()
+
+    return KeysetPage(
+        items=rows,
+        has_next=bool(rows) and has_next,
+        has_previous=bool(rows) and has_previous,
+        next_query=link("after", rows[-1]) if rows else "",
+        previous_query=link("before", rows[0]) if rows else "",
+        first_query=link(),
+        sort=sort,
+        direction=direction,
+        search=search,
+        status=status,
+        page_size=page_size,
+        is_first_page=cursor is None,
+        sort_choices=[(key, option.label) for key, option in sorts.items()],
+        status_choices=[(key, option.label) for key, option in statuses.items()],
+        searchable=bool(search_fields),
+    )
+
+
+def _page_size(value, default: int) -> int:
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return size if size in PAGE_SIZES else default
+
+
+def _seek(sort_field: str, cursor: Tuple, descending: bool) -> Q:
+    """Rows strictly past (value, pk); the bare range lets the index seek."""
+    value, pk = cursor
+    op = "lt" if descending else "gt"
+    return Q(**{f"{sort_field}__{op}e": value}) & (
+        Q(**{f"{sort_field}__{op}": value}) | Q(**{f"pk__{op}": pk})
+    )
+
+
+def _encode_cursor(sort: str, direction: str, value, pk) -> str:
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+    payload = json.dumps([sort, direction, value, pk], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(token, model, sort_field: str, sort: str, direction: str):
+    """(value, pk) from a cursor token, or None if it is missing or stale."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        cursor_sort, cursor_direction, value, pk = json.loads(raw)
+        if (cursor_sort, cursor_direction) != (sort, direction):
+            # A cursor from another sort order would skip or repeat rows.
+            return None
+        return model._meta.get_field(sort_field).to_python(value), int(pk)
+    except (binascii.Error, ValueError, TypeError, ValidationError):
+        return None
@@ -0,0 +1,122 @@
+"""PatientSummary: per-patient counters read by the patient dashboard.
+
+A summary row is rebuilt from one SELECT of correlated subqueries (each
+served by a patient-keyed index) whenever hospital.signals sees a write
+to a patient's appointments, invoices, discharges or payments. Rows are
+created on first read, and the refresh_patient_summaries command rebuilds
+them in bulk after writes that skip signals (bulk_create, update(), raw
+SQL seeding).
+
+Each batch runs in one transaction that first locks its summary rows
+(inserting any that are missing) with SELECT ... FOR UPDATE and only then
+recomputes them, so two concurrent refreshes of a patient queue up and
+the later one counts the earlier one's writes instead of overwriting them
+with an older snapshot.
+"""
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from payments.models import Payment
+
+from .models import Appointment, DischargeDetails, Invoice, Patient, PatientSummary
+
+REFRESH_BATCH_SIZE = 1000
+
+SUMMARY_FIELDS = [
+    "appointments_count",
+    "invoices_count",
+    "discharges_count",
+    "paid_payments_count",
+    "latest_appointment_id",
+    "outstanding_balance",
+]
+
+
+def _per_patient(queryset, expression, output_field):
+    grouped = queryset.filter(patient=OuterRef("pk")).order_by().values("patient")
+    return Coalesce(
+        Subquery(grouped.annotate(value=expression).values("value"), output_field=output_field),
+        Value(0),
+        output_field=output_field,
+    )
+
+
+def summary_values(patients):
+    """Annotate ``patients`` with every PatientSummary field."""
+    count = IntegerField()
+    money = DecimalField(max_digits=12, decimal_places=2)
+    latest = Appointment.objects.filter(patient=OuterRef("pk")).order_by("-date_time", "-pk")
+    return patients.order_by("pk").annotate(
+        appointments_count=_per_patient(Appointment.objects, Count("pk"), count),
+        invoices_count=_per_patient(Invoice.objects, Count("pk"), count),
+        discharges_count=_per_patient(DischargeDetails.objects, Count("pk"), count),
+        paid_payments_count=_per_patient(Payment.objects.filter(status="paid"), Count("pk"), count),
+        latest_appointment_id=Subquery(latest.values("pk")[:1]),
+        outstanding_balance=_per_patient(
+            DischargeDetails.objects.filter(is_paid=False), Sum("total"), money
+        ),
+    ).values("pk", *SUMMARY_FIELDS)
+
+
+def _upsert(rows) -> int:
+    summaries = [
+        PatientSummary(patient_id=row["pk"], **{name: row[name] for name in SUMMARY_FIELDS})
+        for row in rows
+    ]
+    PatientSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=["patient"],
+        update_fields=[*SUMMARY_FIELDS, "refreshed_at"],
+    )
+    return len(summaries)
+
+
+def _refresh_batch(patient_ids) -> int:
+    with transaction.atomic():
+        PatientSummary.objects.bulk_create(
+            [PatientSummary(patient_id=pk) for pk in patient_ids], ignore_conflicts=True
+        )
+        locked = PatientSummary.objects.select_for_update().filter(patient_id__in=patient_ids)
+        list(locked.order_by("patient_id").values_list("pk", flat=True))
+        return _upsert(summary_values(Patient.objects.filter(pk__in=patient_ids)))
+
+
+def refresh_patient_summaries(patient_ids: Iterable[int] = None, batch_size: int = REFRESH_BATCH_SIZE) -> int:
+    """Rebuild summaries for ``patient_ids`` (every patient if None)."""
+    patients = Patient.objects.all()
+    if patient_ids is not None:
+        patients = patients.filter(pk__in=list(patient_ids))
+    refreshed = 0
+    batch = []
+    for pk in patients.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=batch_size):
+        batch.append(pk)
+        if len(batch) >= batch_size:
+            refreshed += _refresh_batch(batch)
+            batch = []
+    if batch:
+        refreshed += _refresh_batch(batch)
+    return refreshed
+
+
+def refresh_on_commit(patient_id) -> None:
+    """Queue a refresh for after the surrounding transaction commits."""
+    if patient_id:
+        transaction.on_commit(lambda: refresh_patient_summaries([patient_id]))
+
+
+def get_patient_summary(patient: Patient) -> PatientSummary:
+    summary = (
+        PatientSummary.objects.select_related("latest_appointment__doctor__user")
+        .filter(patient=patient)
+        .first()
+    )
+    if summary is None:
+        refresh_patient_summaries([patient.pk])
+        summary = PatientSummary.objects.select_related(
+            "latest_appointment__doctor__user"
+        ).get(patient=patient)
+    return summary
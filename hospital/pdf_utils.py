@@ -3,9 +3,12 @@ from io import BytesIO
 
 from django.template.loader import render_to_string
 
+from hospitalmanagement.metrics import timed
+
 logger = logging.getLogger(__name__)
 
 
+@timed("render_invoice_pdf")
 def render_invoice_pdf(context):
     try:
         from xhtml2pdf import pisa
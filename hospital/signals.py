@@ -1,11 +1,15 @@
 import logging
 
-from django.db.models.signals import post_save, m2m_changed
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import Group, User
 from django.utils import timezone
 
-from .models import Prescription, Invoice, Patient, Doctor
+from payments.models import Payment
+
+from .dashboard_stats import invalidate_admin_dashboard
+from .models import Appointment, DischargeDetails, Prescription, Invoice, Patient, Doctor
+from .patient_summary import refresh_on_commit
 
 logger = logging.getLogger(__name__)
 
@@ -152,3 +156,41 @@ def ensure_patient_on_group_add(sender, instance, action, pk_set, **kwargs):
             "Group add does not include DOCTOR; skipping Doctor auto-create",
             extra={"user_id": instance.id},
         )
+
+
+# ------------------------------------------------------------
+# Admin dashboard cache invalidation
+# ------------------------------------------------------------
+@receiver(post_save, sender=Doctor)
+@receiver(post_save, sender=Appointment)
+def invalidate_dashboard_on_status_change(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and "status" not in update_fields:
+        return
+    # The loaded status comes from LoadedValuesMixin.from_db.
+    if created or instance.status != instance.loaded_value("status"):
+        invalidate_admin_dashboard()
+    instance.remember_loaded_values("status")
+
+
+@receiver(post_save, sender=Patient)
+@receiver(post_delete, sender=Patient)
+@receiver(post_delete, sender=Doctor)
+@receiver(post_delete, sender=Appointment)
+def invalidate_dashboard_on_change(sender, instance, **kwargs):
+    invalidate_admin_dashboard()
+
+
+# ------------------------------------------------------------
+# PatientSummary refresh
+# ------------------------------------------------------------
+@receiver([post_save, post_delete], sender=Appointment)
+@receiver([post_save, post_delete], sender=Invoice)
+@receiver([post_save, post_delete], sender=DischargeDetails)
+@receiver([post_save, post_delete], sender=Payment)
+def refresh_patient_summary(sender, instance, **kwargs):
+    refresh_on_commit(instance.patient_id)
+    loaded = instance.loaded_value("patient_id")
+    if loaded and loaded != instance.patient_id:
+        # Moved to another patient: the old patient's counts change too.
+        refresh_on_commit(loaded)
+    instance.remember_loaded_values("patient_id")
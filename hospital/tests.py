@@ -1,11 +1,32 @@
 from datetime import timedelta
+from io import StringIO
 from django.contrib.auth.models import Group, User
-from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import NotSupportedError, connection, models
+from django.db.models.signals import post_init
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 from django.urls import reverse
 
-from .models import Appointment, Doctor, Patient, ConsultationRequest, DischargeDetails
+from payments.models import Payment
+
+from .dashboard_stats import CACHE_KEY as DASHBOARD_CACHE_KEY, dashboard_counts
+from .migration_operations import AddIndexConcurrently
+from .models import (
+    Appointment,
+    ConsultationRequest,
+    DischargeDetails,
+    Doctor,
+    EmailLog,
+    Invoice,
+    Patient,
+    PatientSummary,
+)
+from .patient_summary import refresh_patient_summaries
 
 
 @override_settings(
@@ -309,3 +330,432 @@ class AdminModuleTests(TestCase):
         )
         self.assertEqual(pdf_response.status_code, 200)
         self.assertEqual(pdf_response["Content-Type"], "application/pdf")
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        from hospitalmanagement.metrics import registry
+
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def test_views_report_wall_db_and_template_time(self):
+        admin = User.objects.create_user(username="metrics_admin", password="pass", is_staff=True)
+        self.client.force_login(admin)
+        self.client.get(reverse("home"))
+        self.client.get(reverse("admin-view-patient"))
+
+        body = self.client.get(reverse("metrics")).content.decode()
+
+        labels = 'view="admin-view-patient",method="GET",status="2xx"'
+        self.assertIn(f"django_view_duration_seconds_count{{{labels}}} 1", body)
+        self.assertIn(f"django_view_sampled_requests_total{{{labels}}} 1", body)
+        queries = next(
+            line
+            for line in body.splitlines()
+            if line.startswith(f"django_view_db_queries_total{{{labels}}}")
+        )
+        self.assertGreater(int(queries.rsplit(" ", 1)[1]), 0)
+        template = next(
+            line
+            for line in body.splitlines()
+            if line.startswith('django_view_template_seconds_total{view="home"')
+        )
+        self.assertGreater(float(template.rsplit(" ", 1)[1]), 0)
+
+    @override_settings(METRICS_ALLOWED_IPS=("10.0.0.1",))
+    def test_metrics_are_forbidden_to_remote_anonymous_clients(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+    def test_timed_functions_are_exported(self):
+        from hospitalmanagement.metrics import registry, timed
+
+        @timed("unit_of_work")
+        def work():
+            return 42
+
+        self.assertEqual(work(), 42)
+        self.assertIn('function_duration_seconds_count{name="unit_of_work"} 1', registry.render())
+
+
+class ViewQueryBudgetTests(TestCase):
+    """Every benchmarked list/dashboard view stays within its query budget."""
+
+    def test_views_stay_within_query_budgets(self):
+        import json
+        import os
+        import tempfile
+
+        from .benchmarks import run_view_benchmarks, seed_benchmark_data, write_results
+
+        seed_benchmark_data(doctors=6, patients=60, appointments=600)
+        results = run_view_benchmarks(repeat=1)
+
+        for row in results:
+            with self.subTest(view=row["url_name"]):
+                self.assertEqual(row["status_code"], 200)
+                self.assertLessEqual(row["queries"], row["max_queries"])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "results.json")
+            write_results(path, results)
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+        self.assertEqual(len(payload["views"]), len(results))
+
+    def test_non_200_responses_fail_the_budgets(self):
+        from .benchmarks import ViewBenchmark, run_view_benchmarks, seed_benchmark_data
+
+        seed_benchmark_data(doctors=2, patients=2, appointments=2)
+        # A patient is redirected away from the admin dashboard in a few queries.
+        (row,) = run_view_benchmarks([ViewBenchmark("admin-dashboard", "patient", 10, 500)], repeat=1)
+        self.assertEqual(row["status_code"], 302)
+        self.assertFalse(row["status_ok"] or row["queries_ok"] or row["latency_ok"])
+
+    @override_settings(DEBUG=False)
+    def test_seeder_refuses_without_debug(self):
+        with self.assertRaises(CommandError):
+            call_command("seed_benchmark_data", "--doctors", "1", stdout=StringIO())
+        self.assertFalse(User.objects.filter(username__startswith="bench_").exists())
+        call_command(
+            "seed_benchmark_data", "--doctors", "1", "--patients", "1", "--appointments", "1",
+            "--force", stdout=StringIO(),
+        )
+        self.assertTrue(User.objects.filter(username__startswith="bench_").exists())
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username="admin_user", password="admin_pass", is_staff=True, is_superuser=True
+        )
+        doctor = Doctor.objects.create(
+            user=User.objects.create_user(username="doc", first_name="Gregory"), status=True
+        )
+        patient = Patient.objects.create(
+            user=User.objects.create_user(username="pat", first_name="Alice"), status=True
+        )
+        base = timezone.now()
+        # Pairs of rows share a date_time, so pages must break ties on id.
+        Appointment.objects.bulk_create(
+            Appointment(
+                doctor=doctor,
+                patient=patient,
+                date_time=base + timedelta(hours=i // 2),
+                status="pending" if i % 3 else "confirmed",
+                description=f"visit {i}",
+            )
+            for i in range(60)
+        )
+        self.client.force_login(self.admin_user)
+
+    def _page(self, query=""):
+        response = self.client.get(reverse("adm2_appointment_list") + "?" + query)
+        self.assertEqual(response.status_code, 200)
+        return response.context["page"]
+
+    def test_next_and_previous_walk_every_row_once(self):
+        expected = list(Appointment.objects.order_by("-date_time", "-id").values_list("id", flat=True))
+        page = self._page("per_page=25")
+        pages = [[a.id for a in page]]
+        self.assertFalse(page.has_previous)
+        while page.has_next:
+            page = self._page(page.next_query)
+            pages.append([a.id for a in page])
+        self.assertEqual([len(ids) for ids in pages], [25, 25, 10])
+        self.assertEqual(sum(pages, []), expected)
+
+        back = self._page(page.previous_query)
+        self.assertEqual([a.id for a in back], pages[1])
+        self.assertTrue(back.has_previous and back.has_next)
+        back = self._page(back.previous_query)
+        self.assertEqual([a.id for a in back], pages[0])
+        self.assertFalse(back.has_previous)
+
+    def test_sort_and_filters_run_in_the_query(self):
+        page = self._page("status=confirmed&dir=asc&per_page=100")
+        self.assertEqual(len(page), 20)
+        dates = [a.date_time for a in page]
+        self.assertEqual(dates, sorted(dates))
+        self.assertTrue(all(a.status == "confirmed" for a in page))
+
+        page = self._page("q=visit 17")
+        self.assertEqual([a.description for a in page], ["visit 17"])
+
+    def test_stale_or_garbage_cursor_falls_back_to_first_page(self):
+        first = self._page()
+        next_query = first.next_query
+        self.assertEqual(
+            [a.id for a in self._page("after=not-a-cursor")], [a.id for a in first]
+        )
+        # A cursor cut for another sort order is ignored rather than misapplied.
+        stale = next_query.replace("sort=date", "sort=created")
+        self.assertTrue(self._page(stale).is_first_page)
+
+    def test_list_pages_issue_constant_queries(self):
+        first = self._page("per_page=25")
+        with self.assertNumQueries(3):
+            self.client.get(reverse("adm2_appointment_list") + "?" + first.next_query)
+
+
+class HotQueryIndexTests(TestCase):
+    """EXPLAIN every hot lookup and check the planner reaches it through an index."""
+
+    def setUp(self):
+        user = User.objects.create_user(username="pat", email="pat@example.com")
+        self.patient = Patient.objects.create(user=user)
+        self.doctor = Doctor.objects.create(user=User.objects.create_user(username="doc"))
+        self.queries = {
+            "appointment_patient_date_idx": Appointment.objects.filter(
+                patient=self.patient
+            ).order_by("-date_time"),
+            "appointment_doctor_date_idx": Appointment.objects.filter(doctor=self.doctor),
+            "appointment_pending_idx": Appointment.objects.filter(status="pending"),
+            "appointment_date_id_idx": Appointment.objects.filter(
+                date_time__gte=timezone.now()
+            ),
+            "discharge_patient_date_idx": DischargeDetails.objects.filter(
+                patient=self.patient
+            ).order_by("-discharge_date"),
+            "payment_stripe_session_idx": Payment.objects.filter(stripe_session_id="cs_test"),
+            "emaillog_to_email_id_idx": EmailLog.objects.filter(
+                to_email=user.email
+            ).order_by("-id"),
+        }
+
+    def _plan(self, queryset):
+        if connection.vendor == "postgresql":
+            # Tiny test tables make a sequential scan cheapest; rule it out so
+            # the plan shows whether a usable index exists at all.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def test_hot_queries_use_an_index(self):
+        for index_name, queryset in self.queries.items():
+            with self.subTest(index=index_name):
+                plan = self._plan(queryset)
+                if connection.vendor == "postgresql":
+                    self.assertNotIn("Seq Scan", plan)
+                    self.assertIn("Index", plan)
+                else:
+                    self.assertIn(f"INDEX {index_name}", plan)
+
+    def test_dashboard_pending_count_uses_the_partial_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            dashboard_counts()
+        explain = "EXPLAIN " if connection.vendor == "postgresql" else "EXPLAIN QUERY PLAN "
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(explain + queries[-1]["sql"])
+            plan = "\n".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("appointment_pending_idx", plan)
+
+    def test_covered_foreign_keys_have_no_index_of_their_own(self):
+        tables = {
+            Appointment._meta.db_table: ["patient_id", "doctor_id"],
+            DischargeDetails._meta.db_table: ["patient_id", "doctor_id"],
+        }
+        with connection.cursor() as cursor:
+            for table, columns in tables.items():
+                constraints = connection.introspection.get_constraints(cursor, table)
+                indexed = [c["columns"] for c in constraints.values() if c["index"]]
+                for column in columns:
+                    with self.subTest(table=table, column=column):
+                        self.assertNotIn([column], indexed)
+                        self.assertTrue(any(cols[0] == column for cols in indexed))
+
+
+class AddIndexConcurrentlyTests(SimpleTestCase):
+    def _run(self, vendor, in_atomic_block=False):
+        operation = AddIndexConcurrently(
+            model_name="payment",
+            index=models.Index(fields=["stripe_session_id"], name="payment_stripe_session_idx"),
+        )
+        schema_editor = MagicMock()
+        schema_editor.connection.vendor = vendor
+        schema_editor.connection.in_atomic_block = in_atomic_block
+        with patch.object(operation, "allow_migrate_model", return_value=True):
+            operation.database_forwards("payments", schema_editor, MagicMock(), MagicMock())
+        return schema_editor, operation
+
+    def test_postgresql_builds_the_index_concurrently(self):
+        schema_editor, operation = self._run("postgresql")
+        schema_editor.add_index.assert_called_once()
+        self.assertIs(schema_editor.add_index.call_args.args[1], operation.index)
+        self.assertEqual(schema_editor.add_index.call_args.kwargs, {"concurrently": True})
+
+    def test_postgresql_refuses_to_run_in_a_transaction(self):
+        with self.assertRaises(NotSupportedError):
+            self._run("postgresql", in_atomic_block=True)
+
+    def test_other_databases_get_a_plain_index(self):
+        schema_editor, _ = self._run("sqlite")
+        self.assertEqual(schema_editor.add_index.call_args.kwargs, {})
+
+
+class AdminDashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin_user = User.objects.create_user(
+            username="admin_user", password="admin_pass", is_staff=True, is_superuser=True
+        )
+        self.pending_doctor = Doctor.objects.create(
+            user=User.objects.create_user(username="pending_doc"), status=False
+        )
+        approved = Doctor.objects.create(
+            user=User.objects.create_user(username="approved_doc"), status=True
+        )
+        patient = Patient.objects.create(user=User.objects.create_user(username="pat"))
+        self.appointment = Appointment.objects.create(
+            doctor=approved, patient=patient, status="pending"
+        )
+        Appointment.objects.create(doctor=approved, patient=patient, status="confirmed")
+        self.client.force_login(self.admin_user)
+
+    def test_counters_come_from_one_query(self):
+        with self.assertNumQueries(1):
+            counts = dashboard_counts()
+        self.assertEqual(
+            counts, {"pending_doctors": 1, "pending_patients": 1, "pending_appointments": 1}
+        )
+
+    def test_repeat_loads_are_served_from_cache(self):
+        self.client.get(reverse("admin-dashboard"))
+        # Only the session and user lookups remain.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("admin-dashboard"))
+        self.assertEqual(response.context["pending_appointments"], 1)
+        self.assertEqual(len(response.context["recent_doctors"]), 1)
+
+    def test_status_changes_invalidate_the_cache(self):
+        self.client.get(reverse("admin-dashboard"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pending_doctor.mobile = "0123"
+            self.pending_doctor.save()
+        self.assertIsNotNone(cache.get(DASHBOARD_CACHE_KEY))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pending_doctor.status = True
+            self.pending_doctor.save()
+        self.assertIsNone(cache.get(DASHBOARD_CACHE_KEY))
+
+        self.client.get(reverse("admin-dashboard"))
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment = Appointment.objects.get(pk=self.appointment.pk)
+            appointment.status = "confirmed"
+            appointment.save()
+        response = self.client.get(reverse("admin-dashboard"))
+        self.assertEqual(response.context["pending_doctors"], 0)
+        self.assertEqual(response.context["pending_appointments"], 0)
+
+
+class PatientSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="pat", password="pat_pass", email="pat@example.com", first_name="Pat"
+        )
+        self.user.groups.add(Group.objects.get_or_create(name="PATIENT")[0])
+        self.patient = Patient.objects.get(user=self.user)
+        self.other = Patient.objects.create(user=User.objects.create_user(username="other"))
+        self.doctor = Doctor.objects.create(
+            user=User.objects.create_user(username="doc"), status=True
+        )
+
+    def _summary(self, patient=None):
+        return PatientSummary.objects.get(patient=patient or self.patient)
+
+    def test_signals_keep_counters_current(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Appointment.objects.create(
+                patient=self.patient, doctor=self.doctor, date_time=timezone.now()
+            )
+            latest = Appointment.objects.create(
+                patient=self.patient,
+                doctor=self.doctor,
+                date_time=timezone.now() + timedelta(days=3),
+            )
+            discharge = DischargeDetails.objects.create(
+                patient=self.patient,
+                admission_date=timezone.now().date(),
+                discharge_date=timezone.now().date(),
+                summary="Recovered",
+                total=250,
+            )
+            Payment.objects.create(
+                user=self.user, patient=self.patient, discharge=discharge, amount=250
+            )
+        summary = self._summary()
+        self.assertEqual(summary.appointments_count, 2)
+        self.assertEqual(summary.latest_appointment_id, latest.pk)
+        self.assertEqual(summary.discharges_count, 1)
+        self.assertEqual(summary.paid_payments_count, 0)
+        self.assertEqual(summary.outstanding_balance, 250)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            discharge.is_paid = True
+            discharge.save()
+            payment = Payment.objects.get(discharge=discharge)
+            payment.status = "paid"
+            payment.save()
+        summary = self._summary()
+        self.assertEqual(summary.outstanding_balance, 0)
+        self.assertEqual(summary.paid_payments_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            latest.patient = self.other
+            latest.save()
+        self.assertEqual(self._summary().appointments_count, 1)
+        self.assertEqual(self._summary(self.other).appointments_count, 1)
+
+    def test_loaded_values_come_from_from_db(self):
+        for model in (Appointment, Invoice, DischargeDetails, Payment):
+            with self.subTest(model=model.__name__):
+                self.assertFalse(post_init.has_listeners(model))
+        appointment = Appointment.objects.create(patient=self.patient, doctor=self.doctor)
+        loaded = Appointment.objects.get(pk=appointment.pk)
+        self.assertEqual(loaded.loaded_value("patient_id"), self.patient.pk)
+        self.assertEqual(loaded.loaded_value("status"), "pending")
+        self.assertIsNone(Appointment.objects.only("pk").get(pk=appointment.pk).loaded_value("status"))
+
+    def test_refresh_locks_summary_rows_before_recounting(self):
+        manager = PatientSummary.objects
+        with patch.object(manager, "select_for_update", wraps=manager.select_for_update) as lock:
+            refreshed = refresh_patient_summaries([self.patient.pk, self.other.pk])
+        lock.assert_called_once_with()
+        self.assertEqual(refreshed, 2)
+        self.assertEqual(
+            PatientSummary.objects.filter(patient__in=[self.patient, self.other]).count(), 2
+        )
+
+    def test_refresh_command_rebuilds_after_bulk_writes(self):
+        Appointment.objects.bulk_create(
+            Appointment(patient=self.patient, doctor=self.doctor) for _ in range(3)
+        )
+        call_command("refresh_patient_summaries", stdout=StringIO())
+        self.assertEqual(self._summary().appointments_count, 3)
+        self.assertEqual(self._summary(self.other).appointments_count, 0)
+
+    def test_dashboard_reads_summary_and_pages_email_logs(self):
+        EmailLog.objects.bulk_create(
+            EmailLog(to_email=self.user.email, subject=f"Mail {i}", event_type="test", status="SUCCESS")
+            for i in range(25)
+        )
+        EmailLog.objects.create(
+            to_email="someone@example.com", subject="Not mine", event_type="test", status="SUCCESS"
+        )
+        refresh_patient_summaries([self.patient.pk])
+        self.client.force_login(self.user)
+
+        # session, user, group check, patient, summary, invoices, discharges, email page
+        with self.assertNumQueries(8):
+            response = self.client.get(reverse("patient-dashboard"))
+        page = response.context["email_page"]
+        self.assertEqual([log.subject for log in page], [f"Mail {i}" for i in range(24, 14, -1)])
+        self.assertTrue(page.has_next)
+
+        response = self.client.get(reverse("patient-dashboard") + "?" + page.next_query)
+        self.assertEqual(len(response.context["email_logs"]), 10)
+        self.assertEqual(response.context["email_logs"][0].subject, "Mail 14")
@@ -1,6 +1,7 @@
 # ==============================
 # Django Core Imports
 # ==============================
+from django.apps import apps
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import HttpResponse, HttpResponseForbidden, Http404
 from django.utils import timezone
@@ -37,6 +38,15 @@ from io import BytesIO
 # ==============================
 from .models import Doctor, Patient, Appointment, DischargeDetails, Invoice, EmailLog
 from .models import ConsultationRequest
+from .dashboard_stats import admin_dashboard_context
+from .pagination import SortOption, paginate
+from .patient_summary import get_patient_summary
+from .admin_lists import (
+    appointment_page,
+    consultation_request_page,
+    doctor_page,
+    patient_page,
+)
 from payments.models import Payment
 from .forms import (
     AppointmentForm,
@@ -50,6 +60,10 @@ from .forms import (
 
 logger = logging.getLogger(__name__)
 
+# Patient dashboard: newest invoices/discharges shown, email log rows per page.
+DASHBOARD_RECENT_ROWS = 5
+EMAIL_LOG_PAGE_SIZE = 10
+
 
 # ==============================
 # Helper functions for roles
@@ -471,7 +485,9 @@ def doctor_view_patient_view(request):
     if not isinstance(doctor, Doctor):
         return doctor
 
-    patients = Patient.objects.filter(appointment__doctor=doctor).distinct()
+    patients = (
+        Patient.objects.filter(appointment__doctor=doctor).select_related("user").distinct()
+    )
     return render(request, "hospital/doctor_view_patient.html", {"patients": patients})
 
 
@@ -487,9 +503,12 @@ def doctor_view_appointment_view(request):
         getattr(request.user, "id", None),
         doctor.id,
     )
-    appointments = Appointment.objects.filter(doctor=doctor).select_related(
-        "patient__user"
-    )
+    appointments = Appointment.objects.filter(doctor=doctor).select_related("patient__user")
+    # Risk scores are optional; hospital must not need ai_hub to import.
+    if apps.is_installed("ai_hub"):
+        from ai_hub.services.risk_scores import with_no_show_risk
+
+        appointments = with_no_show_risk(appointments)
     return render(
         request,
         "hospital/doctor_view_appointment.html",
@@ -508,9 +527,11 @@ def doctor_view_discharge_patient_view(request):
     if not isinstance(doctor, Doctor):
         return doctor
 
-    discharged_patients = DischargeDetails.objects.filter(
-        doctor=doctor
-    ).order_by("-discharge_date")
+    discharged_patients = (
+        DischargeDetails.objects.filter(doctor=doctor)
+        .select_related("patient__user")
+        .order_by("-discharge_date")
+    )
 
     return render(
         request,
@@ -524,8 +545,8 @@ def doctor_view_discharge_patient_view(request):
 @user_passes_test(is_admin)
 def admin_approve_doctor_view(request):
     try:
-        doctors = Doctor.objects.filter(status=False).select_related("user")
-        context = {"pending_doctors": doctors}
+        page = doctor_page(request, Doctor.objects.filter(status=False))
+        context = {"pending_doctors": page, "page": page}
     except Exception:
         logger.exception(
             "Failed to load pending doctors",
@@ -552,24 +573,26 @@ def patient_dashboard_view(request):
     if not patient:
         return redirect("patientsignup")
 
-    latest_appointment = (
-        Appointment.objects.filter(patient=patient)
-        .select_related("doctor__user")
-        .order_by("-date_time")
-        .first()
-    )
+    # Counters and the latest appointment come from the PatientSummary row.
+    summary = get_patient_summary(patient)
+    latest_appointment = summary.latest_appointment
     doctor = latest_appointment.doctor if latest_appointment else None
 
-    invoices = Invoice.objects.filter(patient=patient).order_by("-id")
+    invoices = Invoice.objects.filter(patient=patient).order_by("-id")[
+        :DASHBOARD_RECENT_ROWS
+    ]
     discharges = DischargeDetails.objects.filter(patient=patient).order_by(
         "-discharge_date"
-    )
-    payments_count = Payment.objects.filter(patient=patient, status="paid").count()
-    email_logs = []
+    )[:DASHBOARD_RECENT_ROWS]
+    email_page = None
     if patient.user and patient.user.email:
-        email_logs = EmailLog.objects.filter(
-            to_email=patient.user.email
-        ).order_by("-id")
+        email_page = paginate(
+            request,
+            EmailLog.objects.filter(to_email=patient.user.email),
+            sorts={"sent": SortOption("Date sent", "id")},
+            default_sort="sent",
+            page_size=EMAIL_LOG_PAGE_SIZE,
+        )
 
     context = {
         "patient": patient,
@@ -577,10 +600,12 @@ def patient_dashboard_view(request):
         "latest_appointment": latest_appointment,
         "invoices": invoices,
         "discharges": discharges,
-        "email_logs": email_logs,
-        "appointments_count": Appointment.objects.filter(patient=patient).count(),
-        "invoices_count": invoices.count(),
-        "payments_count": payments_count,
+        "email_logs": email_page.items if email_page else [],
+        "email_page": email_page,
+        "summary": summary,
+        "appointments_count": summary.appointments_count,
+        "invoices_count": summary.invoices_count,
+        "payments_count": summary.paid_payments_count,
     }
     return render(request, "hospital/patient_dashboard.html", context)
 
@@ -589,22 +614,8 @@ def patient_dashboard_view(request):
 @login_required(login_url="adminlogin")
 @user_passes_test(is_admin)
 def admin_dashboard_view(request):
-    context = {
-        # how many doctors are still waiting for approval
-        "pending_doctors": Doctor.objects.filter(status=False).count(),
-        # total patients (you could also track pending separately if needed)
-        "pending_patients": Patient.objects.count(),
-        # appointments that are still pending
-        "pending_appointments": Appointment.objects.filter(
-            status="pending"
-        ).count(),
-        # recent / approved doctors and recent patients for the tables
-        "recent_doctors": Doctor.objects.select_related("user")
-        .filter(status=True)
-        .order_by("-id")[:5],
-        "recent_patients": Patient.objects.select_related("user").order_by("-id")[:5],
-    }
-    return render(request, "hospital/admin_dashboard.html", context)
+    # Counters and recent rows come from a short-lived cache (see dashboard_stats).
+    return render(request, "hospital/admin_dashboard.html", admin_dashboard_context())
 
 
 # ---------------- DOCTOR ADMIN ----------------
@@ -617,18 +628,20 @@ def admin_doctor_view(request):
 @login_required(login_url="adminlogin")
 @user_passes_test(is_admin)
 def admin_view_doctor_view(request):
-    doctors = Doctor.objects.select_related("user").all()
-    return render(request, "hospital/admin_view_doctor.html", {"doctors": doctors})
+    page = doctor_page(request, Doctor.objects.all())
+    return render(
+        request, "hospital/admin_view_doctor.html", {"doctors": page, "page": page}
+    )
 
 
 @login_required(login_url="adminlogin")
 @user_passes_test(is_admin)
 def admin_consultation_requests_view(request):
-    requests = ConsultationRequest.objects.order_by("-created_at")
+    page = consultation_request_page(request, ConsultationRequest.objects.all())
     return render(
         request,
         "hospital/admin_consultation_requests.html",
-        {"requests": requests},
+        {"requests": page, "page": page},
     )
 
 
@@ -695,14 +708,14 @@ def admin_patient_view(request):
 @login_required(login_url="adminlogin")
 @user_passes_test(is_admin)
 def admin_view_patient_view(request):
-    patients = Patient.objects.select_related("user").order_by("-id")
+    page = patient_page(request, Patient.objects.all())
     logger.info(
-        "admin_view_patient_view count=%s",
-        patients.count(),
+        "admin_view_patient_view rows=%s",
+        len(page),
         extra={"path": request.path, "user": request.user.username},
     )
     return render(
-        request, "hospital/admin_view_patient.html", {"patients": patients}
+        request, "hospital/admin_view_patient.html", {"patients": page, "page": page}
     )
 
 
@@ -812,9 +825,11 @@ def patient_discharge_summary_view(request):
     patient = get_current_patient(request)
     if not patient:
         return redirect("patientsignup")
-    discharges = DischargeDetails.objects.filter(
-        patient=patient
-    ).order_by("-discharge_date")
+    discharges = (
+        DischargeDetails.objects.filter(patient=patient)
+        .select_related("doctor__user")
+        .order_by("-discharge_date")
+    )
     payments = Payment.objects.filter(patient=patient).select_related("discharge")
     payments_by_discharge = {
         payment.discharge_id: payment for payment in payments if payment.discharge_id
@@ -840,42 +855,40 @@ def patient_discharge_summary_view(request):
 @login_required(login_url="adminlogin")
 @user_passes_test(is_admin)
 def admin_approve_patient_view(request):
-    patients = (
-        Patient.objects.filter(status=False)
-        .filter(dischargedetails__isnull=True)
-        .select_related("user")
-        .order_by("-id")
+    page = patient_page(
+        request,
+        Patient.objects.filter(status=False).filter(dischargedetails__isnull=True),
+        statuses={},
     )
     logger.info(
-        "admin_approve_patient_view pending_count=%s",
-        patients.count(),
+        "admin_approve_patient_view rows=%s",
+        len(page),
         extra={"path": request.path, "user": request.user.username},
     )
     return render(
         request,
         "hospital/admin_approve_patient.html",
-        {"patients": patients},
+        {"patients": page, "page": page},
     )
 
 
 @login_required(login_url="adminlogin")
 @user_passes_test(is_admin)
 def admin_discharge_patient_view(request):
-    patients = (
-        Patient.objects.filter(status=True)
-        .filter(dischargedetails__isnull=True)
-        .select_related("user")
-        .order_by("-id")
+    page = patient_page(
+        request,
+        Patient.objects.filter(status=True).filter(dischargedetails__isnull=True),
+        statuses={},
     )
     logger.info(
-        "admin_discharge_patient_view eligible_count=%s",
-        patients.count(),
+        "admin_discharge_patient_view rows=%s",
+        len(page),
         extra={"path": request.path, "user": request.user.username},
     )
     return render(
         request,
         "hospital/admin_discharge_patient.html",
-        {"patients": patients},
+        {"patients": page, "page": page},
     )
 
 
@@ -929,7 +942,11 @@ def patient_appointment_list_view(request):
     patient = get_current_patient(request)
     if not patient:
         return redirect("patientsignup")
-    appointments = Appointment.objects.filter(patient=patient).order_by("-date_time")
+    appointments = (
+        Appointment.objects.filter(patient=patient)
+        .select_related("patient__user", "doctor__user")
+        .order_by("-date_time")
+    )
     return render(
         request,
         "appointments/list.html",
@@ -941,14 +958,15 @@ def patient_appointment_list_view(request):
 @login_required(login_url="adminlogin")
 @user_passes_test(is_admin)
 def list_appointments(request):
-    appointments = (
-        Appointment.objects.select_related("patient", "doctor")
-        .filter(date_time__gte=timezone.now())
+    page = appointment_page(
+        request,
+        Appointment.objects.filter(date_time__gte=timezone.now()),
+        default_direction="asc",
     )
     return render(
         request,
         "appointments/list.html",
-        {"appointments": appointments},
+        {"appointments": page, "page": page},
     )
 
 
@@ -966,13 +984,11 @@ def appointment_detail(request, pk):
 @login_required(login_url="adminlogin")
 @user_passes_test(is_admin)
 def admin_view_appointment(request):
-    appointments = Appointment.objects.select_related(
-        "doctor__user", "patient__user"
-    ).all()
+    page = appointment_page(request, Appointment.objects.all())
     return render(
         request,
         "hospital/admin_view_appointment.html",
-        {"appointments": appointments},
+        {"appointments": page, "page": page},
     )
 
 
@@ -985,13 +1001,13 @@ def admin_appointment_view(request):
 @login_required(login_url="adminlogin")
 @user_passes_test(is_admin)
 def admin_approve_appointment_view(request):
-    appointments = Appointment.objects.select_related(
-        "doctor__user", "patient__user"
-    ).filter(status="pending")
+    page = appointment_page(
+        request, Appointment.objects.filter(status="pending"), statuses={}
+    )
     return render(
         request,
         "hospital/admin_approve_appointment.html",
-        {"appointments": appointments},
+        {"appointments": page, "page": page},
     )
 
 
@@ -1170,6 +1186,7 @@ def doctor_search_patient_view(request):
 
     patients = (
         Patient.objects.filter(assignedDoctorId=doctor)
+        .select_related("user")
         .filter(
             Q(user__first_name__icontains=query)
             | Q(user__last_name__icontains=query)
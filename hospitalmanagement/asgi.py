@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hospitalmanagement.settings')
 
 application = get_asgi_application()
+
+# Only server processes load the ML models up front; management commands don't.
+from ai_hub.services.ml import preload_for_server  # noqa: E402
+
+preload_for_server()
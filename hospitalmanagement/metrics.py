@@ -0,0 +1,244 @@
+"""Per-process request timing metrics in Prometheus text format.
+
+RequestTimingMiddleware times every view. A sampled fraction of requests
+(METRICS_SAMPLE_RATE) also records DB query count, DB time and template
+render time; the counters follow the request into sync_to_async threads
+through a context variable. The timed() decorator measures any other hot
+function. GET /metrics/ serves this worker's numbers to METRICS_ALLOWED_IPS (or
+staff users). Under gunicorn each worker keeps its own registry, so scrape
+every worker or sum the series.
+"""
+import contextvars
+import functools
+import threading
+import time
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template.backends.django import DjangoTemplates, Template
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Timings for the request being handled, or None when it is not sampled.
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    __slots__ = ("queries", "db_seconds", "template_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+
+def _execute_hook(execute, sql, params, many, context):
+    """Execute wrapper on every DB connection; a no-op outside sampled requests."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db_seconds += time.perf_counter() - start
+
+
+def install_db_hook(connection, **kwargs) -> None:
+    if _execute_hook not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_hook)
+
+
+def install_db_hooks() -> None:
+    """Hook existing connections and every connection opened from now on."""
+    for connection in connections.all(initialized_only=True):
+        install_db_hook(connection)
+    connection_created.connect(install_db_hook, dispatch_uid="metrics_db_hook")
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(DURATION_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                self.counts[index] += 1
+                break
+        self.total += seconds
+        self.count += 1
+
+
+class _ViewStats:
+    __slots__ = ("duration", "sampled", "queries", "db_seconds", "template_seconds")
+
+    def __init__(self):
+        self.duration = _Histogram()
+        self.sampled = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views: Dict[Tuple[str, str, str], _ViewStats] = {}
+        self._functions: Dict[str, _Histogram] = {}
+
+    def observe_view(
+        self, view: str, method: str, status: int, seconds: float, timings: RequestTimings = None
+    ) -> None:
+        key = (view, method, f"{status // 100}xx")
+        with self._lock:
+            stats = self._views.get(key)
+            if stats is None:
+                stats = self._views[key] = _ViewStats()
+            stats.duration.observe(seconds)
+            if timings is not None:
+                stats.sampled += 1
+                stats.queries += timings.queries
+                stats.db_seconds += timings.db_seconds
+                stats.template_seconds += timings.template_seconds
+
+    def observe_function(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._functions.get(name)
+            if histogram is None:
+                histogram = self._functions[name] = _Histogram()
+            histogram.observe(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._views.clear()
+            self._functions.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            views = sorted(self._views.items())
+            functions = sorted(self._functions.items())
+        lines = [
+            "# HELP django_view_duration_seconds Wall time per view.",
+            "# TYPE django_view_duration_seconds histogram",
+        ]
+        for (view, method, status), stats in views:
+            labels = _labels(view=view, method=method, status=status)
+            lines.extend(_histogram_lines("django_view_duration_seconds", labels, stats.duration))
+        for name, attr, help_text in (
+            ("django_view_sampled_requests_total", "sampled", "Requests with DB and template timings."),
+            ("django_view_db_queries_total", "queries", "DB queries in sampled requests."),
+            ("django_view_db_seconds_total", "db_seconds", "DB time in sampled requests."),
+            (
+                "django_view_template_seconds_total",
+                "template_seconds",
+                "Template render time in sampled requests (includes lazy queries run while rendering).",
+            ),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (view, method, status), stats in views:
+                labels = _labels(view=view, method=method, status=status)
+                lines.append(f"{name}{{{labels}}} {_number(getattr(stats, attr))}")
+        lines.append("# HELP function_duration_seconds Wall time of @timed functions.")
+        lines.append("# TYPE function_duration_seconds histogram")
+        for name, histogram in functions:
+            lines.extend(_histogram_lines("function_duration_seconds", _labels(name=name), histogram))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def timed(name: str = None):
+    """Record a function's wall time under function_duration_seconds{name=...}."""
+
+    def decorator(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe_function(label, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def start_sample() -> RequestTimings:
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def end_sample() -> None:
+    _current.set(None)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates whose top-level renders count towards request timings."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name))
+
+
+class _TimedTemplate:
+    def __init__(self, template: Template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return self._template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self._template.render(context, request)
+        finally:
+            timings.template_seconds += time.perf_counter() - start
+
+
+def metrics_view(request):
+    allowed = getattr(settings, "METRICS_ALLOWED_IPS", ("127.0.0.1", "::1"))
+    user = getattr(request, "user", None)
+    if request.META.get("REMOTE_ADDR") not in allowed and not (user and user.is_staff):
+        return HttpResponseForbidden("Metrics are only served locally.")
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _labels(**values) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in values.items())
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value) -> str:
+    return str(value) if isinstance(value, int) else f"{value:.6f}"
+
+
+def _histogram_lines(name: str, labels: str, histogram: _Histogram):
+    cumulative = 0
+    for bound, count in zip(DURATION_BUCKETS, histogram.counts):
+        cumulative += count
+        yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+    yield f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}'
+    yield f"{name}_sum{{{labels}}} {histogram.total:.6f}"
+    yield f"{name}_count{{{labels}}} {histogram.count}"
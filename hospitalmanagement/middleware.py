@@ -0,0 +1,83 @@
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import metrics
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise that can also run on the event loop under ASGI.
+
+    The stock middleware is sync-only, which makes Django run the whole
+    chain in a thread and serialises the async AI Hub views behind it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class RequestTimingMiddleware:
+    """Record wall time per view, plus DB and template time for sampled requests."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = float(getattr(settings, "METRICS_SAMPLE_RATE", 1.0))
+        metrics.install_db_hooks()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start, timings = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_sample()
+        self._record(request, response, start, timings)
+        return response
+
+    async def __acall__(self, request):
+        start, timings = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_sample()
+        self._record(request, response, start, timings)
+        return response
+
+    def _start(self):
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        return time.perf_counter(), metrics.start_sample() if sampled else None
+
+    def _record(self, request, response, start, timings):
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name or match._func_path) if match else "<unresolved>"
+        metrics.registry.observe_view(
+            view, request.method, response.status_code, time.perf_counter() - start, timings
+        )
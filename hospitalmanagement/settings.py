@@ -87,7 +87,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",  # static files on Heroku
+    "hospitalmanagement.middleware.AsyncWhiteNoiseMiddleware",  # static files on Heroku
+    "hospitalmanagement.middleware.RequestTimingMiddleware",  # served at /metrics/
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -96,6 +97,13 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Fraction of requests that also record DB query count/time and template time
+# (wall time is always recorded). /metrics/ answers only these addresses and staff.
+METRICS_SAMPLE_RATE = float(os.getenv("METRICS_SAMPLE_RATE", "1.0"))
+METRICS_ALLOWED_IPS = tuple(
+    ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()
+)
+
 ROOT_URLCONF = "hospitalmanagement.urls"
 WSGI_APPLICATION = "hospitalmanagement.wsgi.application"
 
@@ -105,7 +113,8 @@ WSGI_APPLICATION = "hospitalmanagement.wsgi.application"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates that reports render time to the request metrics.
+        "BACKEND": "hospitalmanagement.metrics.TimedDjangoTemplates",
         "DIRS": [TEMPLATE_DIR],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -244,15 +253,100 @@ def _truthy(value):
 AI_FEATURES_ENABLED = _truthy(os.getenv("AI_FEATURES_ENABLED", "True"))
 AGENTS_ENABLED = _truthy(os.getenv("AGENTS_ENABLED", "True"))
 AI_MOCK_MODE = _truthy(os.getenv("AI_MOCK_MODE", "false"))
+# Load the no-show and triage models when the ASGI/WSGI app starts instead of on first request.
+AI_HUB_PRELOAD_MODELS = _truthy(os.getenv("AI_HUB_PRELOAD_MODELS", "True"))
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").strip().lower()
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
 RAG_PROVIDER = os.getenv("RAG_PROVIDER", "faiss")
+# "sparse" keeps TF-IDF vectors as CSR on disk and in memory; "dense" stores float32 arrays.
+RAG_VECTOR_STORE = os.getenv("RAG_VECTOR_STORE", "sparse").strip().lower()
+# FAISS index type: "flat" (exact), "ivf" or "hnsw" (approximate).
+RAG_FAISS_INDEX = os.getenv("RAG_FAISS_INDEX", "flat").strip().lower()
+RAG_FAISS_NLIST = int(os.getenv("RAG_FAISS_NLIST", "0"))  # 0 = 4 * sqrt(chunks)
+RAG_FAISS_NPROBE = int(os.getenv("RAG_FAISS_NPROBE", "8"))
+RAG_FAISS_TRAIN_SAMPLE = int(os.getenv("RAG_FAISS_TRAIN_SAMPLE", "20000"))
+RAG_FAISS_HNSW_M = int(os.getenv("RAG_FAISS_HNSW_M", "32"))
+RAG_FAISS_EF_CONSTRUCTION = int(os.getenv("RAG_FAISS_EF_CONSTRUCTION", "40"))
+RAG_FAISS_EF_SEARCH = int(os.getenv("RAG_FAISS_EF_SEARCH", "64"))
+# "tfidf" fits a vocabulary over the whole corpus; "hashing" is stateless and
+# vectorizes chunks as they stream in, keeping build memory flat. Hashed
+# vectors are always searched sparsely; RAG_PROVIDER=faiss only applies to tfidf.
+RAG_VECTORIZER = os.getenv("RAG_VECTORIZER", "tfidf").strip().lower()
+RAG_HASHING_FEATURES = int(os.getenv("RAG_HASHING_FEATURES", str(2**18)))
+# build_rag_index --incremental keeps the fitted TF-IDF vocabulary, so new terms
+# are ignored until a refit; rebuild from scratch after this many updates (0 = never).
+RAG_TFIDF_REFIT_EVERY = int(os.getenv("RAG_TFIDF_REFIT_EVERY", "10"))
+# Processes used by build_rag_index to read documents and extract PDF pages.
+RAG_INGEST_WORKERS = int(os.getenv("RAG_INGEST_WORKERS", "1"))
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com/v1")
+# Pooled keep-alive connections per provider, and split connect/read timeouts (seconds).
+LLM_HTTP_POOL_SIZE = int(os.getenv("LLM_HTTP_POOL_SIZE", "10"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "30"))
+# Connection cap per provider for the async views; one ASGI worker multiplexes
+# every in-flight call over this pool.
+LLM_ASYNC_POOL_SIZE = int(os.getenv("LLM_ASYNC_POOL_SIZE", "100"))
+
+# Compliance agent: steps run concurrently on a shared thread pool, each with
+# its own timeout (seconds); a batch holds at most AGENT_MAX_BATCH drafts.
+AGENT_MAX_WORKERS = int(os.getenv("AGENT_MAX_WORKERS", "8"))
+AGENT_MAX_BATCH = int(os.getenv("AGENT_MAX_BATCH", "10"))
+AGENT_STEP_TIMEOUTS = {
+    "PLAN": 1.0,
+    "RETRIEVE": float(os.getenv("AGENT_RETRIEVE_TIMEOUT", "10")),
+    "VALIDATE": 1.0,
+    "REPORT": float(os.getenv("AGENT_REPORT_TIMEOUT", LLM_CONNECT_TIMEOUT + LLM_READ_TIMEOUT)),
+}
+
+# AI request traces are queued and written by a background thread (bulk_create
+# plus one open JSONL file per process, rotated at AI_TRACE_FILE_MAX_BYTES).
+# When the queue is full a request waits AI_TRACE_ENQUEUE_TIMEOUT seconds,
+# then writes inline.
+AI_TRACE_BUFFERED = _truthy(os.getenv("AI_TRACE_BUFFERED", "True"))
+AI_TRACE_QUEUE_SIZE = int(os.getenv("AI_TRACE_QUEUE_SIZE", "10000"))
+AI_TRACE_BATCH_SIZE = int(os.getenv("AI_TRACE_BATCH_SIZE", "200"))
+AI_TRACE_FLUSH_INTERVAL = float(os.getenv("AI_TRACE_FLUSH_INTERVAL", "1.0"))
+AI_TRACE_ENQUEUE_TIMEOUT = float(os.getenv("AI_TRACE_ENQUEUE_TIMEOUT", "0.5"))
+AI_TRACE_FILE_MAX_BYTES = int(os.getenv("AI_TRACE_FILE_MAX_BYTES", str(50 * 1024 * 1024)))
+AI_TRACE_FILE_BACKUPS = int(os.getenv("AI_TRACE_FILE_BACKUPS", "5"))
+# Seconds between merges of in-memory latency histograms into AiLatencyRollup.
+AI_LATENCY_ROLLUP_INTERVAL = float(os.getenv("AI_LATENCY_ROLLUP_INTERVAL", "60"))
 
 AI_HUB_KB_DIR = BASE_DIR / "ai_hub" / "knowledge_base"
 AI_HUB_ARTIFACTS_DIR = BASE_DIR / "ai_hub" / "artifacts"
 
+# Cache for repeated rag_qa answers. LocMemCache is per-process LRU with TTL;
+# point AI_HUB_CACHE_BACKEND at a Redis/database/file backend to share it
+# across gunicorn workers.
+RAG_ANSWER_CACHE_ENABLED = _truthy(os.getenv("RAG_ANSWER_CACHE_ENABLED", "True"))
+AI_HUB_CACHE_BACKEND = os.getenv(
+    "AI_HUB_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+_ai_hub_cache = {
+    "BACKEND": AI_HUB_CACHE_BACKEND,
+    "LOCATION": os.getenv("AI_HUB_CACHE_LOCATION", "ai-hub"),
+    "TIMEOUT": int(os.getenv("AI_HUB_CACHE_TTL", "3600")),
+    "KEY_PREFIX": "ai_hub",
+}
+if "redis" not in AI_HUB_CACHE_BACKEND:
+    _ai_hub_cache["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.getenv("AI_HUB_CACHE_MAX_ENTRIES", "1000"))
+    }
+# Default cache, used for the admin dashboard counters. Point CACHE_BACKEND /
+# CACHE_LOCATION at Redis or the database cache so every worker shares one
+# copy. The dashboard entry is also dropped by signals when its counts change.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    },
+    "ai_hub": _ai_hub_cache,
+}
+ADMIN_DASHBOARD_CACHE_TTL = int(os.getenv("ADMIN_DASHBOARD_CACHE_TTL", "30"))
+
 # ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?
 # LOGGING (Heroku-friendly console logs)
 # ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?ƒ"?
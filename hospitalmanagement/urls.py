@@ -5,11 +5,15 @@ from django.conf.urls.static import static
 from django.contrib.auth.views import LogoutView
 from hospital import views, views_stripe_test
 from payments import views as payment_views
+from hospitalmanagement.metrics import metrics_view
 
 urlpatterns = [
     # Admin site
     path('admin/', admin.site.urls),
 
+    # Prometheus metrics for this worker (local scrapes and staff only)
+    path('metrics/', metrics_view, name='metrics'),
+
     # Static pages
     path('', views.home_view, name='home'),
     path('aboutus/', views.aboutus_view, name='aboutus'),
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+from hospital.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("payments", "0003_payment_status_paid"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="payment",
+            index=models.Index(fields=["stripe_session_id"], name="payment_stripe_session_idx"),
+        ),
+    ]
@@ -1,14 +1,17 @@
 from django.conf import settings
 from django.db import models
 
+from hospital.models import LoadedValuesMixin
 
-class Payment(models.Model):
+
+class Payment(LoadedValuesMixin, models.Model):
     STATUS_CHOICES = [
         ("created", "Created"),
         ("pending", "Pending"),
         ("paid", "Paid"),
         ("failed", "Failed"),
     ]
+    tracked_fields = ("patient_id",)
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -36,5 +39,8 @@ class Payment(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="created")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["stripe_session_id"], name="payment_stripe_session_idx")]
+
     def __str__(self):
         return f"{self.user.username} - {self.amount} {self.status}"
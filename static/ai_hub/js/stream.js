@@ -0,0 +1,86 @@
+/* jshint esversion: 8 */
+
+// Progressive rendering for AI Hub forms marked with data-stream-url.
+// The endpoint answers with newline-delimited JSON: an optional header line
+// (request_id, citations), then {"delta": "..."} pieces, then {"done": true}.
+// Without fetch streaming support the form falls back to a normal POST.
+document.addEventListener("DOMContentLoaded", () => {
+  const forms = document.querySelectorAll("form[data-stream-url]");
+  if (!forms.length || !window.fetch || !window.TextDecoder || !window.ReadableStream) return;
+
+  const target = (root, name) => root.querySelector(`[data-stream-target="${name}"]`);
+
+  const show = (el, text) => {
+    if (!el) return;
+    el.textContent = text;
+    const wrapper = el.closest("[data-stream-section]");
+    if (wrapper) wrapper.classList.remove("d-none");
+  };
+
+  const renderCitations = (root, citations) => {
+    const list = target(root, "citations");
+    if (!list || !citations.length) return;
+    list.innerHTML = "";
+    citations.forEach((c) => {
+      const item = document.createElement("li");
+      const source = document.createElement("strong");
+      source.textContent = c.source;
+      item.appendChild(source);
+      item.appendChild(document.createTextNode(`: ${c.snippet}`));
+      list.appendChild(item);
+    });
+    show(list, list.textContent);
+  };
+
+  const handle = (root, message, state) => {
+    if (message.request_id) show(target(root, "request_id"), `Request ID: ${message.request_id}`);
+    if (message.citations) renderCitations(root, message.citations);
+    if (message.delta) {
+      state.text += message.delta;
+      show(target(root, "output"), state.text);
+    }
+    if (message.error) show(target(root, "error"), message.error);
+    if (message.done && message.draft !== undefined) {
+      show(target(root, "output"), message.draft);
+      show(target(root, "instructions"), message.instructions);
+    }
+  };
+
+  forms.forEach((form) => {
+    const root = form.closest("[data-stream-root]") || document;
+    form.addEventListener("submit", async (event) => {
+      event.preventDefault();
+      const button = form.querySelector("[type=submit]");
+      if (button) button.disabled = true;
+      const state = { text: "" };
+      show(target(root, "output"), "");
+      try {
+        const response = await fetch(form.dataset.streamUrl, {
+          method: "POST",
+          body: new FormData(form),
+          credentials: "same-origin",
+        });
+        if (!response.ok) {
+          const payload = await response.json().catch(() => ({}));
+          show(target(root, "error"), payload.error || `Request failed (${response.status}).`);
+          return;
+        }
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          const lines = buffer.split("\n");
+          buffer = lines.pop();
+          lines.filter(Boolean).forEach((line) => handle(root, JSON.parse(line), state));
+        }
+      } catch (err) {
+        show(target(root, "error"), "The response stream was interrupted.");
+      } finally {
+        if (button) button.disabled = false;
+      }
+    });
+  });
+});